@@ -0,0 +1,23 @@
+import os
+
+import numpy as np
+
+from zombies import plotting
+from zombies.render import series_figure, show_figures
+
+
+def test_headless_scripts_save_their_figures(tmp_path, monkeypatch):
+    monkeypatch.setenv(plotting.HEADLESS_ENV, "1")
+    t = np.arange(5000.0)
+    jobs = [
+        (f"run_{k}", series_figure, (t, [(np.sin(t / (k + 1)), None, "L")], f"Run {k}"))
+        for k in range(3)
+    ]
+    paths = show_figures(jobs, workers=1, results_dir=str(tmp_path))
+    assert paths == [os.path.join(str(tmp_path), f"run_{k}.png") for k in range(3)]
+    assert all(os.path.getsize(path) > 0 for path in paths)
+
+    # A figure a script would only show is saved instead
+    fig = plotting.new_figure()
+    path = plotting.finish_figure(fig, results_dir=str(tmp_path))
+    assert path is not None and os.path.exists(path)
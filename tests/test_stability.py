@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from zombies.models import czm_model
+from zombies.stability import COEXISTENCE, EXTINCTION, SURVIVAL, TAKEOVER, czm_regimes
+
+BASE = [0.033, 0.009, 0.009, 0.006, 0.0009, 0.022, 0.0015, 0.009]
+
+
+@pytest.mark.parametrize(
+    "alpha, beta_CZ",
+    [(0.033, 0.009), (0.061, 0.0091), (0.02, 0.02), (0.07, 0.003), (0.05, 0.015), (0.015, 0.002), (0.008, 0.01)],
+)
+def test_czm_regimes_match_long_simulations(alpha, beta_CZ):
+    params = list(BASE)
+    params[0], params[2] = alpha, beta_CZ
+    result = czm_regimes(params)
+    sol = solve_ivp(
+        czm_model, (0, 4000), [48, 2, 50], args=(params,), t_eval=(2000, 4000),
+        method="LSODA", rtol=1e-8, atol=1e-10,
+    )
+    (C_half, C_end), Z_end = sol.y[0], sol.y[1, -1]
+    if result["regime"] in (COEXISTENCE, SURVIVAL):
+        assert C_end > C_half > 48
+    else:
+        assert result["regime"] in (TAKEOVER, EXTINCTION)
+        assert C_end < C_half < 48
+    if result["regime"] != EXTINCTION:
+        assert Z_end == pytest.approx(float(result["Z_level"]), rel=0.1)
+
+
+def test_czm_regimes_on_a_grid():
+    A, B = np.meshgrid(np.linspace(0.005, 0.08, 5), np.linspace(0.001, 0.03, 4))
+    result = czm_regimes([A, 0.009, B, 0.006, 0.0009, 0.022, 0.0015, 0.009])
+    assert result["regime"].shape == A.shape
+    assert result["eigenvalues"].shape == A.shape + (3,)
+    single = czm_regimes([A[2, 3], 0.009, B[2, 3], 0.006, 0.0009, 0.022, 0.0015, 0.009])
+    assert single["regime"] == result["regime"][2, 3]
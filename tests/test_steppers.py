@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from scipy.integrate import solve_ivp
+
+from zombies.compartments import CompartmentModel
+from zombies.discrete import simulate_discrete_ensemble
+from zombies.ensemble import simulate_ensemble
+from zombies.steppers import continuous_system, lotka_volterra_system, simulate_steps
+
+COEXISTENCE = [0.033, 0.009, 0.009, 0.006, 0.0009, 0.022, 0.0015, 0.009]
+VACCINE_SET = (0.145, 0.1, 0.1, 0.5, 0.6)
+
+
+def reference(system, y0, t):
+    fun = system["fun"]
+    return solve_ivp(
+        lambda s, y: fun(s, y), (0, t[-1]), y0, t_eval=t, rtol=1e-11, atol=1e-11, method="DOP853"
+    ).y.T
+
+
+@pytest.mark.parametrize("dt", [0.5, 1.0])
+def test_patankar_beats_euler_on_the_czmd_model(dt):
+    system = continuous_system(COEXISTENCE)
+    steps = int(200 / dt)
+    exact = reference(system, [48.0, 2.0, 50.0, 0.0], np.arange(steps + 1) * dt)
+    errors = {}
+    for stepper in ("euler", "patankar"):
+        values, _ = simulate_steps(system, [48.0, 2.0, 50.0, 0.0], dt, steps, stepper)
+        errors[stepper] = np.abs(values - exact).max()
+    assert errors["patankar"] < errors["euler"] / 10
+
+
+def test_patankar_stays_positive_where_explicit_steppers_diverge():
+    system = continuous_system(COEXISTENCE)
+    with np.errstate(all="ignore"):
+        rk4, _ = simulate_steps(system, [48.0, 2.0, 50.0, 0.0], 5.0, 60, "rk4")
+    values, _ = simulate_steps(system, [48.0, 2.0, 50.0, 0.0], 5.0, 60, "patankar")
+    assert not np.isfinite(rk4).all()
+    assert np.isfinite(values).all() and (values >= 0).all()
+
+
+def test_mprk22_handles_coefficients_and_rejects_unsupported_channels():
+    # 2 A -> B at rate k A^2: second order with a coefficient of 2
+    model = CompartmentModel(("A", "B"), ("k",), [("k * A * A", {"A": -2, "B": 1})])
+    system = model.system((0.5,))
+    exact = reference(system, [3.0, 0.0], [0.0, 4.0])[-1]
+    errors = [
+        np.abs(simulate_steps(system, [3.0, 0.0], dt, int(4 / dt), "mprk22")[0][-1] - exact).max()
+        for dt in (0.25, 0.125)
+    ]
+    assert errors[1] < errors[0] / 3
+
+    for reactions in (
+        [("k * A", {"A": -1, "B": 2})],
+        [("k * A * B", {"A": -1, "B": -1})],
+    ):
+        system = CompartmentModel(("A", "B"), ("k",), reactions).system((1.0,))
+        with pytest.raises(ValueError):
+            simulate_steps(system, [1.0, 1.0], 0.1, 1, "mprk22")
+
+
+def test_simulators_take_a_stepper():
+    params = np.array(COEXISTENCE)[:, None] * [1.0, 3.0]
+    _, valid = simulate_discrete_ensemble(params, [48, 2, 50, 0], 300)
+    assert not valid.all()
+    values, valid = simulate_discrete_ensemble(params, [48, 2, 50, 0], 300, stepper="patankar")
+    assert valid.all() and (values >= 0).all()
+
+    dt, steps = 1.0, 101
+    exact = reference(lotka_volterra_system(*VACCINE_SET), [9.0, 1.0], np.arange(steps) * dt)
+    L, Z = simulate_ensemble(9.0, 1.0, *VACCINE_SET, dt, steps, stepper="patankar")
+    assert np.abs(L[:, 0] - exact[:, 0]).max() < 0.2
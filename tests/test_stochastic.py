@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+
+from zombies.stochastic import (
+    LOTKA_VOLTERRA_STOICHIOMETRY,
+    lotka_volterra_propensities,
+    simulate_ssa,
+    simulate_tau_leaping,
+)
+
+VACCINE_SET = (0.145, 0.1, 0.1, 0.5, 0.6)
+
+
+def run(simulate, replicates, block_size, **kwargs):
+    return simulate(
+        LOTKA_VOLTERRA_STOICHIOMETRY,
+        lotka_volterra_propensities,
+        [20, 2],
+        np.linspace(0, 10, 11),
+        args=VACCINE_SET,
+        replicates=replicates,
+        seed=7,
+        block_size=block_size,
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize(
+    "simulate, kwargs", [(simulate_ssa, {}), (simulate_tau_leaping, {"tau": 0.05})]
+)
+def test_replicates_do_not_depend_on_block_size(simulate, kwargs):
+    reference = run(simulate, 10, 1024, **kwargs)
+    for block_size in (1, 3, 10):
+        np.testing.assert_array_equal(run(simulate, 10, block_size, **kwargs), reference)
+    # Replicate i is the same however many replicates are run
+    np.testing.assert_array_equal(run(simulate, 4, 2, **kwargs), reference[..., :4])
+    assert not np.array_equal(reference[..., 0], reference[..., 1])
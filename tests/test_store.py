@@ -0,0 +1,17 @@
+import numpy as np
+
+from zombies.store import ResultStore
+
+
+def test_int_then_float_records_are_not_truncated(tmp_path):
+    with ResultStore(tmp_path / "runs.store", index=("gamma",)) as store:
+        store.append([{"gamma": 1, "final_C": 10}, {"gamma": 2, "final_C": 20}])
+        store.flush()
+        store.append([{"gamma": 2.7, "final_C": 30.5}])
+
+    store = ResultStore(tmp_path / "runs.store")
+    values = store.read()
+    np.testing.assert_array_equal(values["gamma"], [1.0, 2.0, 2.7])
+    np.testing.assert_array_equal(values["final_C"], [10.0, 20.0, 30.5])
+    np.testing.assert_array_equal(store.read(rows=[2, 0])["gamma"], [2.7, 1.0])
+    np.testing.assert_array_equal(store.query("gamma > 2.5"), [2])
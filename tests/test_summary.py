@@ -0,0 +1,34 @@
+import numpy as np
+
+from zombies.summary import SummaryStats
+
+
+def test_extinction_only_after_being_present():
+    stats = SummaryStats(("C", "Z", "D"))
+    t = np.arange(6.0)
+    values = np.array([
+        [5.0, 1.0, 0.0],
+        [4.0, 0.5, 0.0],
+        [3.0, 0.0, 0.0],
+        [2.0, 0.0, 1.0],
+        [1.0, 0.0, 2.0],
+        [0.0, 0.0, 3.0],
+    ])
+    # Two blocks: C dies out in the second one
+    stats.update(t[:3], values[:3])
+    stats.update(t[3:], values[3:])
+    record = stats.result()
+    assert record["extinction_time_C"] == 5.0
+    assert record["extinction_time_Z"] == 2.0
+    assert np.isnan(record["extinction_time_D"])
+
+
+def test_extinction_per_member_with_a_late_start():
+    stats = SummaryStats(("Z",))
+    # Member 0 starts at zero, rises in the second block and dies out;
+    # member 1 stays at zero
+    stats.update([0.0, 1.0], np.zeros((2, 1, 2)))
+    stats.update([2.0, 3.0], np.array([[[2.0, 0.0]], [[0.0, 0.0]]]))
+    extinction = stats.result()["extinction_time_Z"]
+    assert extinction[0] == 3.0
+    assert np.isnan(extinction[1])
@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+from zombies import sweep
+from zombies.scenario import load_scenario
+
+SCENARIO = os.path.join(os.path.dirname(__file__), "..", "scenarios", "coexistencia.toml")
+
+
+def test_model_change_is_reported_apart_from_a_different_sweep(tmp_path, monkeypatch):
+    scenario = load_scenario(SCENARIO)
+    directory = str(tmp_path / "sweep")
+    created = sweep.prepare_sweep(scenario, directory)
+    assert sweep.prepare_sweep(scenario, directory) == created
+
+    other = dict(scenario, t_max=scenario["t_max"] + 1)
+    with pytest.raises(ValueError, match="different sweep"):
+        sweep.prepare_sweep(other, directory)
+
+    monkeypatch.setattr(sweep, "MODEL_VERSION", "edited")
+    with pytest.raises(ValueError, match="model code changed"):
+        sweep.prepare_sweep(scenario, directory)
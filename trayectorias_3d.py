@@ -1,6 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.integrate import solve_ivp
+
+from zombies import czm_model
+from zombies.phase import solve_many
+from zombies.plotting import finish_figure, new_figure
 
 # Parámetros del modelo
 alpha = 1.0
@@ -11,24 +13,7 @@ beta_MZ = 0.015
 gamma_MZ = 0.025
 E = 0.2
 rho = 0.1
-M_fixed = 10  # valor fijo de M
-
-# Definimos el campo vectorial para C y Z
-C_vals = np.linspace(0, 1000, 150)
-Z_vals = np.linspace(0, 1000, 150)
-C, Z = np.meshgrid(C_vals, Z_vals)
-
-# Ecuaciones en plano (C, Z), M = constante
-dCdt = (alpha - beta - E) * C - beta_CZ * C * Z
-dZdt = (beta_CZ - epsilon_CZ) * C * Z + rho * beta * (C + M_fixed) + (beta_MZ - gamma_MZ) * Z * M_fixed
-
-# Definimos el sistema
-def model(t, y):
-    C, Z, M = y
-    dCdt = (alpha - beta - E) * C - beta_CZ * C * Z
-    dZdt = (beta_CZ - epsilon_CZ) * C * Z + rho * beta * (C + M) + (beta_MZ - gamma_MZ) * Z * M
-    dMdt = E * C - beta * M - beta_MZ * Z * M
-    return [dCdt, dZdt, dMdt]
+params = [alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho]
 
 # Trayectorias desde varias condiciones iniciales
 init_conditions = [
@@ -40,17 +25,26 @@ init_conditions = [
 
 t_span = (0, 1000)
 t_eval = np.linspace(*t_span, 1000)
+method = "BDF"  # BDF o Radau usan el Jacobiano disperso; RK45 no lo necesita
+
+
+def main():
+    fig = new_figure(figsize=(10, 7))
+    ax = fig.add_subplot(111, projection='3d')
+
+    # Todas las condiciones iniciales se integran juntas como un solo sistema
+    sol = solve_many(czm_model, t_span, init_conditions, args=(params,), method=method, t_eval=t_eval)
+    for j, init in enumerate(init_conditions):
+        C, Z, M = sol.y[:, j]
+        ax.plot(C, Z, M, label=f'C0={init[0]}, Z0={init[1]}, M0={init[2]}')
 
-fig = plt.figure(figsize=(10, 7))
-ax = fig.add_subplot(111, projection='3d')
+    ax.set_xlabel('C')
+    ax.set_ylabel('Z')
+    ax.set_zlabel('M')
+    ax.set_title("Trayectorias en el espacio de estados (C, Z, M)")
+    ax.legend()
+    finish_figure(fig)
 
-for init in init_conditions:
-    sol = solve_ivp(model, t_span, init, t_eval=t_eval)
-    ax.plot(sol.y[0], sol.y[1], sol.y[2], label=f'C0={init[0]}, Z0={init[1]}, M0={init[2]}')
 
-ax.set_xlabel('C')
-ax.set_ylabel('Z')
-ax.set_zlabel('M')
-ax.set_title("Trayectorias en el espacio de estados (C, Z, M)")
-ax.legend()
-plt.show()
+if __name__ == "__main__":
+    main()
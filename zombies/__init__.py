@@ -0,0 +1,92 @@
+"""
+Zombie apocalypse population models.
+
+Importing the package only loads NumPy and SciPy; matplotlib is loaded lazily
+by zombies.plotting when a figure is drawn.
+"""
+from zombies.agents import Agents, contact_pairs, simulate_agents
+from zombies.branching import intervention_schedule, scenario_tree, simulate_branches
+from zombies.cache import ResultCache, cache_key, cached
+from zombies.compartments import (
+    CONTINUOUS_MODEL,
+    CZM_MODEL,
+    LOTKA_VOLTERRA_MODEL,
+    CompartmentModel,
+)
+from zombies.continuous import solve_model, solver_options, summarize_model
+from zombies.discrete import simulate_discrete, simulate_discrete_ensemble, unit_step
+from zombies.ensemble import (
+    discrete_lotka_volterra_ensemble,
+    simulate_ensemble,
+    stack_param_sets,
+    stepper_lotka_volterra_ensemble,
+)
+from zombies.forecast import QuantileBands, forecast_ensemble
+from zombies.impulsive import (
+    additive_jump,
+    military_impulses,
+    military_pulse,
+    periodic_times,
+    proportional_jump,
+    solve_impulsive,
+)
+from zombies.instrument import Profile
+from zombies.metapopulation import (
+    migration_operator,
+    mobility_matrix,
+    simulate_metapopulation,
+    solve_metapopulation,
+)
+from zombies.models import (
+    continuous_jacobian,
+    continuous_model,
+    czm_jacobian,
+    czm_model,
+    discrete_lotka_volterra,
+    discrete_step,
+    lotka_volterra,
+    lotka_volterra_jacobian,
+)
+from zombies.phase import block_jacobian, plane_field, solve_many, solve_pool
+from zombies.scenario import load_scenario, run_scenario, write_records
+from zombies.sensitivity import (
+    evaluate_continuous,
+    evaluate_discrete,
+    morris_indices,
+    morris_sample,
+    parameter_bounds,
+    saltelli_sample,
+    sobol_indices,
+)
+from zombies.spatial import (
+    front_radius,
+    point_outbreak,
+    simulate_fronts,
+    simulate_reaction_diffusion,
+)
+from zombies.stability import (
+    batched_newton,
+    czm_regimes,
+    eigenvalues,
+    lotka_volterra_regimes,
+)
+from zombies.steppers import (
+    STEPPERS,
+    continuous_system,
+    lotka_volterra_system,
+    pulse_jump,
+    simulate_steps,
+)
+from zombies.stochastic import (
+    CONTINUOUS_STOICHIOMETRY,
+    LOTKA_VOLTERRA_STOICHIOMETRY,
+    continuous_propensities,
+    extinction_probability,
+    lotka_volterra_propensities,
+    simulate_ssa,
+    simulate_tau_leaping,
+)
+from zombies.store import ResultStore
+from zombies.summary import SummaryStats
+from zombies.sweep import collect_sweep, run_sweep, sweep_status
+from zombies.termination import StopCriteria
@@ -0,0 +1,5 @@
+import sys
+
+from zombies.cli import main
+
+sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+Agent-based version of the C-Z-M-D model on a periodic square.
+
+Every living individual is an agent with a position, a state (civilian,
+zombie or military) and a timer. Agents are stored as a struct of NumPy
+columns (Agents), so every update is a handful of vectorized operations over
+all agents and memory is a few bytes per agent.
+
+Contacts replace the perfect mixing of the mean-field terms: a civilian is
+bitten by the zombies within the contact radius, a zombie is killed by the
+civilians and military within it. Contacts are found with a uniform-grid
+spatial hash (cells of side >= radius), so only agents in the 3 x 3 cells
+around each agent are compared and a step costs O(agents) instead of
+O(agents^2).
+
+The per-contact rates are scaled so that well-mixed agents reproduce the
+C-Z-M-D rates: with scale agents per individual of the model and area A,
+beta_CZ * C * Z becomes beta_CZ * A / (scale * pi * radius^2) per civilian
+per zombie in contact. Counts divided by scale are therefore comparable to
+simulate_discrete; the difference between both measures the effect of local
+contacts. Per-step rates become probabilities 1 - exp(-rate), so the two
+agree for well-mixed agents while the rates are small; near 1 the Euler step
+of simulate_discrete overshoots (it may kill more zombies than there are)
+and the agents do not.
+"""
+import numpy as np
+
+from zombies import instrument
+
+# Agent states; the dead are not stored, only counted
+CIVILIAN, ZOMBIE, MILITARY = 0, 1, 2
+
+
+class Agents:
+    """
+    Struct-of-arrays agent table: columns x, y (float32 positions), state
+    (int8, CIVILIAN, ZOMBIE or MILITARY) and timer (int16, steps a bitten
+    agent still incubates before it acts as a zombie).
+    """
+
+    def __init__(self, x, y, state, timer=None):
+        self.x = np.asarray(x, dtype=np.float32)
+        self.y = np.asarray(y, dtype=np.float32)
+        self.state = np.asarray(state, dtype=np.int8)
+        self.timer = np.zeros(len(self.x), dtype=np.int16) if timer is None else np.asarray(timer, dtype=np.int16)
+
+    def __len__(self):
+        return len(self.x)
+
+    def select(self, index):
+        """Agents at a boolean mask or integer index, as a new table."""
+        return Agents(self.x[index], self.y[index], self.state[index], self.timer[index])
+
+    @staticmethod
+    def concatenate(tables):
+        """One table with the rows of tables, in order."""
+        return Agents(
+            np.concatenate([t.x for t in tables]),
+            np.concatenate([t.y for t in tables]),
+            np.concatenate([t.state for t in tables]),
+            np.concatenate([t.timer for t in tables]),
+        )
+
+    def counts(self):
+        """Number of civilians, zombies and military."""
+        return np.bincount(self.state, minlength=3)[:3]
+
+
+def place_agents(counts, size, rng):
+    """Agents uniformly spread over the square, counts = (C, Z, M) agents."""
+    n = int(sum(counts))
+    state = np.repeat(np.arange(3, dtype=np.int8), np.asarray(counts, dtype=int))
+    return Agents(rng.uniform(0, size, n), rng.uniform(0, size, n), state)
+
+
+# ---------- Spatial hash ----------
+def _cells(x, y, size, n_cells):
+    scale = n_cells / size
+    # The modulo catches positions rounded up to size in float32
+    return (x * scale).astype(np.int64) % n_cells, (y * scale).astype(np.int64) % n_cells
+
+
+def spatial_hash(x, y, size, radius):
+    """
+    Bucket points of the periodic square [0, size)^2 into n_cells x n_cells
+    cells of side size / n_cells >= radius. Returns (order, starts,
+    n_cells): the points of cell c are order[starts[c]:starts[c + 1]], cells
+    numbered row-major.
+    """
+    n_cells = int(size // radius)
+    ix, iy = _cells(x, y, size, n_cells)
+    cell = iy * n_cells + ix
+    order = np.argsort(cell, kind="stable")
+    starts = np.zeros(n_cells * n_cells + 1, dtype=np.int64)
+    np.cumsum(np.bincount(cell, minlength=n_cells * n_cells), out=starts[1:])
+    return order, starts, n_cells
+
+
+def contact_pairs(qx, qy, tx, ty, size, radius):
+    """
+    All pairs (query i, target j) closer than radius on the periodic square,
+    found through spatial_hash of the targets. Returns two index arrays.
+    size / radius must be at least 3 so that the 3 x 3 neighbourhood of a
+    cell holds no cell twice.
+    """
+    if size / radius < 3:
+        raise ValueError("the square must be at least 3 contact radii wide")
+    if len(qx) > len(tx):
+        # Loop over the smaller set: the pairs are the same either way
+        t, q = contact_pairs(tx, ty, qx, qy, size, radius)
+        return q, t
+    order, starts, n_cells = spatial_hash(tx, ty, size, radius)
+    qix, qiy = _cells(qx, qy, size, n_cells)
+    queries = np.arange(len(qx))
+    found_q, found_t = [], []
+    for dy in (-1, 0, 1):
+        row = (qiy + dy) % n_cells * n_cells
+        for dx in (-1, 0, 1):
+            cell = row + (qix + dx) % n_cells
+            first = starts[cell]
+            count = starts[cell + 1] - first
+            total = int(count.sum())
+            if total == 0:
+                continue
+            # Candidate k of query i is order[first[i] + k], k < count[i]
+            q = np.repeat(queries, count)
+            k = np.arange(total) - np.repeat(np.cumsum(count) - count, count)
+            t = order[first[q] + k]
+            ddx = qx[q] - tx[t]
+            ddy = qy[q] - ty[t]
+            ddx -= size * np.round(ddx / size)
+            ddy -= size * np.round(ddy / size)
+            close = ddx * ddx + ddy * ddy < radius * radius
+            found_q.append(q[close])
+            found_t.append(t[close])
+    if not found_q:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(found_q), np.concatenate(found_t)
+
+
+# ---------- Simulation ----------
+def _probability(hazard):
+    return -np.expm1(-hazard)
+
+
+def agent_step(agents, params, contact, size, radius, speed, rng, incubation=0):
+    """
+    One step (of 1, as discrete_step) of every agent. Returns (agents, dead).
+
+    Agents first move by a Gaussian random walk with standard deviation
+    speed = (civilians, zombies, military). Then, from the contacts of the
+    moved positions:
+
+    - civilians leave by natural death (beta), training (E) or a bite
+      (beta_CZ times contact per zombie in contact), and give birth with
+      rate alpha;
+    - military leave by natural death (beta) or a bite (beta_MZ);
+    - active zombies are killed by civilians (epsilon_CZ) and military
+      (gamma_MZ) in contact.
+
+    Natural deaths reanimate as zombies with probability rho. Rates become
+    probabilities 1 - exp(-rate), and competing events are drawn in
+    proportion to their rates. Bitten agents incubate incubation steps
+    before they bite or can be killed. dead is the number of agents that
+    died in the step.
+    """
+    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
+    n = len(agents)
+    state = agents.state
+    step_size = np.asarray(speed, dtype=np.float32)[state]
+    x = (agents.x + step_size * rng.standard_normal(n, dtype=np.float32)) % np.float32(size)
+    y = (agents.y + step_size * rng.standard_normal(n, dtype=np.float32)) % np.float32(size)
+
+    civilian = state == CIVILIAN
+    military = state == MILITARY
+    human = np.flatnonzero(civilian | military)
+    zombie = np.flatnonzero((state == ZOMBIE) & (agents.timer == 0))
+    q, t = contact_pairs(x[human], y[human], x[zombie], y[zombie], size, radius)
+    bites = np.zeros(n)
+    bites[human] = np.bincount(q, minlength=len(human))
+    by_civilians = np.zeros(n)
+    by_civilians[zombie] = np.bincount(t, weights=civilian[human][q], minlength=len(zombie))
+    by_military = np.zeros(n)
+    by_military[zombie] = np.bincount(t, minlength=len(zombie)) - by_civilians[zombie]
+
+    # Hazards of every way out of the current state, one column per event:
+    # natural death, training, bite, killed
+    hazards = np.zeros((4, n))
+    hazards[0] = beta * (civilian | military)
+    hazards[1] = E * civilian
+    hazards[2] = contact * np.where(civilian, beta_CZ, beta_MZ * military) * bites
+    hazards[3] = contact * (epsilon_CZ * by_civilians + gamma_MZ * by_military)
+    total = hazards.sum(axis=0)
+    leaves = rng.random(n) < _probability(total)
+    which = np.flatnonzero(leaves)
+    cumulative = np.cumsum(hazards[:, which], axis=0)
+    event = (cumulative > rng.random(len(which)) * total[which]).argmax(axis=0)
+
+    new_state = state.copy()
+    timer = np.maximum(agents.timer, 1) - 1
+    alive = np.ones(n, dtype=bool)
+    died = which[event == 0]
+    reanimated = rng.random(len(died)) < rho
+    new_state[died[reanimated]] = ZOMBIE
+    alive[died[~reanimated]] = False
+    new_state[which[event == 1]] = MILITARY
+    bitten = which[event == 2]
+    new_state[bitten] = ZOMBIE
+    timer[bitten] = incubation
+    alive[which[event == 3]] = False
+
+    parents = np.flatnonzero(civilian & (rng.random(n) < _probability(alpha)))
+    moved = Agents(x, y, new_state, timer)
+    born = Agents(x[parents], y[parents], np.full(len(parents), CIVILIAN), None)
+    return Agents.concatenate([moved.select(alive), born]), n - int(alive.sum())
+
+
+def simulate_agents(
+    params,
+    init,
+    t_max,
+    scale=1000,
+    size=1.0,
+    radius=None,
+    speed=(0.02, 0.01, 0.02),
+    incubation=0,
+    pulse=None,
+    stride=1,
+    seed=None,
+    agents=None,
+):
+    """
+    Agent-based C-Z-M-D model from init = [C0, Z0, M0, D0] for t_max steps.
+
+    params is the list of simulate_discrete. Every individual of the model
+    is scale agents, spread uniformly over the periodic square of side size
+    (or given as agents, an Agents table). radius is the contact radius; by
+    default it is chosen so that the spatial-hash cells hold about one agent
+    each. pulse(step) adds that many military (times scale) at random
+    positions, as the exogenous input of simulate_discrete. See agent_step
+    for speed, incubation and the events.
+
+    Returns (counts, agents): counts is an array (t_max // stride + 1, 4) of
+    the compartments divided by scale, comparable to simulate_discrete, and
+    agents the final table.
+    """
+    rng = np.random.default_rng(seed)
+    init = np.asarray(init, dtype=float)
+    if agents is None:
+        agents = place_agents(np.rint(init[:3] * scale).astype(int), size, rng)
+    if radius is None:
+        radius = size / max(3, int(np.sqrt(len(agents))))
+    # Contact rate that turns the well-mixed products into per-contact rates
+    contact = size * size / (scale * np.pi * radius * radius)
+    dead = init[3] * scale
+
+    counts = np.empty((t_max // stride + 1, 4))
+    counts[0, :3] = agents.counts()
+    counts[0, 3] = dead
+    for step in range(1, t_max + 1):
+        agents, died = agent_step(agents, params, contact, size, radius, speed, rng, incubation)
+        dead += died
+        u = pulse(step) if pulse is not None else 0
+        if u:
+            recruits = place_agents((0, 0, int(round(u * scale))), size, rng)
+            agents = Agents.concatenate([agents, recruits])
+        if step % stride == 0:
+            counts[step // stride, :3] = agents.counts()
+            counts[step // stride, 3] = dead
+    instrument.count("agent_step", t_max)
+    return counts / scale, agents
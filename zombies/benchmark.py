@@ -0,0 +1,245 @@
+"""
+Benchmark suite for the models, simulators and scripts.
+
+    python -m zombies.benchmark --baseline benchmarks/baseline.json
+
+Every benchmark reports its best wall time over a few repeats, a rate
+(calls, steps or simulations per second), the RHS evaluation counts of
+continuous solves and the peak traced memory. Results are written as JSON
+and compared against a stored baseline; --check exits with status 1 when a
+benchmark is slower than the baseline by more than the tolerance.
+"""
+import argparse
+import contextlib
+import datetime
+import fnmatch
+import glob
+import json
+import os
+import platform
+import runpy
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+from scipy.integrate import solve_ivp
+
+from zombies.continuous import solver_options
+from zombies.discrete import simulate_discrete, simulate_discrete_ensemble
+from zombies.ensemble import simulate_ensemble
+from zombies.impulsive import military_pulse
+from zombies.models import (
+    continuous_model,
+    discrete_lotka_volterra,
+    discrete_step,
+    lotka_volterra,
+)
+
+# Parameters of the scripts' scenarios
+LZ_PARAMS = (0.145, 0.1, 0.1, 0.5, 0.6)
+CZMD_PARAMS = [0.033, 0.009, 0.009, 0.006, 0.0009, 0.022, 0.0015, 0.009]
+CZMD_INIT = [48.0, 2.0, 50.0, 0.0]
+
+# Scripts timed end to end (time-to-figure)
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCHMARKS = {}
+
+
+def benchmark(name, unit, count):
+    """Register fun() as a benchmark doing count units of work (e.g. steps)."""
+
+    def register(fun):
+        BENCHMARKS[name] = (fun, unit, count)
+        return fun
+
+    return register
+
+
+class CountingRHS:
+    """Wrap a right-hand side and count its evaluations."""
+
+    def __init__(self, fun):
+        self.fun = fun
+        self.calls = 0
+
+    def __call__(self, t, y, *args):
+        self.calls += 1
+        return self.fun(t, y, *args)
+
+
+# ---------- Single steps ----------
+@benchmark("step/discrete_lotka_volterra", "calls", 100_000)
+def bench_step_discrete_lotka_volterra():
+    L, Z = 9.0, 1.0
+    for _ in range(100_000):
+        discrete_lotka_volterra(L, Z, *LZ_PARAMS, 0.1)
+
+
+@benchmark("step/discrete_step", "calls", 100_000)
+def bench_step_discrete_step():
+    for _ in range(100_000):
+        discrete_step(48.0, 2.0, 50.0, 0.0, CZMD_PARAMS)
+
+
+@benchmark("step/lotka_volterra", "calls", 100_000)
+def bench_step_lotka_volterra():
+    y = np.array([9.0, 1.0])
+    for _ in range(100_000):
+        lotka_volterra(0, y, *LZ_PARAMS)
+
+
+@benchmark("step/continuous_model", "calls", 100_000)
+def bench_step_continuous_model():
+    y = np.array(CZMD_INIT)
+    for _ in range(100_000):
+        continuous_model(0, y, CZMD_PARAMS)
+
+
+# ---------- Long runs ----------
+@benchmark("run/simulate_discrete", "steps", 200_000)
+def bench_run_simulate_discrete():
+    simulate_discrete(CZMD_PARAMS, CZMD_INIT, 200_000, pulse=military_pulse)
+
+
+@benchmark("run/simulate_ensemble_single", "steps", 100_000)
+def bench_run_simulate_ensemble_single():
+    simulate_ensemble(9.0, 1.0, *LZ_PARAMS, 0.1, 100_000)
+
+
+# ---------- Ensembles ----------
+@benchmark("ensemble/simulate_ensemble", "simulations", 10_000)
+def bench_ensemble_simulate_ensemble():
+    L0 = np.linspace(5, 100, 10_000)
+    simulate_ensemble(L0, 1.0, *LZ_PARAMS, 0.1, 1000)
+
+
+@benchmark("ensemble/simulate_discrete_ensemble", "simulations", 1000)
+def bench_ensemble_simulate_discrete_ensemble():
+    params = np.asarray(CZMD_PARAMS)[:, None] * np.linspace(0.8, 1.2, 1000)
+    simulate_discrete_ensemble(params, CZMD_INIT, 1500, pulse=military_pulse)
+
+
+# ---------- Continuous solves ----------
+def _solve(method):
+    fun = CountingRHS(continuous_model)
+    options = solver_options(continuous_model, method)
+    sol = solve_ivp(fun, (0, 1500), CZMD_INIT, args=(CZMD_PARAMS,), **options)
+    return {"rhs_calls": fun.calls, "nfev": int(sol.nfev), "njev": int(sol.njev)}
+
+
+for _method in ("LSODA", "RK45", "Radau"):
+    benchmark(f"solve/continuous_model_{_method}", "solves", 1)(
+        lambda method=_method: _solve(method)
+    )
+
+
+# ---------- Scripts ----------
+def _script(path):
+    """Run a script's main() headless in a scratch directory."""
+    import matplotlib
+
+    matplotlib.use("Agg")
+    with tempfile.TemporaryDirectory() as scratch, contextlib.chdir(scratch):
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            runpy.run_path(path, run_name="__main__")
+        import matplotlib.pyplot as plt
+
+        plt.close("all")
+
+
+for _path in sorted(glob.glob(os.path.join(SCRIPTS_DIR, "*.py"))):
+    benchmark(f"figure/{os.path.basename(_path)[:-3]}", "figures", 1)(
+        lambda path=_path: _script(path)
+    )
+
+
+# ---------- Runner ----------
+def run_benchmark(name, repeat=3):
+    """Best-of-repeat time, rate, extra counters and peak traced memory of one benchmark."""
+    fun, unit, count = BENCHMARKS[name]
+    times, extra = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        extra = fun()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fun()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    best = min(times)
+    result = {"seconds": best, "rate": count / best, "unit": f"{unit}/s", "peak_bytes": peak}
+    if isinstance(extra, dict):
+        result.update(extra)
+    return result
+
+
+def run_suite(patterns=("*",), repeat=3):
+    """Run every benchmark matching one of the glob patterns."""
+    results = {}
+    for name in BENCHMARKS:
+        if any(fnmatch.fnmatch(name, pattern) for pattern in patterns):
+            results[name] = run_benchmark(name, 1 if name.startswith("figure/") else repeat)
+            print(f"{name:48} {results[name]['seconds']:10.4f} s", file=sys.stderr)
+    return {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+            "machine": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "results": results,
+    }
+
+
+def compare(report, baseline, tolerance=0.5):
+    """
+    Time ratio current / baseline of every benchmark present in both.
+    Returns rows (name, baseline s, current s, ratio, regressed).
+    """
+    rows = []
+    for name, result in report["results"].items():
+        if name in baseline["results"]:
+            before = baseline["results"][name]["seconds"]
+            ratio = result["seconds"] / before
+            rows.append((name, before, result["seconds"], ratio, ratio > 1 + tolerance))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("patterns", nargs="*", default=["*"], help="benchmark name globs")
+    parser.add_argument("--output", default=os.path.join("results", "benchmark.json"))
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="write the report to --baseline")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.5)
+    parser.add_argument("--check", action="store_true", help="exit 1 on regressions")
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.patterns, args.repeat)
+    targets = [args.output] + ([args.baseline] if args.save_baseline and args.baseline else [])
+    for path in targets:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.baseline and not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            rows = compare(report, json.load(file), args.tolerance)
+        print(f"{'benchmark':48} {'baseline':>10} {'current':>10} {'ratio':>7}")
+        for name, before, after, ratio, regressed in rows:
+            flag = "  REGRESSION" if regressed else ""
+            print(f"{name:48} {before:10.4f} {after:10.4f} {ratio:7.2f}{flag}")
+        if args.check and any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,243 @@
+import functools
+import hashlib
+import json
+import os
+import uuid
+import zipfile
+
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+
+def _source_version():
+    """
+    Hash of every module of the zombies package. Any module may feed the
+    results (simulators, models, steppers, metapopulation, spatial, agents,
+    forecasts...), so entries written by older code are never read back
+    after any change to the package, with no list to keep up to date.
+    """
+    digest = hashlib.sha256()
+    package = os.path.dirname(os.path.abspath(__file__))
+    for name in sorted(os.listdir(package)):
+        if name.endswith(".py"):
+            with open(os.path.join(package, name), "rb") as file:
+                digest.update(name.encode() + b"\0" + file.read())
+    return digest.hexdigest()[:16]
+
+
+MODEL_VERSION = _source_version()
+
+CACHE_DIR = os.environ.get("ZOMBIES_CACHE_DIR", ".zombies_cache")
+
+# Default size bound of the cache directory, and the fraction of it left
+# after an eviction
+MAX_BYTES = 1 << 30
+EVICT_FRACTION = 0.9
+
+
+def _canonical(value):
+    """JSON-able canonical form of a simulation input."""
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        # repr round-trips floats exactly and keeps 1 and 1.0 apart
+        return {"number": repr(value.item() if isinstance(value, np.generic) else value)}
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(value)
+        return {
+            "array": hashlib.sha256(data.tobytes()).hexdigest(),
+            "dtype": data.dtype.str,
+            "shape": data.shape,
+        }
+    if isinstance(value, (list, tuple)):
+        return {type(value).__name__: [_canonical(v) for v in value]}
+    if isinstance(value, dict):
+        return {"dict": [[str(k), _canonical(value[k])] for k in sorted(value, key=str)]}
+    if isinstance(value, functools.partial):
+        return {
+            "partial": _canonical(value.func),
+            "args": _canonical(value.args),
+            "keywords": _canonical(value.keywords),
+        }
+    if callable(value):
+        name = f"{value.__module__}.{value.__qualname__}"
+        if "<" in name:
+            raise TypeError(f"cannot build a cache key for {name}; use a module-level function")
+        return {"function": name}
+    raise TypeError(f"cannot build a cache key for {type(value).__name__}")
+
+
+def cache_key(*parts, version=MODEL_VERSION):
+    """
+    Content hash of simulation inputs: parameter dicts and lists, arrays,
+    scalars and module-level functions (e.g. the simulator and a pulse
+    function). Floats are compared exactly and arrays by content, so equal
+    inputs give equal keys across runs and processes.
+    """
+    text = json.dumps([version, _canonical(parts)], separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def _pack(value, name, arrays):
+    """Structure of a result, with its arrays moved into arrays[name...]."""
+    if value is None or isinstance(value, str):
+        return {"value": value}
+    if isinstance(value, (bool, int, float, np.generic, np.ndarray)):
+        arrays[name] = np.asarray(value)
+        return {"array": name, "scalar": not isinstance(value, np.ndarray)}
+    if isinstance(value, (list, tuple)):
+        items = [_pack(v, f"{name}/{i}", arrays) for i, v in enumerate(value)]
+        return {type(value).__name__: items}
+    if isinstance(value, dict):
+        kind = "OptimizeResult" if isinstance(value, OptimizeResult) else "dict"
+        return {kind: {k: _pack(v, f"{name}/{k}", arrays) for k, v in value.items()}}
+    raise TypeError(f"cannot cache a result of type {type(value).__name__}")
+
+
+def _unpack(spec, arrays):
+    if "value" in spec:
+        return spec["value"]
+    if "array" in spec:
+        value = arrays[spec["array"]]
+        return value.item() if spec["scalar"] else value
+    if "list" in spec:
+        return [_unpack(s, arrays) for s in spec["list"]]
+    if "tuple" in spec:
+        return tuple(_unpack(s, arrays) for s in spec["tuple"])
+    kind, items = next(iter(spec.items()))
+    result = {k: _unpack(s, arrays) for k, s in items.items()}
+    return OptimizeResult(result) if kind == "OptimizeResult" else result
+
+
+class ResultCache:
+    """
+    Content-addressed on-disk cache of simulation results.
+
+    Every entry is a compressed .npz under directory, named by the cache_key
+    of the simulator and all of its inputs plus the model version. Results
+    may be arrays, scalars, strings, None (e.g. simulate_discrete on an
+    invalid parameter set) and tuples, lists, dicts or solve_ivp results of
+    those. Reads refresh the file modification time. The cache keeps a
+    running total of the bytes it wrote; once that crosses max_bytes the
+    directory is measured and the least recently used entries are deleted
+    until it is below EVICT_FRACTION * max_bytes, so a sweep only walks the
+    directory every so many writes. Entries written by other processes are
+    seen at the next measurement. Unreadable entries (e.g. truncated by a
+    crash) count as misses.
+
+    Writes go through a temporary file and an atomic rename, so several
+    processes can share a directory.
+    """
+
+    def __init__(self, directory=CACHE_DIR, max_bytes=MAX_BYTES, version=MODEL_VERSION):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        # Bytes in the directory as last measured plus those written since
+        self._size = None
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.npz")
+
+    def get(self, key):
+        """(True, result) for a stored key, (False, None) otherwise."""
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+            spec = json.loads(str(arrays.pop("__structure__")))
+            os.utime(path)
+        except (OSError, ValueError, EOFError, KeyError, zipfile.BadZipFile):
+            return False, None
+        return True, _unpack(spec, arrays)
+
+    def put(self, key, result):
+        arrays = {}
+        spec = _pack(result, "result", arrays)
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, "wb") as file:
+            np.savez_compressed(file, __structure__=np.array(json.dumps(spec)), **arrays)
+        os.replace(temporary, path)
+        if self._size is None:
+            self._size = self.size()
+        else:
+            self._size += os.path.getsize(path)
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def call(self, fun, *args, **kwargs):
+        """
+        fun(*args, **kwargs), read from the cache when the same call (same
+        function, inputs and model version) was stored before.
+        """
+        key = cache_key(fun, args, kwargs, version=self.version)
+        found, result = self.get(key)
+        if found:
+            self.hits += 1
+            return result
+        self.misses += 1
+        result = fun(*args, **kwargs)
+        self.put(key, result)
+        return result
+
+    def entries(self):
+        """(mtime, size, path) of every entry, oldest first."""
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".npz"):
+                    path = os.path.join(root, name)
+                    try:
+                        stat = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((stat.st_mtime, stat.st_size, path))
+        return sorted(entries)
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """
+        Measure the directory and, when it exceeds max_bytes, delete least
+        recently used entries until it is below EVICT_FRACTION * max_bytes.
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        if total > self.max_bytes:
+            for _, size, path in entries:
+                if total <= EVICT_FRACTION * self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                total -= size
+        self._size = total
+
+    def clear(self):
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._size = 0
+
+
+def cached(fun, cache=None):
+    """
+    Wrap a simulator so that calls go through cache (a ResultCache, by
+    default one on CACHE_DIR), e.g. cached(simulate_discrete)(params, init, t_max).
+    """
+    cache = cache or ResultCache()
+
+    @functools.wraps(fun)
+    def wrapper(*args, **kwargs):
+        return cache.call(fun, *args, **kwargs)
+
+    wrapper.cache = cache
+    return wrapper
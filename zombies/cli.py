@@ -0,0 +1,91 @@
+"""
+Command-line runner of scenario files.
+
+    zombies run scenarios/coexistencia.toml --workers 8
+
+Every scenario's sweep is expanded and its runs are summarized over a pool
+of worker processes; the records are written to results/<name>.csv (or
+.json with --format json, or appended to the columnar results/<name>.store
+with --format store, see zombies.store).
+
+    zombies sweep scenarios/coexistencia.toml --directory /shared/coexistencia
+
+runs the sweep resumably through a shared directory (see zombies.sweep):
+start it again after a crash, or on other machines sharing the directory,
+and the workers pick up the shards that are not finished.
+"""
+import argparse
+import sys
+import time
+
+from zombies.plotting import RESULTS_DIR
+from zombies.scenario import BATCH_SIZE, load_scenario, run_scenario, write_records
+from zombies.sweep import LEASE, SHARD_SIZE, run_sweep, sweep_status
+
+
+def run(args):
+    for path in args.scenarios:
+        scenario = load_scenario(path)
+        start = time.perf_counter()
+        records = run_scenario(scenario, args.workers, args.batch_size)
+        seconds = time.perf_counter() - start
+        output = write_records(
+            records, f"{args.output}/{scenario['name']}.{args.format}", list(scenario["sweep"])
+        )
+        invalid = sum(not record["valid"] for record in records)
+        print(
+            f"{scenario['name']}: {len(records)} runs ({invalid} invalid) in {seconds:.2f} s, "
+            f"{len(records) / seconds:.1f} runs/s -> {output}"
+        )
+    return 0
+
+
+def sweep(args):
+    scenario = load_scenario(args.scenario)
+    start = time.perf_counter()
+    records = run_sweep(scenario, args.directory, args.workers, args.shard_size, args.lease)
+    seconds = time.perf_counter() - start
+    if records is None:
+        status = sweep_status(args.directory)
+        print(
+            f"{scenario['name']}: {status['done']} of {status['shards']} shards done, "
+            f"{status['running']} held by other workers"
+        )
+        return 0
+    output = write_records(
+        records, f"{args.output}/{scenario['name']}.{args.format}", list(scenario["sweep"])
+    )
+    print(f"{scenario['name']}: {len(records)} runs in {seconds:.2f} s -> {output}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="zombies", description=__doc__.split("\n\n")[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    runner = commands.add_parser("run", help="run the sweeps of scenario files")
+    runner.add_argument("scenarios", nargs="+", help=".toml or .json scenario files")
+    runner.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    runner.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="runs per task")
+    runner.add_argument("--output", default=RESULTS_DIR, help="directory of the records")
+    runner.add_argument("--format", choices=("csv", "json", "store"), default="csv")
+    runner.set_defaults(handler=run)
+    sweeper = commands.add_parser("sweep", help="run a sweep resumably through a shared directory")
+    sweeper.add_argument("scenario", help=".toml or .json scenario file")
+    sweeper.add_argument("--directory", required=True, help="shared work directory of the sweep")
+    sweeper.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    sweeper.add_argument("--shard-size", type=int, help=f"runs per shard (default: {SHARD_SIZE})")
+    sweeper.add_argument(
+        "--lease", type=float, default=LEASE, help="seconds before an idle claim is taken over"
+    )
+    sweeper.add_argument("--output", default=RESULTS_DIR, help="directory of the records")
+    sweeper.add_argument("--format", choices=("csv", "json", "store"), default="csv")
+    sweeper.set_defaults(handler=sweep)
+    args = parser.parse_args(argv)
+    try:
+        return args.handler(args)
+    except (OSError, ValueError) as error:
+        parser.exit(2, f"zombies: error: {error}\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,354 @@
+"""
+Compartment models declared once as reactions and compiled to array code.
+
+A model is its compartments, its parameters and a list of reactions, each a
+mass-action rate (a parameter expression times a product of compartments)
+and the change it makes to every compartment:
+
+    CompartmentModel(
+        ("L", "Z"),
+        ("alpha", "beta", "rho", "gamma", "delta"),
+        [
+            ("alpha * L", {"L": 1}),
+            ("(1 - rho) * beta * L", {"L": -1}),
+            ("rho * beta * L", {"L": -1, "Z": 1}),
+            ("gamma * L * Z", {"L": -1, "Z": 1}),
+            ("delta * L * Z", {"Z": -1}),
+        ],
+    )
+
+From the declaration the model derives the right-hand side, the analytic
+Jacobian (dense, batched or scipy.sparse), the reaction channels used by the
+Patankar stepper and zombies.stochastic, and a batched Euler kernel. The
+distinct products of compartments (L * Z above) are computed once per
+evaluation and shared by every reaction and Jacobian entry that needs them;
+the right-hand side is one small matrix product with them. Variants such as
+extra compartments or age classes are new declarations (reaction lists are
+easily built with comprehensions) and get all of this without new code.
+
+LOTKA_VOLTERRA_MODEL, CONTINUOUS_MODEL and CZM_MODEL declare the models of
+zombies.models; zombies.stochastic and zombies.steppers take their reaction
+channels and right-hand sides from these declarations.
+"""
+import ast
+import keyword
+
+import numpy as np
+import scipy.sparse
+
+
+# Nodes allowed in the parameter factor of a rate; anything else (calls,
+# attributes, subscripts, ...) is rejected before the factor is compiled
+_ARITHMETIC = (
+    ast.BinOp, ast.UnaryOp, ast.Name, ast.Constant, ast.Load,
+    ast.Add, ast.Sub, ast.Mult, ast.Div, ast.Pow, ast.USub, ast.UAdd,
+)
+
+
+def _parse_rate(rate, compartments, params):
+    """
+    Split a rate expression into (monomial, coefficient): the sorted tuple of
+    compartment indices multiplied and the source of the parameter factor.
+    """
+    factors = []
+
+    def flatten(node):
+        if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mult):
+            flatten(node.left)
+            flatten(node.right)
+        else:
+            factors.append(node)
+
+    flatten(ast.parse(rate, mode="eval").body)
+    monomial, coefficient = [], []
+    for node in factors:
+        if isinstance(node, ast.Name) and node.id in compartments:
+            monomial.append(compartments.index(node.id))
+            continue
+        if (
+            isinstance(node, ast.BinOp) and isinstance(node.op, ast.Pow)
+            and isinstance(node.left, ast.Name) and node.left.id in compartments
+            and isinstance(node.right, ast.Constant) and isinstance(node.right.value, int)
+            and node.right.value >= 0
+        ):
+            monomial += [compartments.index(node.left.id)] * node.right.value
+            continue
+        for part in ast.walk(node):
+            if not isinstance(part, _ARITHMETIC):
+                raise ValueError(f"rate {rate!r} may only use arithmetic on parameters and numbers")
+            if isinstance(part, ast.Constant) and type(part.value) not in (int, float):
+                raise ValueError(f"rate {rate!r} may only use arithmetic on parameters and numbers")
+        names = {n.id for n in ast.walk(node) if isinstance(n, ast.Name)}
+        if names & set(compartments):
+            raise ValueError(f"rate {rate!r} is not a parameter expression times compartments")
+        if names - set(params):
+            raise ValueError(f"unknown names in rate {rate!r}: {', '.join(sorted(names - set(params)))}")
+        coefficient.append(f"({ast.unparse(node)})")
+    return tuple(sorted(monomial)), " * ".join(coefficient) or "1.0"
+
+
+def _expand(values, ndim):
+    """values with trailing axes of length one up to ndim dimensions."""
+    values = np.asarray(values, dtype=float)
+    return values.reshape(values.shape + (1,) * (ndim - values.ndim))
+
+
+def _without(monomial, i):
+    k = monomial.index(i)
+    return monomial[:k] + monomial[k + 1:]
+
+
+class CompartmentModel:
+    """
+    A mass-action compartment model. compartments and params are name
+    tuples; reactions is a list of (rate, changes) with rate an expression
+    such as "beta_CZ * C * Z" or "(1 - rho) * beta * C" (parameters may be
+    combined with arithmetic, compartments only multiplied, possibly with
+    integer powers) and changes a dict compartment -> change per event.
+
+    Parameters are given as a list in the order of params or as a dict;
+    every parameter may be an array (N,) to evaluate N parameter sets at
+    once on states (n, N). States are (n,) or carry trailing batch axes like
+    the functions in zombies.models.
+    """
+
+    def __init__(self, compartments, params, reactions):
+        self.compartments = tuple(compartments)
+        self.params = tuple(params)
+        if set(self.compartments) & set(self.params):
+            raise ValueError("compartments and parameters need different names")
+        for name in self.compartments + self.params:
+            if not name.isidentifier() or keyword.iskeyword(name):
+                raise ValueError(f"{name!r} is not a valid name")
+        self.reactions = [(rate, dict(changes)) for rate, changes in reactions]
+        n = len(self.compartments)
+
+        self.stoichiometry = np.zeros((len(self.reactions), n))
+        parsed = []
+        for r, (rate, changes) in enumerate(self.reactions):
+            unknown = set(changes) - set(self.compartments)
+            if unknown:
+                raise ValueError(f"unknown compartments: {', '.join(sorted(unknown))}")
+            for name, change in changes.items():
+                self.stoichiometry[r, self.compartments.index(name)] = change
+            parsed.append(_parse_rate(rate, self.compartments, self.params))
+
+        # Every product needed by a rate or a Jacobian entry, each built as a
+        # smaller product times one compartment, in increasing degree
+        needed = {m for m, _ in parsed}
+        needed |= {_without(m, i) for m in list(needed) for i in set(m)}
+        closed = set()
+        for m in needed:
+            closed.update(m[:d] for d in range(len(m) + 1))
+        self.monomials = sorted(closed, key=lambda m: (len(m), m))
+        index = {m: j for j, m in enumerate(self.monomials)}
+        self._recipe = [(index[m[:-1]] if m else None, m[-1] if m else None) for m in self.monomials]
+        self._reaction_monomial = np.array([index[m] for m, _ in parsed])
+        # Only names and arithmetic reach eval, checked by _parse_rate
+        self._coefficients = eval(
+            f"lambda {', '.join(self.params)}: ({', '.join(c for _, c in parsed)},)",
+            {"__builtins__": {}},
+        )
+
+        # Reaction -> product one-hot, and d(product j) / d(compartment i) as
+        # multiplicity times product derivative[j, i]
+        nm = len(self.monomials)
+        self._products = np.zeros((len(parsed), nm))
+        self._products[np.arange(len(parsed)), self._reaction_monomial] = 1
+        self._derivative = np.zeros((nm, n, nm))
+        for m in {m for m, _ in parsed}:
+            for i in set(m):
+                self._derivative[index[m], i, index[_without(m, i)]] = m.count(i)
+        # Structural nonzeros of the Jacobian
+        touches = (self.stoichiometry.T != 0) @ self._products
+        pattern = touches @ self._derivative.any(axis=2) > 0
+        self.jacobian_rows, self.jacobian_cols = np.nonzero(pattern)
+
+    def __repr__(self):
+        return f"CompartmentModel({self.compartments}, {len(self.reactions)} reactions)"
+
+    def drop(self, *names):
+        """
+        The same model without compartments that no rate depends on (e.g.
+        the dead D, which only accumulates).
+        """
+        for rate, _ in self.reactions:
+            monomial, _ = _parse_rate(rate, self.compartments, self.params)
+            if any(self.compartments[i] in names for i in monomial):
+                raise ValueError(f"rate {rate!r} depends on a dropped compartment")
+        return CompartmentModel(
+            [c for c in self.compartments if c not in names],
+            self.params,
+            [
+                (rate, {c: v for c, v in changes.items() if c not in names})
+                for rate, changes in self.reactions
+            ],
+        )
+
+    # ---------- Parameters ----------
+    def coefficients(self, params):
+        """Parameter factor of every reaction rate, (n_reactions,) or (n_reactions, N)."""
+        if isinstance(params, dict):
+            params = [params[name] for name in self.params]
+        if all(np.isscalar(p) for p in params):
+            return np.array(self._coefficients(*params), dtype=float)
+        values = self._coefficients(*(np.asarray(p, dtype=float) for p in params))
+        return np.array(np.broadcast_arrays(*values))
+
+    def propensities(self, y, params):
+        """
+        Rate of every reaction at y, (n_reactions, ...), with the signature
+        of the propensities of zombies.stochastic (one parameter set per
+        replicate when params are arrays (R,)).
+        """
+        products = self.products(y)[self._reaction_monomial]
+        return _expand(self.coefficients(params), products.ndim) * products
+
+    def _bind(self, params):
+        """Coefficient matrices of params: rhs = net @ products, jac = jac @ products."""
+        coefficients = self.coefficients(params)
+        if coefficients.ndim == 1:
+            net = (self.stoichiometry.T * coefficients) @ self._products
+            jac = (net @ self._derivative.reshape(net.shape[1], -1)).reshape(len(net), len(net), -1)
+        else:
+            net = np.einsum("rc,rm,rk->cmk", self.stoichiometry, self._products, coefficients)
+            jac = np.einsum("cjk,jid->cidk", net, self._derivative)
+        return coefficients, net, jac[self.jacobian_rows, self.jacobian_cols]
+
+    # ---------- Kernels ----------
+    def products(self, y):
+        """Every product of compartments in self.monomials, shape (n_products, ...)."""
+        values = []
+        for parent, i in self._recipe:
+            if parent is None:
+                values.append(np.ones(np.shape(y)[1:]))
+            elif self.monomials[parent]:
+                values.append(values[parent] * y[i])
+            else:
+                values.append(y[i])
+        return np.array(values)
+
+    @staticmethod
+    def _apply(matrix, products):
+        if matrix.ndim == 2:
+            return matrix @ products
+        # One parameter set per batch member: matrix (rows, products, N)
+        return np.einsum("km...,m...->k...", matrix, products)
+
+    def _dense(self, values, y):
+        n = len(self.compartments)
+        J = np.zeros((n, n) + np.shape(values)[1:])
+        J[self.jacobian_rows, self.jacobian_cols] = values
+        return J
+
+    def rhs(self, t, y, params):
+        """
+        Right-hand side dy/dt, with the signature of continuous_model. The
+        parameters are evaluated on every call; system() binds them once and
+        is the faster choice for solvers and loops.
+        """
+        _, net, _ = self._bind(params)
+        return self._apply(net, self.products(y))
+
+    def jacobian(self, t, y, params):
+        """Analytic Jacobian (n, n) or (n, n, k) of rhs."""
+        _, _, jac = self._bind(params)
+        return self._dense(self._apply(jac, self.products(y)), y)
+
+    def system(self, params, sparse=False):
+        """
+        The model with params bound, for the steppers and solve_ivp: "fun"(t,
+        y), "jac"(t, y) (a scipy.sparse CSC matrix with sparse=True), and
+        the reaction channels "stoichiometry" and "propensities"(y).
+        Parameters are evaluated once here instead of on every call.
+        """
+        coefficients, net, jac = self._bind(params)
+        n = len(self.compartments)
+        shape = (n, n)
+
+        def fun(t, y):
+            return self._apply(net, self.products(y))
+
+        def jacobian(t, y):
+            values = self._apply(jac, self.products(y))
+            if sparse:
+                return scipy.sparse.csc_matrix((values, (self.jacobian_rows, self.jacobian_cols)), shape=shape)
+            return self._dense(values, y)
+
+        def propensities(y):
+            products = self.products(y)[self._reaction_monomial]
+            return _expand(coefficients, products.ndim) * products
+
+        return {
+            "fun": fun,
+            "jac": jacobian,
+            "stoichiometry": self.stoichiometry,
+            "propensities": propensities,
+        }
+
+    def simulate(self, params, init, steps, dt=1.0, inputs=None):
+        """
+        Euler steps y + dt * rhs(y) (the discrete models of the scripts) for
+        one state (n,) or a batch (n, N), possibly with one parameter set per
+        member. inputs(step), when given, is added to the state after each
+        step (e.g. the military pulses of the C-Z-M-D model).
+
+        A member whose population becomes negative is marked invalid and set
+        to NaN from that step, as in simulate_discrete_ensemble. Returns
+        (values (steps + 1, n, ...), valid).
+        """
+        fun = self.system(params)["fun"]
+        init = np.asarray(init, dtype=float)
+        batch = np.broadcast_shapes(init.shape[1:], self.coefficients(params).shape[1:])
+        state = np.array(np.broadcast_to(_expand(init, 1 + len(batch)), init.shape[:1] + batch))
+        valid = np.ones(batch, dtype=bool)
+        values = np.empty((steps + 1,) + state.shape)
+        values[0] = state
+        for step in range(1, steps + 1):
+            state = state + dt * fun(step * dt, state)
+            if inputs is not None:
+                state = state + _expand(inputs(step), state.ndim)
+            negative = (state < 0).any(axis=0)
+            if negative.any():
+                valid &= ~negative
+                state[:, negative] = np.nan
+            values[step] = state
+        return values, valid
+
+
+# ---------- Models of zombies.models ----------
+# Channels: birth, death, death that reanimates as a zombie, infection,
+# zombie killed
+LOTKA_VOLTERRA_MODEL = CompartmentModel(
+    ("L", "Z"),
+    ("alpha", "beta", "rho", "gamma", "delta"),
+    [
+        ("alpha * L", {"L": 1}),
+        ("(1 - rho) * beta * L", {"L": -1}),
+        ("rho * beta * L", {"L": -1, "Z": 1}),
+        ("gamma * L * Z", {"L": -1, "Z": 1}),
+        ("delta * L * Z", {"Z": -1}),
+    ],
+)
+
+# Canales: nacimiento civil, muerte civil, muerte civil que revive como
+# zombie, entrenamiento, civil infectado, civil mata zombie, muerte militar,
+# muerte militar que revive, militar infectado, militar mata zombie
+CONTINUOUS_MODEL = CompartmentModel(
+    ("C", "Z", "M", "D"),
+    ("alpha", "beta", "beta_CZ", "epsilon_CZ", "beta_MZ", "gamma_MZ", "E", "rho"),
+    [
+        ("alpha * C", {"C": 1}),
+        ("(1 - rho) * beta * C", {"C": -1, "D": 1}),
+        ("rho * beta * C", {"C": -1, "Z": 1}),
+        ("E * C", {"C": -1, "M": 1}),
+        ("beta_CZ * C * Z", {"C": -1, "Z": 1}),
+        ("epsilon_CZ * C * Z", {"Z": -1, "D": 1}),
+        ("(1 - rho) * beta * M", {"M": -1, "D": 1}),
+        ("rho * beta * M", {"M": -1, "Z": 1}),
+        ("beta_MZ * Z * M", {"M": -1, "Z": 1}),
+        ("gamma_MZ * Z * M", {"Z": -1, "D": 1}),
+    ],
+)
+
+CZM_MODEL = CONTINUOUS_MODEL.drop("D")
@@ -0,0 +1,219 @@
+import numpy as np
+
+from zombies import instrument
+from zombies.models import discrete_step
+from zombies.steppers import STEPPERS, continuous_system
+from zombies.termination import RUNNING
+
+# Filas que se acumulan en memoria antes de copiarlas a la salida
+CHUNK_SIZE = 65536
+
+# Aviso de simulate_discrete cuando una población se vuelve negativa
+INVALID_DISCRETE = "Invalid set of parameters: negative population in discrete model."
+
+
+def trajectory_output(t_max, out=None, dtype=np.float64, stride=1):
+    """
+    Array de salida (t_max // stride + 1, 4) para simulate_discrete.
+
+    Si out es una ruta se crea un .npy mapeado en memoria (open_memmap), de
+    modo que el largo de la corrida queda limitado por el disco y no por la
+    RAM; si no, se reserva un array en memoria.
+    """
+    shape = (t_max // stride + 1, 4)
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    return np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=shape)
+
+
+def unit_step(params, stepper=None):
+    """
+    Función step(C, Z, M, D, pulse) que avanza una unidad de tiempo: el
+    discrete_step de los scripts sin stepper, o un paso de 1 del modelo
+    continuo con stepper (un nombre de zombies.steppers.STEPPERS, por ejemplo
+    "rk4" o "patankar", o una función con su firma), más el pulso en M.
+    Acepta escalares o arrays (N,) con params (8, N).
+    """
+    if stepper is None:
+        return lambda C, Z, M, D, pulse=0: discrete_step(C, Z, M, D, params, pulse)
+    system = continuous_system(params)
+    stepper = STEPPERS.get(stepper, stepper)
+
+    def step(C, Z, M, D, pulse=0):
+        y, _ = stepper(system, 0.0, np.array([C, Z, M, D], dtype=float), 1.0)
+        y[2] += pulse
+        return tuple(y)
+
+    return step
+
+
+def simulate_discrete(
+    params,
+    init,
+    t_max,
+    pulse=None,
+    out=None,
+    dtype=np.float64,
+    stride=1,
+    reducer=None,
+    stop=None,
+    warn=True,
+    stepper=None,
+):
+    """
+    Modelo discreto C-Z-M-D desde init = [C0, Z0, M0, D0] durante t_max pasos.
+
+    pulse(step) es la entrada exógena de militares en cada paso (por ejemplo
+    military_pulse); sin pulse el sistema evoluciona libre. Se guarda el
+    estado inicial y uno de cada stride pasos, en float64 o float32 según
+    dtype. Si out es una ruta, la trayectoria se escribe por bloques en un
+    .npy mapeado en memoria.
+
+    Con reducer (por ejemplo SummaryStats) no se guarda la trayectoria: cada
+    bloque de estados se entrega a reducer.update y se devuelve
+    reducer.result().
+
+    Con stop (un StopCriteria sobre ("C", "Z", "M", "D")) la corrida se
+    detiene en cuanto se cumple un criterio, revisado cada stop.window pasos;
+    el resto de la trayectoria se completa con StopCriteria.fill. En ese caso
+    se devuelve (trayectoria, {"reason": ..., "stop_step": ...}), y con
+    reducer ambas claves se agregan al registro.
+
+    Devuelve un array (t_max // stride + 1, 4) (la fila i corresponde al paso
+    i * stride), o None si alguna población se vuelve negativa, imprimiendo
+    INVALID_DISCRETE salvo con warn=False (para quien lo revisa afuera, por
+    ejemplo tras ResultCache.call, donde un None leído de la caché no avisa).
+
+    Con stepper (ver unit_step) cada paso es un paso de 1 del modelo
+    continuo con ese integrador en lugar del paso de Euler: "rk4" sigue al
+    modelo continuo con un error mucho menor y "patankar" nunca produce
+    negativos.
+    """
+    rows = t_max // stride + 1
+    if stepper is not None:
+        advance = unit_step(params, stepper)
+    if reducer is None:
+        result = trajectory_output(t_max, out, dtype, stride)
+    # Escalares de Python: más rápidos que los escalares de NumPy en el bucle
+    C, Z, M, D = (float(x) for x in init)
+    chunk = np.empty((min(CHUNK_SIZE, rows), 4))
+
+    def flush(written, filled):
+        if reducer is None:
+            result[written:written + filled] = chunk[:filled]
+        else:
+            reducer.update(np.arange(written, written + filled) * stride, chunk[:filled])
+
+    chunk[0] = C, Z, M, D
+    filled, written = 1, 0
+    reason, stop_step, reference = RUNNING, t_max, None
+    for step in range(1, t_max + 1):
+        u = pulse(step) if pulse is not None else 0
+        if stepper is None:
+            Ct1, Zt1, Mt1, Dt1 = discrete_step(C, Z, M, D, params, u)
+        else:
+            Ct1, Zt1, Mt1, Dt1 = advance(C, Z, M, D, u)
+        # También detecta el NaN de un stepper que diverge
+        if not (Ct1 >= 0 and Zt1 >= 0 and Mt1 >= 0 and Dt1 >= 0):
+            if warn:
+                print(INVALID_DISCRETE)
+            instrument.count("discrete_step", step)
+            return None
+        if stop is not None and step % stop.window == 0:
+            reason = stop.check((Ct1, Zt1, Mt1, Dt1), reference, (C, Z, M, D))
+            reference = (Ct1, Zt1, Mt1, Dt1)
+            if reason:
+                stop_step = step
+                increment = (Ct1 - C, Zt1 - Z, Mt1 - M, Dt1 - D)
+        C, Z, M, D = Ct1, Zt1, Mt1, Dt1
+        if step % stride == 0:
+            chunk[filled] = C, Z, M, D
+            filled += 1
+            if filled == len(chunk):
+                flush(written, filled)
+                written += filled
+                filled = 0
+        if reason:
+            break
+    flush(written, filled)
+    written += filled
+    # Una sola actualización por corrida: sin costo cuando está desactivado
+    instrument.count("discrete_step", stop_step if reason else t_max)
+
+    termination = {"reason": reason, "stop_step": stop_step}
+    if reducer is not None:
+        record = reducer.result()
+        if stop is not None:
+            record.update(termination)
+        return record
+    if reason:
+        # Filas que faltan, por bloques; offsets en pasos desde la detención
+        for start in range(written, rows, CHUNK_SIZE):
+            end = min(start + CHUNK_SIZE, rows)
+            offsets = np.arange(start, end) * stride - stop_step
+            result[start:end] = stop.fill(reason, (C, Z, M, D), increment, offsets)
+    if isinstance(result, np.memmap):
+        result.flush()
+    if stop is not None:
+        return result, termination
+    return result
+
+
+def simulate_discrete_ensemble(params, init, t_max, pulse=None, reducer=None, stepper=None):
+    """
+    Modelo discreto C-Z-M-D para N conjuntos de parámetros a la vez.
+
+    params es un array (8, N) (o una lista de 8 escalares o arrays (N,)) en
+    el orden de simulate_discrete, e init es (4,) o (4, N). El paso es el
+    mismo discrete_step, aplicado a todos los miembros juntos, o con stepper
+    un paso de 1 del modelo continuo (ver unit_step y simulate_discrete).
+
+    Un miembro cuya población se vuelve negativa (el caso en que
+    simulate_discrete devuelve None) queda marcado como inválido y sus
+    valores pasan a NaN desde ese paso.
+
+    Devuelve (valores (t_max + 1, 4, N), válidos (N,)). Con reducer (por
+    ejemplo SummaryStats(("C", "Z", "M", "D"))) no se guarda la trayectoria
+    y se devuelve reducer.result() con la clave "valid" agregada; las
+    estadísticas de los miembros inválidos no tienen sentido y deben
+    descartarse con esa máscara.
+    """
+    params = [np.asarray(p, dtype=float) for p in params]
+    n = np.broadcast_shapes(*(np.shape(p) for p in params), np.shape(init)[1:])
+    n = n[0] if n else 1
+    state = np.array(np.broadcast_to(np.asarray(init, dtype=float).reshape(4, -1), (4, n)))
+    valid = np.ones(n, dtype=bool)
+    if stepper is not None:
+        params = [np.broadcast_to(p, (n,)) for p in params]
+    advance = unit_step(params, stepper)
+
+    if reducer is None:
+        values = np.empty((t_max + 1, 4, n))
+        values[0] = state
+    else:
+        reducer.update([0.0], state[None])
+        buffer = np.empty((max(1, CHUNK_SIZE * 4 // n), 4, n))
+        filled = 0
+
+    for step in range(1, t_max + 1):
+        u = pulse(step) if pulse is not None else 0
+        state = np.array(advance(*state, u))
+        negative = ~(state >= 0).all(axis=0)
+        if negative.any():
+            valid &= ~negative
+            state[:, negative] = np.nan
+        if reducer is None:
+            values[step] = state
+        else:
+            buffer[filled] = state
+            filled += 1
+            if filled == len(buffer) or step == t_max:
+                reducer.update(np.arange(step - filled + 1, step + 1), buffer[:filled])
+                filled = 0
+
+    instrument.count("discrete_step", t_max * n)
+    if reducer is not None:
+        record = reducer.result()
+        record["valid"] = valid
+        return record
+    return values, valid
@@ -0,0 +1,316 @@
+import numpy as np
+
+from zombies.steppers import STEPPERS, lotka_volterra_system
+from zombies.termination import RUNNING
+
+# Parameters of the L-Z model, in the order used by discrete_lotka_volterra
+PARAM_NAMES = ("alpha", "beta", "rho", "gamma", "delta")
+
+# Rows filled per block after early termination
+FILL_ROWS = 256
+
+# Values (steps x compartments x members) buffered before each reducer update
+BUFFER_SIZE = 2**22
+
+
+def stack_param_sets(param_sets, repeat=1):
+    """
+    Stack a list of parameter dicts (as used in the scripts) into arrays.
+
+    Returns a dict mapping every key in PARAM_NAMES plus "L0" and "Z0" to a
+    float array of shape (len(param_sets) * repeat,). With repeat > 1 the whole
+    list is tiled, which is handy to run baseline and intervention copies of
+    the same sets side by side.
+    """
+    stacked = {}
+    for key in PARAM_NAMES + ("L0", "Z0"):
+        values = np.array([params[key] for params in param_sets], dtype=float)
+        stacked[key] = np.tile(values, repeat)
+    return stacked
+
+
+def pulse_mask(time_step, vaccine_period):
+    """
+    Boolean mask of the ensemble members that receive a pulse at time_step.
+
+    vaccine_period may be a scalar or an array with one period per member.
+    Returns None when no member is pulsed, so callers can skip the masked work.
+    """
+    if vaccine_period is None or time_step <= 0:
+        return None
+    active = np.asarray(time_step % vaccine_period == 0)
+    if not active.any():
+        return None
+    return active
+
+
+def discrete_lotka_volterra_ensemble(
+    L,
+    Z,
+    alpha,
+    beta,
+    rho,
+    gamma,
+    delta,
+    dt,
+    time_step=0,
+    vaccine_period=None,
+    vaccine_efficacy=0.0,
+    zombie_removal_ratio=0.0,
+):
+    """
+    Vectorized discrete-time Lotka-Volterra step for N members at once.
+
+    Every argument may be a scalar or an array of shape (N,). The update is the
+    same Euler step as discrete_lotka_volterra, including the max(0, ...) clamp.
+    Members whose vaccine_period divides time_step get both interventions used
+    in the scripts: gamma is reduced by vaccine_efficacy and a
+    zombie_removal_ratio fraction of Z is removed. Leave either at 0 to disable it.
+    """
+    effective_gamma = gamma
+    exogenous_zombie_remover = 0.0
+    active = pulse_mask(time_step, vaccine_period)
+    if active is not None:
+        effective_gamma = np.where(active, gamma * (1 - vaccine_efficacy), gamma)
+        exogenous_zombie_remover = np.where(active, zombie_removal_ratio * Z, 0.0)
+
+    # Update for L (prey)
+    dL = ((alpha - beta) * L - effective_gamma * L * Z) * dt
+    new_L = L + dL
+
+    # Update for Z (predator)
+    dZ = (rho * beta * L + (effective_gamma - delta) * L * Z) * dt - exogenous_zombie_remover
+    new_Z = Z + dZ
+
+    # Ensure populations don't go negative
+    return np.maximum(0, new_L), np.maximum(0, new_Z)
+
+
+def stepper_lotka_volterra_ensemble(
+    L,
+    Z,
+    alpha,
+    beta,
+    rho,
+    gamma,
+    delta,
+    dt,
+    time_step=0,
+    vaccine_period=None,
+    vaccine_efficacy=0.0,
+    zombie_removal_ratio=0.0,
+    stepper="patankar",
+):
+    """
+    discrete_lotka_volterra_ensemble with the Euler update replaced by one
+    step of stepper (a name in zombies.steppers.STEPPERS or a function with
+    its signature) on the continuous L-Z model. The interventions are the
+    same: pulsed members step with the reduced gamma and then lose the
+    zombie_removal_ratio fraction of Z. The max(0, ...) clamp is kept, but
+    "patankar" never needs it.
+    """
+    active = pulse_mask(time_step, vaccine_period)
+    if active is not None:
+        gamma = np.where(active, gamma * (1 - vaccine_efficacy), gamma)
+    system = lotka_volterra_system(alpha, beta, rho, gamma, delta)
+    y = np.stack(np.broadcast_arrays(np.asarray(L, dtype=float), np.asarray(Z, dtype=float)))
+    y, _ = STEPPERS.get(stepper, stepper)(system, time_step * dt, y, dt)
+    new_L, new_Z = y
+    if active is not None:
+        new_Z = new_Z - np.where(active, zombie_removal_ratio * Z, 0.0)
+    return np.maximum(0, new_L), np.maximum(0, new_Z)
+
+
+def _step_function(stepper):
+    """The ensemble step: discrete_lotka_volterra_ensemble, or its stepper variant."""
+    if stepper is None:
+        return discrete_lotka_volterra_ensemble
+
+    def step(*args):
+        return stepper_lotka_volterra_ensemble(*args, stepper=stepper)
+
+    return step
+
+
+def simulate_ensemble(
+    L0,
+    Z0,
+    alpha,
+    beta,
+    rho,
+    gamma,
+    delta,
+    dt,
+    time_steps,
+    vaccine_period=None,
+    vaccine_efficacy=0.0,
+    zombie_removal_ratio=0.0,
+    reducer=None,
+    stop=None,
+    stepper=None,
+):
+    """
+    Run N discrete L-Z simulations together for time_steps steps.
+
+    L0, Z0 and the model parameters are scalars or arrays of shape (N,).
+    Returns (L_values, Z_values), each of shape (time_steps, N), where row t
+    matches L_values[t] of the per-set loops in the scripts.
+
+    With a reducer (e.g. SummaryStats(("L", "Z"))) no trajectory is stored:
+    the state at time t * dt is passed to reducer.update after every step and
+    reducer.result() is returned instead.
+
+    With stop (a StopCriteria over ("L", "Z")) every member is checked each
+    stop.window steps. Terminated members are dropped from the stepping, so
+    the run ends as soon as all of them have stopped, and their remaining
+    rows are filled by StopCriteria.fill. A third value
+    {"reason": (N,) array, "stop_step": (N,) array} is then returned, or
+    added to the reducer record; with a reducer, the statistics of stopped
+    members cover the run up to their stop.
+
+    With stepper (e.g. "rk4" or "patankar") every step is taken by
+    stepper_lotka_volterra_ensemble instead of the Euler update of the
+    scripts, which allows a much larger dt at the same accuracy (see
+    zombies.steppers.patankar).
+    """
+    L0, Z0 = np.broadcast_arrays(
+        np.asarray(L0, dtype=float), np.asarray(Z0, dtype=float)
+    )
+    n = L0.shape[0] if L0.ndim else 1
+    params = (alpha, beta, rho, gamma, delta)
+    interventions = (vaccine_period, vaccine_efficacy, zombie_removal_ratio)
+    step = _step_function(stepper)
+    if stop is not None:
+        L0, Z0 = np.atleast_1d(L0), np.atleast_1d(Z0)
+        return _stop_ensemble(
+            L0, Z0, params, dt, time_steps, interventions, stop, reducer, step
+        )
+    if reducer is not None:
+        return _reduce_ensemble(
+            L0, Z0, params, dt, time_steps, interventions, reducer, step
+        )
+    L_values = np.zeros((time_steps, n))
+    Z_values = np.zeros((time_steps, n))
+    L_values[0] = L0
+    Z_values[0] = Z0
+
+    for t in range(1, time_steps):
+        L_values[t], Z_values[t] = step(
+            L_values[t - 1],
+            Z_values[t - 1],
+            alpha,
+            beta,
+            rho,
+            gamma,
+            delta,
+            dt,
+            t,
+            vaccine_period,
+            vaccine_efficacy,
+            zombie_removal_ratio,
+        )
+
+    return L_values, Z_values
+
+
+def _buffer_rows(n):
+    """Steps buffered before each reducer.update, bounded by BUFFER_SIZE values."""
+    return max(1, BUFFER_SIZE // (2 * n))
+
+
+def _reduce_ensemble(L, Z, params, dt, time_steps, interventions, reducer, step):
+    reducer.update([0.0], np.stack([L, Z])[None])
+    buffer = np.empty((_buffer_rows(len(L)), 2, len(L)))
+    filled = 0
+    for t in range(1, time_steps):
+        L, Z = step(L, Z, *params, dt, t, *interventions)
+        buffer[filled] = L, Z
+        filled += 1
+        if filled == len(buffer) or t == time_steps - 1:
+            reducer.update(np.arange(t - filled + 1, t + 1) * dt, buffer[:filled])
+            filled = 0
+    return reducer.result()
+
+
+def _members(values, keep):
+    """Per-member arguments restricted to the members in keep; scalars pass through."""
+    return [v[keep] if np.ndim(v) else v for v in values]
+
+
+def _stop_ensemble(L0, Z0, params, dt, time_steps, interventions, stop, reducer, step):
+    n = len(L0)
+    params = [np.broadcast_to(p, (n,)) if np.ndim(p) else p for p in params]
+    interventions = [np.broadcast_to(v, (n,)) if np.ndim(v) else v for v in interventions]
+    reason = np.full(n, RUNNING, dtype="<U7")
+    stop_step = np.full(n, time_steps - 1)
+
+    if reducer is None:
+        L_values = np.zeros((time_steps, n))
+        Z_values = np.zeros((time_steps, n))
+        L_values[0], Z_values[0] = L0, Z0
+        # Row t of a stopped member is base + t * slope (see fill_coefficients)
+        base = np.zeros((2, n))
+        slope = np.zeros((2, n))
+    else:
+        reducer.update([0.0], np.stack([L0, Z0])[None])
+        buffer = np.empty((_buffer_rows(n), 2, n))
+        filled = 0
+
+    # Only the members in active are stepped
+    active = np.arange(n)
+    L, Z, reference = L0, Z0, None
+    for t in range(1, time_steps):
+        new_L, new_Z = step(L, Z, *params, dt, t, *interventions)
+        m = len(active)
+        if reducer is None:
+            if m < n:
+                L_values[t], Z_values[t] = base + t * slope
+                L_values[t, active], Z_values[t, active] = new_L, new_Z
+            else:
+                L_values[t], Z_values[t] = new_L, new_Z
+        else:
+            # The buffer is flushed before every check, so it always holds
+            # the current active members
+            buffer[filled, :, :m] = new_L, new_Z
+            filled += 1
+            if filled == len(buffer) or t % stop.window == 0 or t == time_steps - 1:
+                times = np.arange(t - filled + 1, t + 1) * dt
+                members = None if m == n else active
+                reducer.update(times, buffer[:filled, :, :m], members)
+                filled = 0
+
+        if t % stop.window == 0:
+            state = np.stack([new_L, new_Z])
+            checked = stop.check(state, reference, np.stack([L, Z]))
+            done = checked != RUNNING
+            if done.any():
+                stopped = active[done]
+                reason[stopped] = checked[done]
+                stop_step[stopped] = t
+                if reducer is None:
+                    increment = state[:, done] - np.stack([L[done], Z[done]])
+                    b, s = stop.fill_coefficients(checked[done], state[:, done], increment)
+                    base[:, stopped] = b - t * s
+                    slope[:, stopped] = s
+                keep = ~done
+                active = active[keep]
+                if len(active) == 0:
+                    break
+                new_L, new_Z, state = new_L[keep], new_Z[keep], state[:, keep]
+                params = _members(params, keep)
+                interventions = _members(interventions, keep)
+            reference = state
+        L, Z = new_L, new_Z
+
+    termination = {"reason": reason, "stop_step": stop_step}
+    if reducer is not None:
+        record = reducer.result()
+        record.update(termination)
+        return record
+
+    # Every member stopped before the horizon: fill the remaining rows
+    for start in range(t + 1, time_steps, FILL_ROWS):
+        rows = np.arange(start, min(start + FILL_ROWS, time_steps))
+        tail = base + rows[:, None, None] * slope
+        L_values[rows], Z_values[rows] = tail[:, 0], tail[:, 1]
+    return L_values, Z_values, termination
@@ -0,0 +1,254 @@
+"""
+Ensemble forecasts summarized by streaming quantile bands.
+
+A forecast draws many parameter sets from distributions, runs them in
+batches through the vectorized simulators and keeps, for every time of a
+grid and every compartment, a quantile sketch and a running mean and
+variance (QuantileBands). Trajectories are never stored, so memory depends
+on the grid and the batch size but not on the number of members.
+
+The sketch is a merging digest in the spirit of the t-digest: each cell
+keeps centroids at fixed fractions of the probability mass, finer towards
+both tails (arcsine spacing), plus the exact minimum and maximum. A batch
+of samples is sorted and read at the same fractions, then merged with the
+centroids by sorting both digests together (each centroid weighted by the
+mass it stands for) and reading the new centroids off the merged quantile
+function, for all cells at once. A whole batch arrives at every
+update, so this replaces per-observation schemes such as P², which would
+need a Python loop per sample.
+"""
+import numpy as np
+
+from zombies.discrete import simulate_discrete_ensemble
+from zombies.ensemble import PARAM_NAMES, simulate_ensemble
+from zombies.models import COMPARTMENTS, CONTINUOUS_PARAM_NAMES
+
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+# Centroids per cell; estimated quantiles are within about 1 / CENTROIDS in rank
+CENTROIDS = 100
+
+# Members run together in every batch
+BATCH_SIZE = 1024
+
+
+class QuantileBands:
+    """
+    Online reducer of per-time quantiles, mean and standard deviation over
+    ensemble members, with the update/result interface of SummaryStats.
+
+    names are the compartment names and times the grid the bands are kept
+    on; samples at other times are skipped, so a coarse grid subsamples a
+    fine run. update() takes values (T, n_compartments, members) and may be
+    called many times per time (once per batch of members). NaN samples
+    (members of simulate_discrete_ensemble that went negative) are left out,
+    so every cell has its own count and the statistics describe only the
+    members that are valid at that time.
+    """
+
+    def __init__(self, names, times, quantiles=QUANTILES, centroids=CENTROIDS):
+        self.names = tuple(names)
+        self.times = np.asarray(times, dtype=float)
+        self.quantiles = np.asarray(quantiles, dtype=float)
+        shape = (len(self.times), len(self.names))
+        # Centroid k stands for the mass between edges[k] and edges[k + 1]
+        edges = (1 - np.cos(np.pi * np.arange(centroids + 1) / centroids)) / 2
+        self._fractions = np.diff(edges)
+        self._positions = (edges[:-1] + edges[1:]) / 2
+        self._centroids = np.full(shape + (centroids,), np.nan)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.min = np.full(shape, np.nan)
+        self.max = np.full(shape, np.nan)
+        self.mean = np.zeros(shape)
+        self._m2 = np.zeros(shape)
+
+    def _rows(self, t):
+        """Grid index of every sample time, -1 for times off the grid."""
+        t = np.asarray(t, dtype=float)
+        last = len(self.times) - 1
+        after = np.minimum(np.searchsorted(self.times, t), last)
+        before = np.maximum(after - 1, 0)
+        closer = np.abs(t - self.times[before]) < np.abs(t - self.times[after])
+        index = np.where(closer, before, after)
+        on_grid = np.isclose(self.times[index], t, rtol=1e-9, atol=1e-12)
+        return np.where(on_grid, index, -1)
+
+    def update(self, t, values):
+        """Add a block of samples: t (T,), values (T, n_compartments, members)."""
+        rows = self._rows(t)
+        keep = rows >= 0
+        if not keep.any():
+            return
+        rows = rows[keep]
+        values = np.asarray(values, dtype=float)[keep]
+        values = values.reshape(values.shape[:2] + (-1,))
+
+        n = (~np.isnan(values)).sum(axis=-1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.nansum(values, axis=-1) / n
+            m2 = np.nansum((values - mean[..., None]) ** 2, axis=-1)
+        mean = np.where(n > 0, mean, 0.0)
+        # Chan et al. pairwise update of count, mean and sum of squares
+        count = self.count[rows]
+        total = count + n
+        delta = mean - self.mean[rows]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            share = np.where(total > 0, n / total, 0.0)
+        self.mean[rows] += delta * share
+        self._m2[rows] += m2 + delta * delta * count * share
+        self.count[rows] = total
+        with np.errstate(all="ignore"):
+            self.min[rows] = np.fmin(self.min[rows], np.nanmin(values, axis=-1))
+            self.max[rows] = np.fmax(self.max[rows], np.nanmax(values, axis=-1))
+        self._centroids[rows] = self._merge(self._centroids[rows], count, values, n)
+
+    def _digest(self, values, n):
+        """Centroids of a batch: its quantile function read at the positions."""
+        ordered = np.sort(values, axis=-1)
+        index = np.clip(self._positions * n[..., None] - 0.5, 0, np.maximum(n - 1, 0)[..., None])
+        lo = index.astype(np.int64)
+        hi = np.minimum(lo + 1, np.maximum(n - 1, 0)[..., None])
+        x_lo = np.take_along_axis(ordered, lo, axis=-1)
+        x_hi = np.take_along_axis(ordered, hi, axis=-1)
+        return x_lo + (index - lo) * (x_hi - x_lo)
+
+    def _merge(self, centroids, count, values, n):
+        """
+        New centroids of the old ones (standing for count samples) and of
+        values (n samples that are not NaN per cell), per cell.
+        """
+        batch = self._digest(values, n)
+        if not count.any():
+            return batch
+        points = np.concatenate([centroids, batch], axis=-1).reshape(-1, 2 * len(self._positions))
+        weights = np.concatenate(
+            [count[..., None] * self._fractions, n[..., None] * self._fractions], axis=-1
+        ).reshape(points.shape)
+        order = np.argsort(points, axis=-1)
+        points = np.take_along_axis(points, order, axis=-1)
+        weights = np.take_along_axis(weights, order, axis=-1)
+
+        # Midpoint of the mass of every point; zero-weight points (of empty
+        # digests, NaN and sorted last) go to 1.5 so every row stays sorted,
+        # and offsetting row r by 2r lets one searchsorted serve all rows
+        cumulative = np.cumsum(weights, axis=-1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            position = np.where(weights > 0, (cumulative - weights / 2) / cumulative[:, -1:], 1.5)
+        offset = 2 * np.arange(len(points))[:, None]
+        hi = np.searchsorted((position + offset).ravel(), (self._positions + offset).ravel())
+        hi = hi.reshape(len(points), -1) - offset // 2 * points.shape[-1]
+        last = np.maximum((weights > 0).sum(axis=-1) - 1, 0)[:, None]
+        hi = np.minimum(hi, last)
+        lo = np.maximum(hi - 1, 0)
+        p_lo = np.take_along_axis(position, lo, axis=-1)
+        p_hi = np.take_along_axis(position, hi, axis=-1)
+        x_lo = np.take_along_axis(points, lo, axis=-1)
+        x_hi = np.take_along_axis(points, hi, axis=-1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            weight = np.where(hi > lo, np.clip((self._positions - p_lo) / (p_hi - p_lo), 0, 1), 0.0)
+        merged = (x_lo + weight * (x_hi - x_lo)).reshape(centroids.shape)
+        merged = np.where((count == 0)[..., None], batch, merged)
+        return np.where((n == 0)[..., None], centroids, merged)
+
+    def quantile(self, q):
+        """Estimated q-quantile (scalar in [0, 1]) of every cell, (times, compartments)."""
+        positions = np.concatenate([[0.0], self._positions, [1.0]])
+        points = np.concatenate(
+            [self.min[..., None], self._centroids, self.max[..., None]], axis=-1
+        )
+        hi = int(np.clip(np.searchsorted(positions, q), 1, len(positions) - 1))
+        weight = (q - positions[hi - 1]) / (positions[hi] - positions[hi - 1])
+        return points[..., hi - 1] + weight * (points[..., hi] - points[..., hi - 1])
+
+    def result(self):
+        """
+        Flat record like SummaryStats.result(): "time", "quantiles" and, per
+        compartment, "count_C" (members per time), "mean_C", "std_C" and
+        "bands_C" (quantiles x times). Cells without samples are NaN.
+        """
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = np.where(self.count > 0, self.mean, np.nan)
+            std = np.sqrt(self._m2 / (self.count - 1))
+        bands = np.stack([self.quantile(q) for q in self.quantiles])
+        record = {"time": self.times, "quantiles": self.quantiles}
+        for i, name in enumerate(self.names):
+            record[f"count_{name}"] = self.count[:, i]
+            record[f"mean_{name}"] = mean[:, i]
+            record[f"std_{name}"] = std[:, i]
+            record[f"bands_{name}"] = bands[:, :, i]
+        return record
+
+
+# ---------- Forecasts ----------
+def sample_params(params, distributions, n, rng, names=CONTINUOUS_PARAM_NAMES):
+    """
+    Parameter sets (len(params), n): row i is params[i] unless names[i] is
+    in distributions, which maps a name to a frozen scipy.stats
+    distribution (anything with rvs) or to (low, high) for a uniform draw.
+    """
+    unknown = set(distributions) - set(names)
+    if unknown:
+        raise ValueError(f"unknown parameters {sorted(unknown)}; expected {names}")
+    sets = np.repeat(np.asarray(params, dtype=float)[:, None], n, axis=1)
+    for name, distribution in distributions.items():
+        i = names.index(name)
+        if hasattr(distribution, "rvs"):
+            sets[i] = distribution.rvs(size=n, random_state=rng)
+        else:
+            sets[i] = rng.uniform(*distribution, size=n)
+    return sets
+
+
+def forecast_ensemble(
+    params,
+    init,
+    t_max,
+    members,
+    distributions=None,
+    model="czmd",
+    dt=1.0,
+    pulse=None,
+    every=1,
+    quantiles=QUANTILES,
+    batch_size=BATCH_SIZE,
+    seed=None,
+):
+    """
+    Ensemble forecast of members runs with parameters drawn by sample_params.
+
+    model "czmd" runs simulate_discrete_ensemble (params in the order of
+    CONTINUOUS_PARAM_NAMES, init = [C0, Z0, M0, D0], optional pulse) and
+    "lotka_volterra" runs simulate_ensemble (params in the order of
+    PARAM_NAMES, init = [L0, Z0], step dt). Members run batch_size at a time
+    into one QuantileBands kept every every-th step, so memory does not
+    grow with members. Returns its result() plus "members" and "invalid",
+    the number of members that went negative. Those leave the bands from
+    that step on (see the count_* entries), so the bands, means and
+    standard deviations are conditional on validity: the distribution of
+    the members still valid at each time, not of all members, and a large
+    "invalid" count should be reported with them.
+    """
+    if model == "czmd":
+        names, compartments = CONTINUOUS_PARAM_NAMES, COMPARTMENTS
+        steps, dt = t_max, 1.0
+    elif model == "lotka_volterra":
+        names, compartments = PARAM_NAMES, ("L", "Z")
+        steps = int(round(t_max / dt))
+    else:
+        raise ValueError('model must be "czmd" or "lotka_volterra"')
+    rng = np.random.default_rng(seed)
+    bands = QuantileBands(compartments, np.arange(0, steps + 1, every) * dt, quantiles)
+    invalid = 0
+    for start in range(0, members, batch_size):
+        n = min(batch_size, members - start)
+        sets = sample_params(params, distributions or {}, n, rng, names)
+        if model == "czmd":
+            result = simulate_discrete_ensemble(sets, init, steps, pulse, reducer=bands)
+            invalid += int((~result["valid"]).sum())
+        else:
+            L0, Z0 = np.full(n, float(init[0])), np.full(n, float(init[1]))
+            simulate_ensemble(L0, Z0, *sets, dt, steps + 1, reducer=bands)
+    record = bands.result()
+    record["members"] = members
+    record["invalid"] = invalid
+    return record
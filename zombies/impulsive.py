@@ -0,0 +1,128 @@
+import numpy as np
+from scipy.optimize import OptimizeResult
+
+from zombies import instrument
+
+
+def periodic_times(interval, t_span):
+    """Pulse times k * interval (k >= 1) that fall strictly inside t_span."""
+    t0, t_end = t_span
+    first = (np.floor(t0 / interval) + 1) * interval
+    return np.arange(first, t_end, interval)
+
+
+def additive_jump(index, magnitude):
+    """Jump that adds magnitude to component index (e.g. the military pulse on M)."""
+
+    def jump(t, y):
+        y = y.copy()
+        y[index] += magnitude
+        return y
+
+    return jump
+
+
+def proportional_jump(index, ratio):
+    """Jump that removes a fraction ratio of component index (e.g. zombie removal on Z)."""
+
+    def jump(t, y):
+        y = y.copy()
+        y[index] -= ratio * y[index]
+        return y
+
+    return jump
+
+
+def solve_impulsive(fun, t_span, y0, impulses, t_eval=None, method="RK45", **options):
+    """
+    Integrate an ODE with state jumps at scheduled times.
+
+    Instead of hiding a Dirac-like input inside the right-hand side, the
+    integration is split at every impulse time, the jump is applied to the
+    state directly and solve_ivp is restarted on the next segment. The RHS seen
+    by the solver is smooth on every segment, so it neither steps over the
+    pulse nor shrinks its step around it.
+
+    impulses is a sequence of (time, jump) pairs, where jump(t, y) returns the
+    state right after the pulse. Impulses at or outside the ends of t_span are
+    ignored. The solution is right-continuous: a t_eval point that coincides
+    with an impulse time reports the state after the jump.
+
+    Returns an OptimizeResult with the same t, y, nfev, njev, nlu, status,
+    message and success fields as solve_ivp, plus the impulse times applied.
+    """
+    t0, t_end = t_span
+    schedule = sorted(
+        ((float(time), jump) for time, jump in impulses if t0 < time < t_end),
+        key=lambda item: item[0],
+    )
+    boundaries = [t0] + [time for time, _ in schedule] + [t_end]
+    if t_eval is not None:
+        t_eval = np.asarray(t_eval, dtype=float)
+
+    y = np.asarray(y0, dtype=float)
+    ts, ys = [], []
+    nfev = njev = nlu = 0
+    sol = None
+    for k in range(len(boundaries) - 1):
+        a, b = boundaries[k], boundaries[k + 1]
+        last = k == len(boundaries) - 2
+
+        segment_eval = None
+        if t_eval is not None:
+            inside = (t_eval >= a) & ((t_eval <= b) if last else (t_eval < b))
+            # Always evaluate at b so the next segment starts from the exact end state
+            segment_eval = t_eval[inside]
+            if segment_eval.size == 0 or segment_eval[-1] != b:
+                segment_eval = np.append(segment_eval, b)
+
+        sol = instrument.solve_ivp(
+            "solve_impulsive", fun, (a, b), y, method=method, t_eval=segment_eval, **options
+        )
+        nfev += sol.nfev
+        njev += sol.njev
+        nlu += sol.nlu
+        if not sol.success:
+            break
+
+        seg_t, seg_y = sol.t, sol.y
+        if t_eval is not None:
+            keep = np.isin(seg_t, t_eval[inside])
+            seg_t, seg_y = seg_t[keep], seg_y[:, keep]
+        elif not last:
+            # The end point is repeated as the start of the next segment
+            seg_t, seg_y = seg_t[:-1], seg_y[:, :-1]
+        ts.append(seg_t)
+        ys.append(seg_y)
+
+        y = sol.y[:, -1]
+        if not last:
+            time, jump = schedule[k]
+            y = np.asarray(jump(time, y), dtype=float)
+
+    return OptimizeResult(
+        t=np.concatenate(ts) if ts else np.empty(0),
+        y=np.hstack(ys) if ys else np.empty((len(y), 0)),
+        nfev=nfev,
+        njev=njev,
+        nlu=nlu,
+        status=sol.status,
+        message=sol.message,
+        success=sol.success,
+        impulse_times=np.array([time for time, _ in schedule]),
+    )
+
+
+# ---------- Pulsos exógenos ----------
+def military_pulse(t, magnitude=10, interval=300):
+    """Simula una entrada tipo delta de Dirac como pulso discreto periódico."""
+    return magnitude if t % interval == 0 and t > 0 else 0
+
+
+def military_impulses(t_span, magnitude=10, interval=300):
+    """Pulsos militares como saltos en M para el integrador impulsivo.
+
+    Equivale a la entrada de military_pulse, que suma magnitude a dM/dt durante
+    una unidad de tiempo, pero aplicada como un salto instantáneo de M.
+    """
+    return [(tk, additive_jump(2, magnitude)) for tk in periodic_times(interval, t_span)]
@@ -0,0 +1,192 @@
+"""
+Opt-in instrumentation of the simulators and scripts.
+
+    ZOMBIES_PROFILE=results/profile.json python zombies_final_entrada_exogena.py
+
+With ZOMBIES_PROFILE set (to a .json or .csv path) a Profile is enabled when
+the package is imported and written at exit. It records
+- counters: steps taken by the discrete simulators and steppers,
+- solvers: per caller and method ("solve_model:LSODA"), the solve_ivp runs
+  with their RHS calls, nfev, njev, nlu, accepted steps, rejected steps and
+  wall time,
+- stages: wall time of named stages of a script (setup, integrate,
+  post-check, plot, save).
+
+When disabled every hook is a check of one module global: stage() returns
+a shared null context, solve_ivp() calls scipy directly, and the simulators
+count steps once per run rather than once per step.
+"""
+import atexit
+import contextlib
+import csv
+import json
+import os
+import time
+
+import scipy.integrate
+
+# Report path that enables instrumentation at import
+PROFILE_ENV = "ZOMBIES_PROFILE"
+
+# RHS evaluations per attempted step of the explicit Runge-Kutta methods;
+# every solve also evaluates the RHS twice to choose its first step
+RK_STAGES = {"RK23": 3, "RK45": 6}
+
+_NULL_STAGE = contextlib.nullcontext()
+_active = None
+
+
+class Profile:
+    """Counters, solver statistics and stage timers of one instrumented run."""
+
+    def __init__(self):
+        self.counters = {}
+        self.solvers = {}
+        self.stages = {}
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """Add the wall time of the block to stage name."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            calls, seconds = self.stages.get(name, (0, 0.0))
+            self.stages[name] = (calls + 1, seconds + time.perf_counter() - start)
+
+    def record_solve(self, name, method, stats, steps, seconds, rhs_calls=None):
+        """
+        Add one solve to the statistics of name with method, kept under
+        "name:method" so that each method has its own. stats is the solve_ivp
+        result or the OdeSolver (nfev, njev, nlu) and steps the number of
+        accepted steps. Rejected steps follow from the RHS evaluations for
+        the explicit Runge-Kutta methods and are left as None for the
+        others, whose rejections scipy does not report.
+        """
+        record = self.solvers.setdefault(f"{name}:{method}", {
+            "method": method,
+            "solves": 0,
+            "seconds": 0.0,
+            "rhs_calls": 0,
+            "nfev": 0,
+            "njev": 0,
+            "nlu": 0,
+            "steps": 0,
+            "rejected": 0 if method in RK_STAGES else None,
+        })
+        record["solves"] += 1
+        record["seconds"] += seconds
+        record["rhs_calls"] += int(stats.nfev) if rhs_calls is None else rhs_calls
+        for key in ("nfev", "njev", "nlu"):
+            record[key] += int(getattr(stats, key))
+        record["steps"] += steps
+        if record["rejected"] is not None:
+            attempts = (int(stats.nfev) - 2) // RK_STAGES[method]
+            record["rejected"] += max(attempts - steps, 0)
+
+    def solve_ivp(self, name, fun, t_span, y0, method="RK45", **options):
+        """scipy's solve_ivp, recording its statistics under name."""
+        solver_class = getattr(scipy.integrate, method) if isinstance(method, str) else method
+        steps = [0]
+
+        class Counted(solver_class):
+            def _step_impl(self):
+                success, message = super()._step_impl()
+                steps[0] += success
+                return success, message
+
+        rhs_calls = [0]
+
+        def rhs(t, y, *args):
+            rhs_calls[0] += 1
+            return fun(t, y, *args)
+
+        start = time.perf_counter()
+        sol = scipy.integrate.solve_ivp(rhs, t_span, y0, method=Counted, **options)
+        self.record_solve(
+            name, getattr(method, "__name__", method), sol, steps[0],
+            time.perf_counter() - start, rhs_calls[0],
+        )
+        return sol
+
+    def report(self):
+        return {
+            "counters": dict(self.counters),
+            "solvers": {name: dict(record) for name, record in self.solvers.items()},
+            "stages": {
+                name: {"calls": calls, "seconds": seconds}
+                for name, (calls, seconds) in self.stages.items()
+            },
+        }
+
+    def rows(self):
+        """The report as flat (section, name, field, value) rows."""
+        rows = [("counters", name, "calls", n) for name, n in self.counters.items()]
+        for name, record in self.solvers.items():
+            rows += [("solvers", name, key, value) for key, value in record.items()]
+        for name, (calls, seconds) in self.stages.items():
+            rows += [("stages", name, "calls", calls), ("stages", name, "seconds", seconds)]
+        return rows
+
+    def write(self, path):
+        """Write the report as CSV rows when path ends in .csv, else as JSON."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", newline="") as file:
+            if path.endswith(".csv"):
+                writer = csv.writer(file)
+                writer.writerow(("section", "name", "field", "value"))
+                writer.writerows(self.rows())
+            else:
+                json.dump(self.report(), file, indent=2)
+        return path
+
+
+# ---------- Global switch ----------
+def enable(profile=None):
+    """Start recording into profile (a new Profile by default) and return it."""
+    global _active
+    _active = profile or Profile()
+    return _active
+
+
+def disable():
+    """Stop recording; returns the profile that was active, or None."""
+    global _active
+    profile, _active = _active, None
+    return profile
+
+
+def active():
+    """The Profile being recorded into, or None when instrumentation is off."""
+    return _active
+
+
+# ---------- Hooks ----------
+def count(name, n=1):
+    if _active is not None:
+        _active.count(name, n)
+
+
+def stage(name):
+    """Context manager timing a stage of a script when enabled."""
+    return _NULL_STAGE if _active is None else _active.stage(name)
+
+
+def solve_ivp(name, fun, t_span, y0, method="RK45", **options):
+    """scipy's solve_ivp; when enabled its statistics are recorded under name."""
+    if _active is None:
+        return scipy.integrate.solve_ivp(fun, t_span, y0, method=method, **options)
+    return _active.solve_ivp(name, fun, t_span, y0, method=method, **options)
+
+
+def record_solve(name, method, stats, steps, seconds):
+    """Record a solve driven outside solve_ivp (see Profile.record_solve)."""
+    if _active is not None:
+        _active.record_solve(name, method, stats, steps, seconds)
+
+
+if os.environ.get(PROFILE_ENV):
+    atexit.register(enable().write, os.environ[PROFILE_ENV])
@@ -0,0 +1,146 @@
+import numpy as np
+
+
+def _jacobian_like(y, n):
+    """Zero (n, n) Jacobian, with a trailing batch axis when y is (n, k)."""
+    return np.zeros((n, n) + np.shape(y)[1:])
+
+
+# ---------- L-Z model ----------
+def discrete_lotka_volterra(
+    L,
+    Z,
+    alpha,
+    beta,
+    rho,
+    gamma,
+    delta,
+    dt,
+    time_step=0,
+    vaccine_period=None,
+    vaccine_efficacy=0.0,
+    zombie_removal_ratio=0.0,
+):
+    """
+    Discrete-time version of the Lotka-Volterra model.
+    Uses Euler method to discretize the continuous equations.
+
+    Every vaccine_period time steps two Dirac delta-like interventions can be
+    applied: gamma is reduced by vaccine_efficacy, and a zombie_removal_ratio
+    fraction of the zombie population is removed. With the defaults the plain
+    model is stepped.
+    """
+    effective_gamma = gamma
+    exogenous_zombie_remover = 0
+    if vaccine_period is not None and time_step % vaccine_period == 0 and time_step > 0:
+        effective_gamma = gamma * (1 - vaccine_efficacy)
+        exogenous_zombie_remover = zombie_removal_ratio * Z
+
+    # Update for L (prey)
+    dL = ((alpha - beta) * L - effective_gamma * L * Z) * dt
+    new_L = L + dL
+
+    # Update for Z (predator)
+    dZ = (rho * beta * L + (effective_gamma - delta) * L * Z) * dt - exogenous_zombie_remover
+    new_Z = Z + dZ
+
+    return max(0, new_L), max(0, new_Z)  # Ensure populations don't go negative
+
+
+def lotka_volterra(t, y, alpha, beta, rho, gamma, delta):
+    """
+    Continuous L-Z model. y has shape (2,) or (2, k) for vectorized=True.
+    """
+    L, Z = y
+    dLdt = (alpha - beta) * L - gamma * L * Z
+    dZdt = rho * beta * L + (gamma - delta) * L * Z
+    return np.array([dLdt, dZdt])
+
+
+def lotka_volterra_jacobian(t, y, alpha, beta, rho, gamma, delta):
+    """Analytic Jacobian of lotka_volterra with respect to (L, Z)."""
+    L, Z = y
+    J = _jacobian_like(y, 2)
+    J[0, 0] = (alpha - beta) - gamma * Z
+    J[0, 1] = -gamma * L
+    J[1, 0] = rho * beta + (gamma - delta) * Z
+    J[1, 1] = (gamma - delta) * L
+    return J
+
+
+# ---------- Sistema C-Z-M-D ----------
+# Parámetros en el orden de la lista params, y compartimentos del estado
+CONTINUOUS_PARAM_NAMES = (
+    "alpha", "beta", "beta_CZ", "epsilon_CZ", "beta_MZ", "gamma_MZ", "E", "rho",
+)
+
+COMPARTMENTS = ("C", "Z", "M", "D")
+
+def discrete_step(C, Z, M, D, params, pulse=0):
+    """
+    Un paso del modelo discreto C-Z-M-D (paso implícito de 1).
+    pulse es la entrada exógena de militares en este paso.
+    """
+    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
+    Ct1 = C + (alpha - beta - E) * C - beta_CZ * C * Z
+    Zt1 = Z + (beta_CZ - epsilon_CZ) * C * Z + rho * beta * (C + M) + (beta_MZ - gamma_MZ) * Z * M
+    Mt1 = M + E * C - beta * M - beta_MZ * Z * M + pulse
+    Dt1 = D + (1 - rho) * beta * (C + M) + epsilon_CZ * C * Z + gamma_MZ * Z * M
+    return Ct1, Zt1, Mt1, Dt1
+
+
+def continuous_model(t, y, params):
+    """
+    Continuous C-Z-M-D model. params is the list
+    [alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho] and y has
+    shape (4,) or (4, k) for vectorized=True.
+    """
+    C, Z, M, D = y
+    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
+    dC = (alpha - beta - E) * C - beta_CZ * C * Z
+    dZ = (beta_CZ - epsilon_CZ) * C * Z + rho * beta * (C + M) + (beta_MZ - gamma_MZ) * Z * M
+    dM = E * C - beta * M - beta_MZ * Z * M
+    dD = (1 - rho) * beta * (C + M) + epsilon_CZ * C * Z + gamma_MZ * Z * M
+    return np.array([dC, dZ, dM, dD])
+
+
+def continuous_jacobian(t, y, params):
+    """Analytic Jacobian of continuous_model with respect to (C, Z, M, D)."""
+    C, Z, M, D = y
+    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
+    J = _jacobian_like(y, 4)
+    J[:3, :3] = czm_jacobian(t, y[:3], params)
+    J[3, 0] = (1 - rho) * beta + epsilon_CZ * Z
+    J[3, 1] = epsilon_CZ * C + gamma_MZ * M
+    J[3, 2] = (1 - rho) * beta + gamma_MZ * Z
+    return J
+
+
+# ---------- Sistema C-Z-M (sin muertos) ----------
+def czm_model(t, y, params):
+    """
+    C-Z-M part of the system, as used for the phase portraits. Same params
+    list as continuous_model; y has shape (3,) or (3, k).
+    """
+    C, Z, M = y
+    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
+    dCdt = (alpha - beta - E) * C - beta_CZ * C * Z
+    dZdt = (beta_CZ - epsilon_CZ) * C * Z + rho * beta * (C + M) + (beta_MZ - gamma_MZ) * Z * M
+    dMdt = E * C - beta * M - beta_MZ * Z * M
+    return np.array([dCdt, dZdt, dMdt])
+
+
+def czm_jacobian(t, y, params):
+    """Analytic Jacobian of czm_model (the matrix in the README)."""
+    C, Z, M = y
+    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
+    J = _jacobian_like(y, 3)
+    J[0, 0] = (alpha - beta - E) - beta_CZ * Z
+    J[0, 1] = -beta_CZ * C
+    J[1, 0] = (beta_CZ - epsilon_CZ) * Z + rho * beta
+    J[1, 1] = (beta_CZ - epsilon_CZ) * C + (beta_MZ - gamma_MZ) * M
+    J[1, 2] = rho * beta + (beta_MZ - gamma_MZ) * Z
+    J[2, 0] = E
+    J[2, 1] = -beta_MZ * M
+    J[2, 2] = -beta - beta_MZ * Z
+    return J
@@ -0,0 +1,158 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import scipy.sparse
+from scipy.integrate import solve_ivp
+from scipy.optimize import OptimizeResult
+
+from zombies.continuous import IMPLICIT_METHODS, JACOBIANS, solve_model
+
+# Rows of a direction field evaluated at once
+TILE_ROWS = 128
+
+
+def block_jacobian(jac, n, k, args=()):
+    """
+    Sparse Jacobian of k stacked copies of an n-dimensional model, for a
+    state laid out component-major (component i of copy j at i * k + j).
+    jac is the analytic Jacobian of one copy, evaluated batched on (n, k).
+    """
+    i, j = np.divmod(np.arange(n * n), n)
+    rows = (i[:, None] * k + np.arange(k)).ravel()
+    cols = (j[:, None] * k + np.arange(k)).ravel()
+
+    def stacked(t, y):
+        values = jac(t, y.reshape(n, k), *args).reshape(n * n * k)
+        return scipy.sparse.csc_matrix((values, (rows, cols)), shape=(n * k, n * k))
+
+    return stacked
+
+
+def solve_many(fun, t_span, inits, args=(), t_eval=None, method="BDF", **options):
+    """
+    Integrate one of the models in zombies.models from many initial
+    conditions as a single stacked system.
+
+    inits is (k, n). The k copies are advanced together through one
+    vectorized right-hand side; implicit methods get the block-diagonal
+    analytic Jacobian as a sparse matrix, so each Newton solve costs O(k).
+    All copies share the step size, which is set by the hardest one. BDF is
+    the default: with the sparse Jacobian it is much faster here than LSODA,
+    which needs a dense Jacobian.
+
+    Returns the solve_ivp result with y reshaped to (n, k, len(t)), so
+    sol.y[:, j] is the trajectory started from inits[j].
+    """
+    inits = np.atleast_2d(np.asarray(inits, dtype=float))
+    k, n = inits.shape
+
+    def stacked(t, y):
+        return np.asarray(fun(t, y.reshape(n, k), *args)).reshape(n * k)
+
+    if method in IMPLICIT_METHODS and method != "LSODA" and "jac" not in options:
+        options["jac"] = block_jacobian(JACOBIANS[fun], n, k, args)
+    sol = solve_ivp(stacked, t_span, inits.T.ravel(), method=method, t_eval=t_eval, **options)
+    sol.y = sol.y.reshape(n, k, -1)
+    return sol
+
+
+def _solve_batch(fun, t_span, inits, args, t_eval, method, options):
+    return [
+        solve_model(fun, t_span, init, args=args, method=method, t_eval=t_eval, **options)
+        for init in inits
+    ]
+
+
+def solve_pool(
+    fun,
+    t_span,
+    inits,
+    args=(),
+    t_eval=None,
+    method="LSODA",
+    workers=None,
+    batch_size=64,
+    **options,
+):
+    """
+    Integrate every initial condition separately with solve_model, in
+    batches of batch_size over a pool of workers processes (all cores by
+    default). Every trajectory keeps its own step size and tolerances, at
+    the price of one solver per trajectory; t_eval is required so the
+    results can be aligned.
+
+    Returns an OptimizeResult with t, y of shape (n, k, len(t_eval)) (NaN
+    for failed trajectories), the per-trajectory "success" mask and the total
+    "nfev".
+    """
+    inits = np.atleast_2d(np.asarray(inits, dtype=float))
+    t_eval = np.asarray(t_eval, dtype=float)
+    batches = [inits[i:i + batch_size] for i in range(0, len(inits), batch_size)]
+    task = (args, t_eval, method, options)
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(batches) == 1:
+        results = [_solve_batch(fun, t_span, batch, *task) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_solve_batch, fun, t_span, batch, *task) for batch in batches]
+            results = [future.result() for future in futures]
+
+    sols = [sol for batch in results for sol in batch]
+    y = np.full((inits.shape[1], len(inits), len(t_eval)), np.nan)
+    for j, sol in enumerate(sols):
+        if sol.success:
+            y[:, j] = sol.y
+    return OptimizeResult(
+        t=t_eval,
+        y=y,
+        success=np.array([sol.success for sol in sols]),
+        nfev=sum(sol.nfev for sol in sols),
+    )
+
+
+def plane_field(
+    fun,
+    state,
+    x_index,
+    y_index,
+    extent=(0, 1000, 0, 1000),
+    resolution=20,
+    args=(),
+    tile_rows=TILE_ROWS,
+    cache=None,
+):
+    """
+    Direction field of fun on a plane of the state space.
+
+    state gives the values of the components held fixed; x_index and
+    y_index vary over extent = (x_min, x_max, y_min, y_max) on a
+    resolution x resolution grid. The field is evaluated tile_rows grid rows
+    at a time with the vectorized model, so high resolutions only hold the
+    output arrays and one tile in memory.
+
+    With cache (a ResultCache) fields are stored per parameters, plane and
+    resolution and later calls read them from disk.
+
+    Returns (x, y, dx, dy): the grid axes (resolution,) and the two
+    components (resolution, resolution) as expected by streamplot.
+    """
+    if cache is not None:
+        return cache.call(
+            plane_field, fun, list(state), x_index, y_index, tuple(extent),
+            resolution, args, tile_rows,
+        )
+    x = np.linspace(extent[0], extent[1], resolution)
+    y = np.linspace(extent[2], extent[3], resolution)
+    dx = np.empty((resolution, resolution))
+    dy = np.empty((resolution, resolution))
+    for start in range(0, resolution, tile_rows):
+        rows = y[start:start + tile_rows]
+        tile = np.empty((len(state), len(rows), resolution))
+        tile[:] = np.reshape(state, (-1, 1, 1))
+        tile[x_index] = x
+        tile[y_index] = rows[:, None]
+        derivatives = fun(0, tile, *args)
+        dx[start:start + len(rows)] = derivatives[x_index]
+        dy[start:start + len(rows)] = derivatives[y_index]
+    return x, y, dx, dy
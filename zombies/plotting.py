@@ -0,0 +1,207 @@
+"""
+Plotting helpers for the scripts.
+
+matplotlib is only imported when a figure is actually made, so importing
+zombies (or this module) from a worker process costs NumPy/SciPy only.
+
+With ZOMBIES_HEADLESS set (or after use_headless()) figures are drawn with
+the non-interactive Agg backend and finish_figure never calls plt.show(),
+so scripts run in batch jobs without a display and without blocking; the
+figures they would only have shown are saved to results/ instead.
+"""
+import itertools
+import os
+import sys
+
+import numpy as np
+
+from zombies import instrument
+
+RESULTS_DIR = "results"
+
+HEADLESS_ENV = "ZOMBIES_HEADLESS"
+
+# Numbers the figures finish_figure saves without a name when headless
+_unnamed = itertools.count(1)
+
+
+def _pyplot():
+    if headless():
+        import matplotlib
+
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    return plt
+
+
+def headless():
+    """True when figures are rendered with Agg and never shown."""
+    return bool(os.environ.get(HEADLESS_ENV))
+
+
+def use_headless():
+    """Render with Agg from now on, in this process and in its workers."""
+    os.environ[HEADLESS_ENV] = "1"
+    return _pyplot()
+
+
+def script_name(path):
+    """Script filename without directory or extension, used to name figures."""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def new_figure(figsize=(12, 8)):
+    return _pyplot().figure(figsize=figsize)
+
+
+# ---------- Decimation ----------
+def minmax_decimate(x, y, columns):
+    """
+    Keep the first, last, minimum and maximum sample of every one of columns
+    equal-width bins of x (the M4 scheme). Drawn as a line at that many
+    pixel columns the result is indistinguishable from the full series, and
+    peaks, dips and extinctions are never smoothed away. x must be sorted.
+    Returns (x, y) with at most 4 * columns samples.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if len(x) <= 4 * columns or x[-1] == x[0]:
+        return x, y
+    bins = np.minimum(((x - x[0]) / (x[-1] - x[0]) * columns).astype(int), columns - 1)
+    starts = np.flatnonzero(np.diff(bins, prepend=-1))
+    ends = np.append(starts[1:], len(x)) - 1
+    # Samples sorted by value within their bin: minimum first, maximum last
+    order = np.lexsort((y, bins))
+    keep = np.unique(np.concatenate([starts, ends, order[starts], order[ends]]))
+    return x[keep], y[keep]
+
+
+def lttb(x, y, points):
+    """
+    Largest-Triangle-Three-Buckets downsampling to points samples: the first
+    and last samples plus, from each bucket in between, the one forming the
+    largest triangle with the previous pick and the mean of the next bucket.
+    Smoother than minmax_decimate for the same budget but keeps fewer extrema.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if points >= n or points < 3:
+        return x, y
+    # Bucket i is [bounds[i], bounds[i + 1]); the last one is the final sample
+    bounds = np.append(np.linspace(1, n - 1, points - 1).astype(int), n)
+    keep = np.zeros(points, dtype=int)
+    keep[-1] = n - 1
+    a = 0
+    for i in range(points - 2):
+        lo, hi, nxt = bounds[i], bounds[i + 1], bounds[i + 2]
+        xc, yc = x[hi:nxt].mean(), y[hi:nxt].mean()
+        area = np.abs((x[a] - xc) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (yc - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return x[keep], y[keep]
+
+
+def decimate(x, y, columns, method="minmax"):
+    """Downsample a curve for columns pixel columns with minmax_decimate or lttb."""
+    if method == "lttb":
+        return lttb(x, y, 2 * columns)
+    return minmax_decimate(x, y, columns)
+
+
+def plot_series(
+    ax,
+    time,
+    series,
+    title,
+    xlabel="Time",
+    ylabel="Population",
+    decimation="minmax",
+):
+    """
+    Draw several population curves on ax. series is a list of
+    (values, style, label) tuples; style None uses the default color cycle.
+
+    Curves longer than the axes are wide in pixels are decimated first
+    ("minmax" or "lttb", see decimate); decimation=None draws every sample.
+    """
+    columns = max(int(ax.bbox.width), 1)
+    for values, style, label in series:
+        if decimation is not None:
+            time_drawn, values = decimate(time, values, columns, decimation)
+        else:
+            time_drawn = time
+        if style is None:
+            ax.plot(time_drawn, values, label=label)
+        else:
+            ax.plot(time_drawn, values, style, label=label)
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    ax.legend()
+    ax.grid(True)
+
+
+def plot_fan(
+    ax,
+    forecast,
+    name,
+    title=None,
+    color="C0",
+    xlabel="Time",
+    ylabel="Population",
+    labels=("Median", "Mean"),
+):
+    """
+    Fan chart of compartment name of an ensemble forecast (the record of
+    zombies.forecast.forecast_ensemble or QuantileBands.result()): the
+    outermost pair of quantiles is the palest band, every inner pair is
+    shaded darker, and the median (when kept) and the mean are drawn as lines
+    labelled with labels.
+    """
+    time = forecast["time"]
+    quantiles = list(forecast["quantiles"])
+    bands = forecast[f"bands_{name}"]
+    pairs = len(quantiles) // 2
+    for k in range(pairs):
+        low, high = quantiles[k], quantiles[-1 - k]
+        ax.fill_between(
+            time,
+            bands[k],
+            bands[-1 - k],
+            color=color,
+            alpha=0.6 / pairs,
+            linewidth=0,
+            label=f"{low:.0%}-{high:.0%}",
+        )
+    if 0.5 in quantiles:
+        ax.plot(time, bands[quantiles.index(0.5)], color=color, label=labels[0])
+    ax.plot(time, forecast[f"mean_{name}"], "--", color=color, label=labels[1])
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(name if title is None else title)
+    ax.legend()
+    ax.grid(True)
+
+
+def finish_figure(fig, name=None, show=True, results_dir=RESULTS_DIR):
+    """
+    Lay out fig, save it as results_dir/name.png when a name is given and
+    optionally block on plt.show(). When headless nothing is shown, and a
+    figure without a name is saved as <script>_<n>.png (n counting them) so
+    it is not lost. Returns the saved path, or None.
+    """
+    with instrument.stage("plot"):
+        fig.tight_layout()
+    if name is None and headless():
+        name = f"{script_name(sys.argv[0]) or 'figure'}_{next(_unnamed)}"
+    path = None
+    if name is not None:
+        with instrument.stage("save"):
+            os.makedirs(results_dir, exist_ok=True)
+            path = os.path.join(results_dir, f"{name}.png")
+            fig.savefig(path)
+    if show and not headless():
+        _pyplot().show()
+    return path
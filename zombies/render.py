@@ -0,0 +1,83 @@
+"""
+Headless figure rendering over a process pool.
+
+A figure job is (name, draw, args) or (name, draw, args, kwargs): draw is a
+module-level function building and returning a figure (series_figure, or a
+script's own), so jobs can be sent to worker processes. Every job is drawn
+with the Agg backend and saved as results_dir/name.png; nothing is shown.
+Scripts hand their figures to show_figures, which renders them this way
+when headless and draws and shows them otherwise.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from zombies.plotting import (
+    RESULTS_DIR,
+    finish_figure,
+    headless,
+    new_figure,
+    plot_series,
+    use_headless,
+)
+
+
+def series_figure(
+    time,
+    series,
+    title,
+    xlabel="Time",
+    ylabel="Population",
+    figsize=(10, 5),
+    decimation="minmax",
+):
+    """One plot_series panel, e.g. a run against its baseline."""
+    fig = new_figure(figsize=figsize)
+    plot_series(fig.add_subplot(1, 1, 1), time, series, title, xlabel, ylabel, decimation)
+    return fig
+
+
+def _render(job, results_dir):
+    plt = use_headless()
+    name, draw, args = job[:3]
+    fig = draw(*args, **(job[3] if len(job) > 3 else {}))
+    try:
+        return finish_figure(fig, name, show=False, results_dir=results_dir)
+    finally:
+        plt.close(fig)
+
+
+def _render_batch(jobs, results_dir):
+    return [_render(job, results_dir) for job in jobs]
+
+
+def render_figures(jobs, workers=None, results_dir=RESULTS_DIR, batch_size=8):
+    """
+    Render figure jobs in batches of batch_size over a pool of workers
+    processes (all cores by default; workers=1 renders in this process).
+    Returns the saved paths in job order.
+    """
+    jobs = list(jobs)
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(batches) <= 1:
+        results = [_render_batch(batch, results_dir) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_render_batch, batch, results_dir) for batch in batches]
+            results = [future.result() for future in futures]
+    return [path for batch in results for path in batch]
+
+
+def show_figures(jobs, workers=None, results_dir=RESULTS_DIR):
+    """
+    The figures of a script: with ZOMBIES_HEADLESS they go through
+    render_figures and the saved paths are returned; otherwise every job is
+    drawn here and all are shown together, without saving.
+    """
+    if headless():
+        return render_figures(jobs, workers, results_dir)
+    for i, job in enumerate(jobs):
+        fig = job[1](*job[2], **(job[3] if len(job) > 3 else {}))
+        # plt.show() after the last one shows them all at once
+        finish_figure(fig, show=i == len(jobs) - 1)
+    return []
@@ -0,0 +1,321 @@
+"""
+Declarative scenarios: model, parameters, initial state, horizon,
+integrator and interventions in a TOML or JSON file.
+
+    name = "coexistencia"
+    model = "czmd"              # or "lotka_volterra"
+    integrator = "discrete"     # discrete, continuous or a stepper: rk4, ...
+    method = "LSODA"            # solve_ivp method of integrator = "continuous"
+    dt = 1.0
+    t_max = 1500
+
+    [params]
+    alpha = 0.033
+    ...
+
+    [init]
+    C = 48
+    ...
+
+    [interventions]
+    military_magnitude = 10
+    military_interval = 300
+
+    [sweep]
+    "params.alpha" = [0.02, 0.033, 0.05]
+    "interventions.military_interval" = { start = 100, stop = 500, num = 5 }
+
+Every combination of the sweep values (or, with sweep_mode = "zip", the
+values taken side by side) is one run. run_scenario executes the runs over
+a process pool and reduces each to a SummaryStats record.
+"""
+import csv
+import functools
+import itertools
+import json
+import os
+import tomllib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from zombies.continuous import solver_options
+from zombies.discrete import simulate_discrete
+from zombies.ensemble import simulate_ensemble
+from zombies.impulsive import (
+    military_impulses,
+    military_pulse,
+    periodic_times,
+    proportional_jump,
+    solve_impulsive,
+)
+from zombies.models import continuous_model, lotka_volterra
+from zombies.steppers import (
+    STEPPERS,
+    continuous_system,
+    lotka_volterra_system,
+    pulse_jump,
+    simulate_steps,
+)
+from zombies.store import ResultStore
+from zombies.summary import SummaryStats
+
+# Parameters, compartments and interventions (with their defaults) per model
+MODELS = {
+    "lotka_volterra": {
+        "params": ("alpha", "beta", "rho", "gamma", "delta"),
+        "compartments": ("L", "Z"),
+        "interventions": {
+            "vaccine_period": None,
+            "vaccine_efficacy": 0.0,
+            "zombie_removal_ratio": 0.0,
+        },
+    },
+    "czmd": {
+        "params": ("alpha", "beta", "beta_CZ", "epsilon_CZ", "beta_MZ", "gamma_MZ", "E", "rho"),
+        "compartments": ("C", "Z", "M", "D"),
+        "interventions": {"military_magnitude": 0, "military_interval": 300},
+    },
+}
+
+INTEGRATORS = ("discrete", "continuous") + tuple(STEPPERS)
+
+SECTIONS = ("params", "init", "interventions")
+
+DEFAULTS = {
+    "name": "scenario",
+    "integrator": "discrete",
+    "method": "LSODA",
+    "dt": 1.0,
+    "sweep_mode": "product",
+}
+
+# Runs per task sent to a worker process
+BATCH_SIZE = 16
+
+
+# ---------- Files ----------
+def load_scenario(path):
+    """Read a scenario from a .toml or .json file and validate it."""
+    if path.endswith(".json"):
+        with open(path) as file:
+            scenario = json.load(file)
+    else:
+        with open(path, "rb") as file:
+            scenario = tomllib.load(file)
+    scenario.setdefault("name", os.path.splitext(os.path.basename(path))[0])
+    return validate(scenario)
+
+
+def validate(scenario):
+    """
+    Fill in the defaults of a scenario dict and check it. Raises ValueError
+    naming the first problem found.
+    """
+    scenario = {**DEFAULTS, **scenario}
+    unknown = set(scenario) - set(DEFAULTS) - {"model", "t_max", "sweep"} - set(SECTIONS)
+    if unknown:
+        raise ValueError(f"unknown scenario keys: {', '.join(sorted(unknown))}")
+    if scenario.get("model") not in MODELS:
+        raise ValueError(f"model must be one of {', '.join(MODELS)}")
+    if "t_max" not in scenario:
+        raise ValueError("t_max is required")
+    if scenario["sweep_mode"] not in ("product", "zip"):
+        raise ValueError('sweep_mode must be "product" or "zip"')
+
+    model = MODELS[scenario["model"]]
+    scenario["interventions"] = {**model["interventions"], **scenario.get("interventions", {})}
+    scenario["sweep"] = dict(scenario.get("sweep", {}))
+    cannot = set(scenario["sweep"]) - _sweepable(model)
+    if cannot:
+        raise ValueError(f"cannot sweep {', '.join(sorted(cannot))}")
+    for section in SECTIONS:
+        given = scenario.setdefault(section, {})
+        names = _names(model, section)
+        if set(given) - set(names):
+            raise ValueError(f"unknown {section}: {', '.join(sorted(set(given) - set(names)))}")
+        missing = [
+            name for name in names
+            if name not in given and f"{section}.{name}" not in scenario["sweep"]
+        ]
+        if missing:
+            raise ValueError(f"missing {section}: {', '.join(missing)}")
+    return scenario
+
+
+def _names(model, section):
+    return model["compartments"] if section == "init" else tuple(model[section])
+
+
+def _sweepable(model):
+    keys = {f"{section}.{name}" for section in SECTIONS for name in _names(model, section)}
+    return keys | {"dt", "t_max", "method", "integrator"}
+
+
+def _check(run):
+    """Checks that depend on values a sweep may change."""
+    if run["integrator"] not in INTEGRATORS:
+        raise ValueError(f"integrator must be one of {', '.join(INTEGRATORS)}")
+    interventions = run["interventions"]
+    if run["model"] == "czmd" and run["integrator"] == "discrete" and run["dt"] != 1:
+        raise ValueError("the discrete C-Z-M-D model has dt = 1")
+    if run["model"] == "lotka_volterra" and run["integrator"] != "discrete":
+        if interventions["vaccine_efficacy"]:
+            raise ValueError("vaccine_efficacy is only modeled by the discrete integrator")
+        if interventions["zombie_removal_ratio"] and run["integrator"] != "continuous":
+            raise ValueError("zombie removal is not available with the steppers")
+
+
+# ---------- Sweeps ----------
+def sweep_values(spec):
+    """Values of one sweep entry: a list, or {start, stop, num[, log]} spaced evenly."""
+    if isinstance(spec, dict):
+        space = np.geomspace if spec.get("log") else np.linspace
+        return space(spec["start"], spec["stop"], spec["num"]).tolist()
+    return list(spec)
+
+
+def expand(scenario):
+    """
+    The runs of a validated scenario: copies without the sweep, with the
+    swept values set, their "index" and the swept "values" themselves.
+    """
+    keys = list(scenario["sweep"])
+    columns = [sweep_values(scenario["sweep"][key]) for key in keys]
+    if scenario["sweep_mode"] == "zip":
+        if len({len(c) for c in columns}) > 1:
+            raise ValueError("zip sweeps need the same number of values per key")
+        combinations = zip(*columns)
+    else:
+        combinations = itertools.product(*columns)
+
+    runs = []
+    for index, combination in enumerate(combinations):
+        run = {key: value for key, value in scenario.items() if key != "sweep"}
+        for section in SECTIONS:
+            run[section] = dict(run[section])
+        for key, value in zip(keys, combination):
+            section, _, name = key.rpartition(".")
+            (run[section] if section else run)[name] = value
+        run["index"] = index
+        run["values"] = dict(zip(keys, combination))
+        _check(run)
+        runs.append(run)
+    return runs
+
+
+# ---------- Runs ----------
+def simulate(run):
+    """
+    Trajectory of one run: (t (T,), values (T, n_compartments), valid), with
+    valid False when the integration failed or a population went negative.
+    """
+    model = MODELS[run["model"]]
+    params = [float(run["params"][name]) for name in model["params"]]
+    init = np.array([run["init"][name] for name in model["compartments"]], dtype=float)
+    interventions = run["interventions"]
+    dt, integrator = float(run["dt"]), run["integrator"]
+    steps = int(round(run["t_max"] / dt))
+    t = np.arange(steps + 1) * dt
+
+    if run["model"] == "lotka_volterra":
+        period = interventions["vaccine_period"]
+        if integrator == "discrete":
+            L, Z = simulate_ensemble(
+                *init, *params, dt, steps + 1, period,
+                interventions["vaccine_efficacy"], interventions["zombie_removal_ratio"],
+            )
+            values = np.stack([L[:, 0], Z[:, 0]], axis=1)
+        elif integrator == "continuous":
+            impulses = []
+            if period is not None and interventions["zombie_removal_ratio"]:
+                jump = proportional_jump(1, interventions["zombie_removal_ratio"])
+                impulses = [(tk, jump) for tk in periodic_times(period * dt, (0, t[-1]))]
+            return _continuous(lotka_volterra, t, init, impulses, tuple(params), run["method"])
+        else:
+            values, _ = simulate_steps(lotka_volterra_system(*params), init, dt, steps, integrator)
+        return t, values, bool(np.all(values >= 0))
+
+    magnitude = interventions["military_magnitude"]
+    interval = interventions["military_interval"]
+    pulse = None
+    if magnitude:
+        pulse = functools.partial(military_pulse, magnitude=magnitude, interval=interval)
+    if integrator == "discrete":
+        # Invalid runs are reported through valid, not printed by every worker
+        values = simulate_discrete(params, init, steps, pulse=pulse, warn=False)
+        if values is None:
+            return t, np.full((len(t), len(init)), np.nan), False
+        return t, values, True
+    if integrator == "continuous":
+        impulses = military_impulses((0, t[-1]), magnitude, interval) if magnitude else []
+        return _continuous(continuous_model, t, init, impulses, (params,), run["method"])
+    jump = pulse_jump(pulse, 2) if pulse is not None else None
+    values, _ = simulate_steps(continuous_system(params), init, dt, steps, integrator, jump)
+    return t, values, bool(np.all(values >= 0))
+
+
+def _continuous(fun, t, init, impulses, args, method):
+    sol = solve_impulsive(
+        fun, (t[0], t[-1]), init, impulses, t_eval=t, args=args, **solver_options(fun, method)
+    )
+    if not sol.success:
+        return t, np.full((len(t), len(init)), np.nan), False
+    return t, sol.y.T, bool(np.all(sol.y >= 0))
+
+
+def summarize(run):
+    """
+    SummaryStats record of one run (see SummaryStats.result) with its
+    "index", swept values and "valid" flag; statistics are NaN when invalid.
+    """
+    t, values, valid = simulate(run)
+    stats = SummaryStats(MODELS[run["model"]]["compartments"])
+    stats.update(t, values)
+    record = {"index": run["index"], **run["values"], "valid": valid}
+    for key, value in stats.result().items():
+        if key != "samples":
+            record[key] = float(value) if valid else float("nan")
+    return record
+
+
+def _summarize_batch(runs):
+    return [summarize(run) for run in runs]
+
+
+def run_scenario(scenario, workers=None, batch_size=BATCH_SIZE):
+    """
+    Expand a validated scenario and summarize every run, in batches of
+    batch_size runs over a pool of workers processes (all cores by default).
+    Returns the records in run order.
+    """
+    runs = expand(scenario)
+    batches = [runs[i:i + batch_size] for i in range(0, len(runs), batch_size)]
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(batches) <= 1:
+        results = [_summarize_batch(batch) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_summarize_batch, batches))
+    return [record for batch in results for record in batch]
+
+
+def write_records(records, path, index=()):
+    """
+    Write records as CSV when path ends in .csv, append them to a ResultStore
+    (with a sorted index on the index columns) when it ends in .store, else
+    write them as a JSON list.
+    """
+    if path.endswith(".store"):
+        with ResultStore(path, index=index) as store:
+            store.append(records)
+        return path
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w", newline="") as file:
+        if path.endswith(".csv"):
+            writer = csv.DictWriter(file, fieldnames=list(records[0]) if records else [])
+            writer.writeheader()
+            writer.writerows(records)
+        else:
+            json.dump(records, file, indent=2)
+    return path
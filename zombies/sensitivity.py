@@ -0,0 +1,228 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from scipy.stats import qmc
+
+from zombies.continuous import summarize_model
+from zombies.discrete import simulate_discrete_ensemble
+from zombies.models import COMPARTMENTS, CONTINUOUS_PARAM_NAMES, continuous_model
+from zombies.summary import SummaryStats
+
+# Parameter sets per task sent to a worker process
+BATCH_SIZE = 2048
+
+
+def parameter_bounds(params, spread=0.5):
+    """
+    Bounds (k, 2) of +/- spread (relative) around a params list, e.g. the
+    "condiciones coexistencia" of zombies_sistema_final.py. rho is a fraction
+    and is kept inside [0, 1].
+    """
+    params = np.asarray(params, dtype=float)
+    bounds = np.stack([params * (1 - spread), params * (1 + spread)], axis=1)
+    if len(params) == len(CONTINUOUS_PARAM_NAMES):
+        bounds[CONTINUOUS_PARAM_NAMES.index("rho")] = np.clip(
+            bounds[CONTINUOUS_PARAM_NAMES.index("rho")], 0, 1
+        )
+    return bounds
+
+
+def _scale(unit, bounds):
+    bounds = np.asarray(bounds, dtype=float)
+    return bounds[:, 0] + unit * (bounds[:, 1] - bounds[:, 0])
+
+
+# ---------- Designs ----------
+def saltelli_sample(bounds, n, seed=None):
+    """
+    Saltelli design for first-order and total Sobol indices.
+
+    Two independent scrambled Sobol matrices A and B (n x k) are drawn and,
+    for every parameter i, the matrix AB_i equal to A with column i taken from
+    B. Returns the samples (n * (k + 2), k) stacked as [A, B, AB_1, ..., AB_k]
+    in the order sobol_indices expects; n should be a power of two.
+    """
+    bounds = np.asarray(bounds, dtype=float)
+    k = len(bounds)
+    base = qmc.Sobol(2 * k, scramble=True, seed=seed).random(n)
+    A, B = base[:, :k], base[:, k:]
+    blocks = [A, B]
+    for i in range(k):
+        AB = A.copy()
+        AB[:, i] = B[:, i]
+        blocks.append(AB)
+    return _scale(np.concatenate(blocks), bounds)
+
+
+def morris_sample(bounds, trajectories, levels=4, seed=None):
+    """
+    Morris elementary-effects design: trajectories one-at-a-time paths of
+    k + 1 points on a levels-point grid, each moving every parameter once by
+    levels / (2 * (levels - 1)) of its range. Returns (trajectories * (k + 1), k).
+    """
+    bounds = np.asarray(bounds, dtype=float)
+    k = len(bounds)
+    rng = np.random.default_rng(seed)
+    delta = levels / (2 * (levels - 1))
+    # Lower triangular steps: row j has moved the first j factors
+    steps = np.tril(np.ones((k + 1, k)), -1)
+    # Base points leave room for +delta on the grid {0, 1/(levels-1), ..., 1}
+    starts = np.arange(levels // 2) / (levels - 1)
+    paths = []
+    for _ in range(trajectories):
+        x = rng.choice(starts, size=k)
+        signs = rng.choice([-1, 1], size=k)
+        order = rng.permutation(k)
+        # Column j of steps moves factor order[j]; negative directions start
+        # at x + delta and step down
+        path = np.empty((k + 1, k))
+        path[:, order] = x[order] + delta * np.where(signs[order] > 0, steps, 1 - steps)
+        paths.append(path)
+    return _scale(np.concatenate(paths), bounds)
+
+
+# ---------- Indices ----------
+def sobol_indices(outputs, k, resamples=0, seed=None):
+    """
+    First-order (Saltelli 2010) and total (Jansen) Sobol indices from model
+    outputs evaluated on a saltelli_sample design, in the same order.
+
+    outputs is (n * (k + 2),) or a dict of such arrays (one per output name,
+    as returned by evaluate_discrete). Rows whose evaluations are not finite
+    (invalid parameter sets) are dropped from all matrices. With resamples > 0
+    bootstrap 95% half-widths are added as "S1_conf" and "ST_conf".
+    """
+    if isinstance(outputs, dict):
+        return {name: sobol_indices(y, k, resamples, seed) for name, y in outputs.items()}
+    y = np.asarray(outputs, dtype=float).reshape(k + 2, -1)
+    y = y[:, np.isfinite(y).all(axis=0)]
+    indices = _sobol(y)
+    if resamples:
+        rng = np.random.default_rng(seed)
+        draws = [_sobol(y[:, rng.integers(0, y.shape[1], y.shape[1])]) for _ in range(resamples)]
+        for name in ("S1", "ST"):
+            indices[f"{name}_conf"] = 1.96 * np.std([d[name] for d in draws], axis=0)
+    return indices
+
+
+def _sobol(y):
+    fA, fB, fAB = y[0], y[1], y[2:]
+    variance = np.var(np.concatenate([fA, fB]))
+    if variance == 0:
+        zeros = np.zeros(len(fAB))
+        return {"S1": zeros, "ST": zeros.copy()}
+    S1 = np.mean(fB * (fAB - fA), axis=1) / variance
+    ST = 0.5 * np.mean((fA - fAB) ** 2, axis=1) / variance
+    return {"S1": S1, "ST": ST}
+
+
+def morris_indices(samples, outputs, bounds):
+    """
+    Elementary-effect statistics mu, mu_star (mean absolute effect) and sigma
+    per parameter, from outputs evaluated on a morris_sample design. Effects
+    are taken in units of the parameter range; trajectories with non-finite
+    outputs are skipped. outputs may also be a dict of arrays.
+    """
+    if isinstance(outputs, dict):
+        return {name: morris_indices(samples, y, bounds) for name, y in outputs.items()}
+    bounds = np.asarray(bounds, dtype=float)
+    k = len(bounds)
+    unit = (samples - bounds[:, 0]) / (bounds[:, 1] - bounds[:, 0])
+    unit = unit.reshape(-1, k + 1, k)
+    y = np.asarray(outputs, dtype=float).reshape(-1, k + 1)
+    keep = np.isfinite(y).all(axis=1)
+    unit, y = unit[keep], y[keep]
+
+    dx = np.diff(unit, axis=1)
+    factor = np.abs(dx).argmax(axis=2)
+    step = np.take_along_axis(dx, factor[..., None], axis=2)[..., 0]
+    effects = np.empty((len(y), k))
+    np.put_along_axis(effects, factor, np.diff(y, axis=1) / step, axis=1)
+    return {
+        "mu": effects.mean(axis=0),
+        "mu_star": np.abs(effects).mean(axis=0),
+        "sigma": effects.std(axis=0, ddof=1) if len(effects) > 1 else np.zeros(k),
+    }
+
+
+# ---------- Batched evaluation ----------
+def _discrete_batch(samples, init, t_max, outputs, pulse):
+    record = simulate_discrete_ensemble(
+        samples.T, init, t_max, pulse=pulse, reducer=SummaryStats(COMPARTMENTS)
+    )
+    valid = record["valid"]
+    return {name: np.where(valid, record[name], np.nan) for name in outputs}
+
+
+def _continuous_batch(samples, init, t_max, outputs, method):
+    values = {name: np.empty(len(samples)) for name in outputs}
+    for j, params in enumerate(samples):
+        record = summarize_model(
+            continuous_model,
+            (0, t_max),
+            init,
+            SummaryStats(COMPARTMENTS),
+            args=(list(params),),
+            method=method,
+        )
+        failed = record["status"] != "finished" or min(record[f"min_{c}"] for c in COMPARTMENTS) < 0
+        for name in outputs:
+            values[name][j] = np.nan if failed else record[name]
+    return values
+
+
+def _evaluate(batch, samples, args, workers, batch_size):
+    samples = np.asarray(samples, dtype=float)
+    tasks = [samples[i:i + batch_size] for i in range(0, len(samples), batch_size)]
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(tasks) == 1:
+        results = [batch(task, *args) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(batch, tasks, *([arg] * len(tasks) for arg in args)))
+    return {name: np.concatenate([r[name] for r in results]) for name in results[0]}
+
+
+def evaluate_discrete(
+    samples,
+    init,
+    t_max,
+    outputs=("final_C", "max_Z"),
+    pulse=None,
+    workers=None,
+    batch_size=BATCH_SIZE,
+):
+    """
+    Evaluate simulate_discrete for every parameter set (row) of samples.
+
+    Rows are split into batches of batch_size that are stepped together with
+    simulate_discrete_ensemble and reduced with SummaryStats, one batch per
+    task on a pool of workers processes (all cores by default). outputs are
+    SummaryStats keys such as "final_C" (final civilians) or "max_Z" (peak
+    zombies). Returns a dict of arrays (len(samples),), NaN where the
+    parameter set gives a negative population. pulse must be picklable (e.g.
+    military_pulse) when workers > 1.
+    """
+    return _evaluate(
+        _discrete_batch, samples, (init, t_max, tuple(outputs), pulse), workers, batch_size
+    )
+
+
+def evaluate_continuous(
+    samples,
+    init,
+    t_max,
+    outputs=("final_C", "max_Z"),
+    method="LSODA",
+    workers=None,
+    batch_size=64,
+):
+    """
+    Evaluate the continuous C-Z-M-D model for every parameter set of samples
+    with summarize_model, batch_size sets per task over workers processes.
+    Outputs are as in evaluate_discrete; failed or negative solutions give NaN.
+    """
+    return _evaluate(
+        _continuous_batch, samples, (init, t_max, tuple(outputs), method), workers, batch_size
+    )
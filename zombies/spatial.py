@@ -0,0 +1,265 @@
+"""
+Reaction-diffusion version of the C-Z-M system on a 2-D grid.
+
+Every cell runs the czm_model reaction terms (the system of
+trayectorias_3d.py) and each population diffuses with its own coefficient:
+
+    du/dt = czm_model(u) + D * Laplacian(u),    u = (C, Z, M)
+
+The two parts are advanced by Strang splitting: half a diffusion step, a
+reaction step (one of zombies.steppers) and another half diffusion step.
+Diffusion is solved either spectrally, exactly in time for the 5-point
+Laplacian (FFT for periodic boundaries, DCT for no-flux ones), or by
+backward Euler with a prefactorized sparse Laplacian. Grids are plain
+(3, ny, nx) arrays; 2048 x 2048 fits in about 100 MB per state.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+import scipy.fft
+import scipy.sparse
+import scipy.sparse.linalg
+
+from zombies.models import czm_model
+from zombies.steppers import STEPPERS
+
+BOUNDARIES = ("neumann", "periodic")
+
+# Snapshots per block written to the output
+SNAPSHOT_CHUNK = 16
+
+
+# ---------- Grids ----------
+def point_outbreak(shape, background, zombies, center=None, radius=2):
+    """
+    Initial grid (3, ny, nx) with every cell at background = (C, Z, M) and
+    zombies added to Z inside a disc of radius cells around center (the
+    middle of the grid by default).
+    """
+    ny, nx = shape
+    cy, cx = center if center is not None else (ny // 2, nx // 2)
+    u = np.empty((3, ny, nx))
+    u[:] = np.reshape(background, (3, 1, 1))
+    y, x = np.ogrid[:ny, :nx]
+    u[1][(y - cy) ** 2 + (x - cx) ** 2 <= radius ** 2] += zombies
+    return u
+
+
+def laplacian(shape, h=1.0, boundary="neumann"):
+    """Sparse 5-point Laplacian of a (ny, nx) grid with spacing h, row-major."""
+
+    def second_difference(n):
+        D = scipy.sparse.diags([np.ones(n - 1), -2 * np.ones(n), np.ones(n - 1)], [-1, 0, 1]).tolil()
+        if boundary == "periodic":
+            D[0, n - 1] = D[n - 1, 0] = 1
+        else:
+            D[0, 0] = D[n - 1, n - 1] = -1
+        return D.tocsr()
+
+    ny, nx = shape
+    Dy, Dx = second_difference(ny), second_difference(nx)
+    return (scipy.sparse.kron(Dy, scipy.sparse.identity(nx))
+            + scipy.sparse.kron(scipy.sparse.identity(ny), Dx)).tocsc() / h**2
+
+
+def laplacian_eigenvalues(shape, h=1.0, boundary="neumann"):
+    """
+    Eigenvalues of laplacian() on the spectral grid: the rfft2 layout for
+    periodic boundaries and the DCT-II layout for no-flux ones.
+    """
+    ny, nx = shape
+    if boundary == "periodic":
+        ky, kx = np.fft.fftfreq(ny), np.fft.rfftfreq(nx)
+    else:
+        ky, kx = np.arange(ny) / (2 * ny), np.arange(nx) / (2 * nx)
+    lam_y = -(2 / h * np.sin(np.pi * ky)) ** 2
+    lam_x = -(2 / h * np.sin(np.pi * kx)) ** 2
+    return lam_y[:, None] + lam_x[None, :]
+
+
+# ---------- Diffusion ----------
+def spectral_diffusion(shape, diffusion, tau, h=1.0, boundary="neumann", threads=1):
+    """
+    Exact diffusion over time tau of a (3, ny, nx) grid with coefficients
+    diffusion = (D_C, D_Z, D_M), as a function u -> u(tau). Uses scipy.fft
+    with threads workers.
+    """
+    decay = np.exp(np.reshape(diffusion, (3, 1, 1)) * tau * laplacian_eigenvalues(shape, h, boundary))
+    axes = (-2, -1)
+    if boundary == "periodic":
+        def diffuse(u):
+            spectrum = scipy.fft.rfft2(u, axes=axes, workers=threads)
+            return scipy.fft.irfft2(spectrum * decay, s=shape, axes=axes, workers=threads)
+    else:
+        def diffuse(u):
+            spectrum = scipy.fft.dctn(u, type=2, axes=axes, norm="ortho", workers=threads)
+            return scipy.fft.idctn(spectrum * decay, type=2, axes=axes, norm="ortho", workers=threads)
+    return diffuse
+
+
+def implicit_diffusion(shape, diffusion, tau, h=1.0, boundary="neumann"):
+    """
+    Backward-Euler diffusion over tau with the sparse Laplacian. The systems
+    I - tau D Laplacian are factorized once, so every step is three sparse
+    triangular solves; memory grows faster than the grid, so prefer the
+    spectral solver beyond about 1024 x 1024.
+    """
+    A = laplacian(shape, h, boundary)
+    identity = scipy.sparse.identity(A.shape[0], format="csc")
+    solvers = [
+        scipy.sparse.linalg.factorized((identity - tau * d * A).tocsc()) if d > 0 else None
+        for d in diffusion
+    ]
+
+    def diffuse(u):
+        out = np.array(u, dtype=float)
+        for i, solve in enumerate(solvers):
+            if solve is not None:
+                out[i] = solve(out[i].ravel()).reshape(shape)
+        return out
+
+    return diffuse
+
+
+# ---------- Reaction ----------
+def _reaction(params, dt, stepper, pool=None, threads=1):
+    stepper = STEPPERS.get(stepper, stepper)
+
+    def react_rows(u, rows=slice(None)):
+        local = [p[rows] if np.ndim(p) == 2 else p for p in params]
+        return stepper({"fun": lambda t, y: czm_model(t, y, local)}, 0.0, u, dt)[0]
+
+    if pool is None:
+        return react_rows
+
+    def react(u):
+        # NumPy releases the GIL inside the elementwise kernels
+        blocks = [slice(b[0], b[-1] + 1) for b in np.array_split(np.arange(u.shape[1]), threads)]
+        parts = pool.map(lambda rows: react_rows(u[:, rows], rows), blocks)
+        return np.concatenate(list(parts), axis=1)
+
+    return react
+
+
+# ---------- Simulation ----------
+def simulate_reaction_diffusion(
+    u0,
+    params,
+    diffusion,
+    dt,
+    steps,
+    h=1.0,
+    boundary="neumann",
+    method="spectral",
+    stepper="ssprk3",
+    snapshot_every=None,
+    out=None,
+    dtype=np.float32,
+    threads=1,
+):
+    """
+    Advance the C-Z-M reaction-diffusion system from u0 (3, ny, nx).
+
+    params is the usual list [alpha, beta, beta_CZ, epsilon_CZ, beta_MZ,
+    gamma_MZ, E, rho]; entries may be (ny, nx) arrays for heterogeneous
+    landscapes. diffusion = (D_C, D_Z, D_M) in length^2 per time with grid
+    spacing h. Every step of dt is diffusion (dt / 2), reaction (dt, with a
+    stepper from zombies.steppers, clamped at zero; the default ssprk3 needs
+    three evaluations of the reaction terms) and diffusion (dt / 2);
+    method is "spectral" (spectral_diffusion) or "implicit"
+    (implicit_diffusion). threads > 1 runs the FFTs and row blocks of the
+    reaction on that many threads.
+
+    Every snapshot_every steps (and at step 0) the state is stored as dtype;
+    with out a path, snapshots are written SNAPSHOT_CHUNK at a time to a .npy
+    mapped in memory, so long runs on large grids are limited by disk, not
+    RAM. Returns (times, snapshots (n, 3, ny, nx), final state), or
+    (None, None, final state) without snapshot_every.
+    """
+    u = np.array(u0, dtype=float)
+    shape = u.shape[1:]
+    if boundary not in BOUNDARIES:
+        raise ValueError(f"boundary must be one of {', '.join(BOUNDARIES)}")
+    if method == "spectral":
+        half = spectral_diffusion(shape, diffusion, dt / 2, h, boundary, threads)
+        full = spectral_diffusion(shape, diffusion, dt, h, boundary, threads)
+    elif method == "implicit":
+        half = implicit_diffusion(shape, diffusion, dt / 2, h, boundary)
+
+        def full(u):
+            return half(half(u))
+    else:
+        raise ValueError('method must be "spectral" or "implicit"')
+    pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+    react = _reaction(params, dt, stepper, pool, threads)
+
+    times = snapshots = None
+    if snapshot_every:
+        count = steps // snapshot_every + 1
+        size = (count,) + u.shape
+        if out is None:
+            snapshots = np.empty(size, dtype=dtype)
+        else:
+            snapshots = np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=size)
+        times = np.arange(count) * snapshot_every * dt
+        chunk = np.empty((min(SNAPSHOT_CHUNK, count),) + u.shape, dtype=dtype)
+        chunk[0] = u
+        filled, written = 1, 0
+
+    # The closing and opening half steps of consecutive steps are merged into
+    # one full diffusion step unless the state is needed in between
+    u = half(u)
+    try:
+        for step in range(1, steps + 1):
+            u = np.maximum(react(u), 0.0)
+            snapshot = snapshot_every and step % snapshot_every == 0
+            if step < steps and not snapshot:
+                u = full(u)
+                continue
+            u = half(u)
+            if snapshot:
+                chunk[filled] = u
+                filled += 1
+                if filled == len(chunk):
+                    snapshots[written:written + filled] = chunk[:filled]
+                    written += filled
+                    filled = 0
+            if step < steps:
+                u = half(u)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    if snapshot_every:
+        snapshots[written:written + filled] = chunk[:filled]
+        if isinstance(snapshots, np.memmap):
+            snapshots.flush()
+    return times, snapshots, u
+
+
+def front_radius(Z, threshold, h=1.0):
+    """
+    Radius of the zombie front: sqrt(area where Z > threshold / pi), for a
+    grid (ny, nx) or snapshots (..., ny, nx).
+    """
+    area = (np.asarray(Z) > threshold).sum(axis=(-2, -1)) * h**2
+    return np.sqrt(area / np.pi)
+
+
+def _simulate(kwargs):
+    return simulate_reaction_diffusion(**kwargs)
+
+
+def simulate_fronts(runs, workers=None):
+    """
+    Run many independent scenarios, each a dict of
+    simulate_reaction_diffusion arguments, over a pool of workers processes
+    (all cores by default). Give every run an out path to keep large
+    snapshots on disk instead of sending them back. Returns the results in
+    run order.
+    """
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(runs) == 1:
+        return [_simulate(kwargs) for kwargs in runs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_simulate, runs))
@@ -0,0 +1,198 @@
+import numpy as np
+
+# Long-run regimes, as labels of the classifier output
+EXTINCTION = "extinction"  # humans decline even without zombies
+TAKEOVER = "zombie takeover"  # zombies grow until humans die out
+COEXISTENCE = "coexistence"  # humans grow, zombies settle at a finite level
+SURVIVAL = "human survival"  # humans grow and zombies die out
+
+REGIMES = (EXTINCTION, TAKEOVER, COEXISTENCE, SURVIVAL)
+
+
+def eigenvalues(jac, states, args=()):
+    """
+    Eigenvalues of a model Jacobian at a batch of states (n, ...), e.g.
+    czm_jacobian at the fixed points of many parameter sets; parameters in
+    args may be arrays broadcasting with the batch axes. Returns (..., n).
+    """
+    J = np.asarray(jac(0, np.asarray(states, dtype=float), *args))
+    return np.linalg.eigvals(np.moveaxis(J, (0, 1), (-2, -1)))
+
+
+def _take(args, mask, k):
+    """args restricted to the points in mask (see batched_newton)."""
+    if isinstance(args, (list, tuple)):
+        return type(args)(_take(a, mask, k) for a in args)
+    if np.ndim(args) and np.shape(args)[-1] == k:
+        return np.asarray(args)[..., mask]
+    return args
+
+
+def batched_newton(fun, jac, guesses, args=(), tol=1e-10, max_iter=50):
+    """
+    Newton's method for fun(t, y, *args) = 0 from many starting points at
+    once. guesses is (n, k) and fun/jac are batched models (RHS of shape
+    (n, k), Jacobian (n, n, k)); arrays in args (also inside lists such as
+    a params list) whose last axis has length k hold one value per point.
+    Returns (roots (n, k), converged (k,)); points whose Jacobian is
+    singular stop where they are.
+    """
+    y = np.array(guesses, dtype=float)
+    k = y.shape[1]
+    converged = np.zeros(k, dtype=bool)
+    for _ in range(max_iter):
+        active = ~converged
+        if not active.any():
+            break
+        points = _take(args, active, k)
+        f = np.asarray(fun(0, y[:, active], *points))
+        J = np.moveaxis(np.asarray(jac(0, y[:, active], *points)), (0, 1), (-2, -1))
+        solvable = np.abs(np.linalg.det(J)) > 0
+        step = np.zeros_like(f)
+        if solvable.any():
+            step[:, solvable] = np.linalg.solve(J[solvable], f.T[solvable, :, None])[..., 0].T
+        y[:, active] -= step
+        index = np.flatnonzero(active)
+        converged[index] = (np.abs(step) <= tol * (1 + np.abs(y[:, active]))).all(axis=0)
+        converged[index[~solvable]] = False
+    return y, converged
+
+
+# ---------- L-Z model ----------
+def lotka_volterra_regimes(alpha, beta, rho, gamma, delta):
+    """
+    Closed-form fixed-point analysis of lotka_volterra for arrays of
+    parameters (broadcast together, e.g. grids from np.meshgrid).
+
+    With L = 0 every (0, Z) is a fixed point; while humans are present the
+    Z nullcline is Z_level = rho * beta / (delta - gamma) (infinite when
+    gamma >= delta, zombies then grow without bound). The Jacobian at
+    (0, Z_level) has eigenvalues (growth, 0), where growth =
+    alpha - beta - gamma * Z_level is the human growth rate once the zombies
+    have settled: positive means humans survive (coexistence, or human
+    survival when Z_level = 0), negative a zombie takeover.
+
+    Returns a dict with "regime" (string array), "Z_level", "growth" and
+    "eigenvalues" (..., 2).
+    """
+    alpha, beta, rho, gamma, delta = np.broadcast_arrays(
+        *(np.asarray(p, dtype=float) for p in (alpha, beta, rho, gamma, delta))
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        Z_level = np.where(gamma < delta, rho * beta / (delta - gamma), np.inf)
+        growth = np.where(np.isinf(Z_level), -np.inf, alpha - beta - gamma * Z_level)
+    regime = np.select(
+        [alpha - beta <= 0, growth <= 0, Z_level == 0],
+        [EXTINCTION, TAKEOVER, SURVIVAL],
+        default=COEXISTENCE,
+    )
+    return {
+        "regime": regime,
+        "Z_level": Z_level,
+        "growth": growth,
+        "eigenvalues": np.stack([growth, np.zeros_like(growth)], axis=-1),
+    }
+
+
+# ---------- Sistema C-Z-M ----------
+# Starting zombie levels of the Newton search for balanced growth states
+BALANCED_GUESSES = (0.0, 1.0, 10.0, 100.0)
+
+
+def _balanced_rhs(t, y, params):
+    """
+    Balanced growth of czm_model: with m = M / C, zombies stop changing
+    (dZ/dt = C times the first row) and the ratio m stops changing (second
+    row) while C and M grow or decay together at rate alpha - beta - E -
+    beta_CZ Z. y is (Z, m), batched like czm_model.
+    """
+    Z, m = y
+    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
+    growth = alpha - beta - E - beta_CZ * Z
+    return np.array([
+        (beta_CZ - epsilon_CZ) * Z + rho * beta * (1 + m) + (beta_MZ - gamma_MZ) * Z * m,
+        E - (beta + beta_MZ * Z + growth) * m,
+    ])
+
+
+def _balanced_jacobian(t, y, params):
+    """Jacobian of _balanced_rhs with respect to (Z, m)."""
+    Z, m = y
+    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
+    growth = alpha - beta - E - beta_CZ * Z
+    J = np.empty((2, 2) + np.shape(Z))
+    J[0, 0] = beta_CZ - epsilon_CZ + (beta_MZ - gamma_MZ) * m
+    J[0, 1] = rho * beta + (beta_MZ - gamma_MZ) * Z
+    J[1, 0] = (beta_CZ - beta_MZ) * m
+    J[1, 1] = -(beta + beta_MZ * Z + growth)
+    return J
+
+
+def czm_regimes(params, guesses=BALANCED_GUESSES):
+    """
+    Regime classifier for czm_model (the C-Z-M part of the continuous
+    system; D only accumulates) over arrays of parameters.
+
+    params is the usual list [alpha, beta, beta_CZ, epsilon_CZ, beta_MZ,
+    gamma_MZ, E, rho] whose entries may be arrays broadcasting together.
+
+    The fixed points of czm_model are the line (0, Z, 0); which Z the
+    zombies settle at is decided while humans are present. The model is
+    linear in (C, M) for a given Z, so C and M end up growing or decaying
+    together with a fixed ratio m = M / C while Z stays at Z_level: the
+    balanced growth states, roots of _balanced_rhs found by batched_newton
+    from every level in guesses. Zombies start low and rise to the lowest
+    root with Z >= 0, m >= 0 that is stable (eigenvalues of
+    _balanced_jacobian with negative real part); without one they grow
+    without bound. The Jacobian of czm_model at (0, Z_level, 0) then has
+    eigenvalues growth = alpha - beta - E - beta_CZ * Z_level, 0 and
+    -beta - beta_MZ * Z_level, and growth decides the regime:
+    - alpha - beta - E <= 0: extinction,
+    - growth <= 0: zombie takeover,
+    - growth > 0: coexistence, or human survival when Z_level = 0.
+
+    Returns a dict with "regime", "Z_level", "M_ratio" (m at Z_level),
+    "growth", "Z_threshold" (the zombie level at which civilians stop
+    growing) and "eigenvalues" (..., 3) at (0, Z_level, 0).
+    """
+    params = np.broadcast_arrays(*(np.asarray(p, dtype=float) for p in params))
+    shape = params[0].shape
+    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = (p.ravel() for p in params)
+    r = alpha - beta - E
+    n, g = alpha.size, len(guesses)
+
+    # Every point is searched from every guess: (Z, m) of shape (2, g * n)
+    Z0 = np.repeat(np.asarray(guesses, dtype=float), n)
+    points = [np.tile(p.ravel(), g) for p in params]
+    ratio = points[0] - points[6] + (points[4] - points[2]) * Z0
+    with np.errstate(divide="ignore", invalid="ignore"):
+        m0 = np.where(ratio > 0, points[6] / ratio, 1.0)
+    roots, converged = batched_newton(_balanced_rhs, _balanced_jacobian, np.stack([Z0, m0]), (points,))
+    with np.errstate(invalid="ignore"):
+        J = np.moveaxis(_balanced_jacobian(0, roots, points), (0, 1), (-2, -1))
+        stable = (np.linalg.eigvals(np.nan_to_num(J)).real < 0).all(axis=-1)
+    Z, m = roots.reshape(2, g, n)
+    tol = 1e-9 * (1 + np.abs(Z))
+    valid = converged.reshape(g, n) & stable.reshape(g, n) & (Z >= -tol) & (m >= -tol)
+    lowest = np.argmin(np.where(valid, Z, np.inf), axis=0)
+    found = valid.any(axis=0)
+    Z_level = np.where(found, np.maximum(Z[lowest, np.arange(n)], 0.0), np.inf)
+    M_ratio = np.where(found, np.maximum(m[lowest, np.arange(n)], 0.0), 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        growth = np.where(found, r - beta_CZ * Z_level, -np.inf)
+        Z_threshold = np.where(beta_CZ > 0, r / beta_CZ, np.inf)
+        decay = -beta - beta_MZ * Z_level
+    regime = np.select(
+        [r <= 0, growth <= 0, Z_level == 0],
+        [EXTINCTION, TAKEOVER, SURVIVAL],
+        default=COEXISTENCE,
+    )
+    return {
+        "regime": regime.reshape(shape),
+        "Z_level": Z_level.reshape(shape),
+        "M_ratio": M_ratio.reshape(shape),
+        "growth": growth.reshape(shape),
+        "Z_threshold": Z_threshold.reshape(shape),
+        "eigenvalues": np.stack([growth, np.zeros_like(growth), decay], axis=-1).reshape(shape + (3,)),
+    }
@@ -0,0 +1,230 @@
+"""
+Stochastic versions of the L-Z and C-Z-M-D models.
+
+The birth, death and interaction terms of lotka_volterra and
+continuous_model are reaction channels with non-negative propensities,
+declared in zombies.compartments, whose mean-field limit is the
+deterministic model. Replicates
+are advanced together as arrays of shape (n_species, R), either with an exact
+SSA (Gillespie) that draws the next event of every replicate at once, or with
+fixed-step Poisson tau-leaping for large populations.
+
+Random numbers come from independent streams spawned from one SeedSequence,
+one stream per replicate, so replicate i is the same for a given seed
+whatever the number of replicates or the block_size. Replicates are run
+block_size at a time only to bound the memory of every batch.
+"""
+import numpy as np
+
+from zombies.compartments import CONTINUOUS_MODEL, LOTKA_VOLTERRA_MODEL
+
+# Uniforms drawn at a time from the stream of every SSA replicate
+UNIFORM_BUFFER = 256
+
+# ---------- Channels ----------
+# Declared once in zombies.compartments: species (L, Z) and (C, Z, M, D),
+# channels in the order of the reaction lists there
+LOTKA_VOLTERRA_STOICHIOMETRY = LOTKA_VOLTERRA_MODEL.stoichiometry
+CONTINUOUS_STOICHIOMETRY = CONTINUOUS_MODEL.stoichiometry
+
+
+def lotka_volterra_propensities(x, alpha, beta, rho, gamma, delta):
+    """Channel rates for the L-Z model; x has shape (2, R), returns (5, R)."""
+    return LOTKA_VOLTERRA_MODEL.propensities(x, (alpha, beta, rho, gamma, delta))
+
+
+def continuous_propensities(x, params):
+    """Tasas de los canales del sistema C-Z-M-D; x es (4, R), devuelve (10, R)."""
+    return CONTINUOUS_MODEL.propensities(x, params)
+
+
+# ---------- Engines ----------
+def rng_streams(seed, n_streams):
+    """Independent generators spawned from SeedSequence(seed)."""
+    return [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(n_streams)]
+
+
+class _Uniforms:
+    """
+    Uniform numbers for a block of replicates, each from its own generator
+    in rngs. The generators are called UNIFORM_BUFFER draws at a time, so
+    the Python loop over replicates runs once per that many events.
+    """
+
+    def __init__(self, rngs, size=UNIFORM_BUFFER):
+        self.rngs = rngs
+        self.values = np.empty((len(rngs), size))
+        self.used = np.full(len(rngs), size)
+
+    def draw(self, replicates):
+        """One uniform in [0, 1) for each replicate (indices into rngs)."""
+        size = self.values.shape[1]
+        for r in replicates[self.used[replicates] == size]:
+            self.values[r] = self.rngs[r].random(size)
+            self.used[r] = 0
+        u = self.values[replicates, self.used[replicates]]
+        self.used[replicates] += 1
+        return u
+
+
+def _block_args(args, block, replicates):
+    """Restrict per-replicate arguments (last axis of length R) to block."""
+    if isinstance(args, (list, tuple)):
+        return type(args)(_block_args(a, block, replicates) for a in args)
+    if np.ndim(args) and np.shape(args)[-1] == replicates:
+        return np.asarray(args)[..., block]
+    return args
+
+
+def _initial_state(x0, replicates):
+    x0 = np.asarray(x0, dtype=float)
+    if x0.ndim == 1:
+        x0 = np.repeat(x0[:, None], replicates, axis=1)
+    return x0
+
+
+def _run_blocks(engine, stoichiometry, propensities, x0, t_eval, args, replicates, seed, block_size):
+    x0 = _initial_state(x0, replicates)
+    t_eval = np.asarray(t_eval, dtype=float)
+    out = np.empty((len(t_eval), x0.shape[0], replicates))
+    streams = rng_streams(seed, replicates)
+    for start in range(0, replicates, block_size):
+        block = slice(start, min(start + block_size, replicates))
+        out[:, :, block] = engine(
+            np.asarray(stoichiometry, dtype=float),
+            propensities,
+            x0[:, block].copy(),
+            t_eval,
+            _block_args(args, block, replicates),
+            streams[block],
+        )
+    return out
+
+
+def simulate_ssa(
+    stoichiometry,
+    propensities,
+    x0,
+    t_eval,
+    args=(),
+    replicates=1,
+    seed=None,
+    block_size=1024,
+):
+    """
+    Exact stochastic simulation (Gillespie direct method) of R replicates.
+
+    stoichiometry is (n_channels, n_species) and propensities(x, *args)
+    returns the (n_channels, R) channel rates for the (n_species, R) state.
+    x0 is (n_species,) or (n_species, R); args may hold per-replicate arrays
+    of length R. Every iteration draws the next event of all unfinished
+    replicates together, so the Python loop runs once per event of the
+    busiest replicate, not once per event overall.
+
+    Replicate i draws from the i-th stream spawned from seed; block_size
+    replicates are run together at a time.
+
+    Returns the states at t_eval, an array (len(t_eval), n_species, R).
+    """
+    return _run_blocks(
+        _ssa_block, stoichiometry, propensities, x0, t_eval, args, replicates, seed, block_size
+    )
+
+
+def _ssa_block(stoichiometry, propensities, x, t_eval, args, rngs):
+    n_species, R = x.shape
+    uniforms = _Uniforms(rngs)
+    out = np.empty((len(t_eval), n_species, R))
+    t = np.zeros(R)
+    # Index of the next t_eval point to record for every replicate
+    next_point = np.zeros(R, dtype=int)
+    active = np.arange(R)
+    while len(active):
+        xa = x[:, active]
+        a = propensities(xa, *_block_args(args, active, R))
+        a0 = a.sum(axis=0)
+        with np.errstate(divide="ignore"):
+            tau = np.where(a0 > 0, -np.log1p(-uniforms.draw(active)) / a0, np.inf)
+        t_next = t[active] + tau
+
+        # The state holds until the event: record every t_eval point before it
+        pending = next_point[active] < len(t_eval)
+        while pending.any():
+            due = pending & (t_eval[np.minimum(next_point[active], len(t_eval) - 1)] < t_next)
+            if not due.any():
+                break
+            r = active[due]
+            out[next_point[r], :, r] = xa[:, due].T
+            next_point[r] += 1
+            pending = next_point[active] < len(t_eval)
+
+        running = next_point[active] < len(t_eval)
+        fire = running & np.isfinite(t_next)
+        if fire.any():
+            cumulative = np.cumsum(a[:, fire], axis=0)
+            r = active[fire]
+            target = uniforms.draw(r) * a0[fire]
+            channel = (cumulative > target).argmax(axis=0)
+            x[:, r] += stoichiometry[channel].T
+            t[r] = t_next[fire]
+        active = active[fire]
+    return out
+
+
+def simulate_tau_leaping(
+    stoichiometry,
+    propensities,
+    x0,
+    t_eval,
+    tau,
+    args=(),
+    replicates=1,
+    seed=None,
+    block_size=1024,
+):
+    """
+    Fixed-step Poisson tau-leaping of R replicates, for populations too large
+    for the exact SSA.
+
+    Every step of length tau fires a Poisson(a * tau) number of events in each
+    channel of each replicate. As in the discrete scripts, populations are
+    clamped at zero when a leap overshoots. Arguments and result are as in
+    simulate_ssa; t_eval points are recorded at the first step at or after
+    them.
+    """
+
+    def engine(stoichiometry, propensities, x, t_eval, args, rngs):
+        return _tau_leaping_block(stoichiometry, propensities, x, t_eval, tau, args, rngs)
+
+    return _run_blocks(
+        engine, stoichiometry, propensities, x0, t_eval, args, replicates, seed, block_size
+    )
+
+
+def _tau_leaping_block(stoichiometry, propensities, x, t_eval, tau, args, rngs):
+    out = np.empty((len(t_eval),) + x.shape)
+    t, point = 0.0, 0
+    while point < len(t_eval):
+        # Small tolerance so grid points that are multiples of tau are hit
+        while point < len(t_eval) and t_eval[point] <= t + 1e-9 * tau:
+            out[point] = x
+            point += 1
+        if point == len(t_eval):
+            break
+        mean = np.maximum(propensities(x, *args), 0) * tau
+        # Every replicate from its own stream: one call per replicate and step
+        events = np.empty_like(mean)
+        for r, rng in enumerate(rngs):
+            events[:, r] = rng.poisson(mean[:, r])
+        x = np.maximum(x + stoichiometry.T @ events, 0)
+        t += tau
+    return out
+
+
+def extinction_probability(samples, index):
+    """
+    Fraction of replicates in which species index is extinct at every time of
+    samples, an array (T, n_species, R) from simulate_ssa or
+    simulate_tau_leaping.
+    """
+    return (samples[:, index] <= 0).mean(axis=-1)
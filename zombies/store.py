@@ -0,0 +1,399 @@
+"""
+Append-only columnar store of run records.
+
+Every column (a swept parameter or a summary statistic such as final_C) is
+kept as a series of .npy chunks of up to CHUNK_ROWS rows, read back memory
+mapped, so a query touches only the columns it names and never loads whole
+runs:
+
+    directory/manifest.json          columns, dtypes, chunks and zone maps
+    directory/columns/final_C/000003.npy
+    directory/trajectories/000003.npy   optional (rows, T, n) trajectories
+    directory/index/params.alpha.order.npy, .values.npy
+
+The manifest lists, for every chunk, its row count and the minimum and
+maximum of every numeric column (a zone map), so range conditions skip the
+chunks that cannot match. Columns named in index= also keep a sorted index
+(row order and sorted values), rebuilt when rows were appended since, which
+turns a range condition on them into two binary searches.
+
+    store = ResultStore("results/coexistencia.store", index=("params.gamma_MZ",))
+    store.append(records)
+    rows = store.query("params.gamma_MZ > 0.02", "final_C > 10")
+    store.read(rows, ["params.gamma_MZ", "final_C"])
+
+A store has one writer at a time; readers see the chunks listed in the
+manifest, which is replaced atomically after every chunk.
+"""
+import json
+import operator
+import os
+import re
+import uuid
+
+import numpy as np
+
+# Rows per chunk file
+CHUNK_ROWS = 65536
+
+OPERATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+
+_CONDITION = re.compile(r"^\s*(\S+)\s*(<=|>=|==|!=|<|>)\s*(\S+)\s*$")
+
+
+def parse_condition(condition):
+    """(column, operator, value) from "final_C > 10" or such a tuple."""
+    if not isinstance(condition, str):
+        column, op, value = condition
+    else:
+        match = _CONDITION.match(condition)
+        if match is None:
+            raise ValueError(f"cannot parse condition {condition!r}")
+        column, op, value = match.groups()
+        value = {"True": True, "False": False}.get(value, value)
+        if isinstance(value, str):
+            try:
+                value = float(value)
+            except ValueError:
+                pass
+    if op not in OPERATORS:
+        raise ValueError(f"unknown operator {op!r}")
+    return column, op, value
+
+
+def _save(path, array):
+    temporary = f"{path}.{uuid.uuid4().hex}.tmp.npy"
+    np.save(temporary, array)
+    os.replace(temporary, path)
+
+
+class ResultStore:
+    """
+    Columnar store of run records in directory (created when missing).
+    index names the columns that keep a sorted index, typically the swept
+    parameters; it is fixed when the store is created.
+    """
+
+    def __init__(self, directory, index=()):
+        self.directory = directory
+        self._manifest_path = os.path.join(directory, "manifest.json")
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path) as file:
+                self.manifest = json.load(file)
+        else:
+            self.manifest = {
+                "columns": {},
+                "chunks": [],
+                "index": list(index),
+                "trajectories": None,
+            }
+        self._pending = []
+        self._pending_trajectories = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    def __len__(self):
+        return sum(chunk["rows"] for chunk in self.manifest["chunks"])
+
+    @property
+    def columns(self):
+        return list(self.manifest["columns"])
+
+    # ---------- Writing ----------
+    def append(self, records, trajectories=None):
+        """
+        Add rows: a list of record dicts (as from run_scenario) or a dict of
+        equally long column arrays, plus optionally their trajectories
+        (rows, T, n). The columns, and whether trajectories are stored, are
+        fixed by the first append; a numeric column is widened when later
+        values need it (ints, then floats), never truncated. Rows are
+        written in chunks of CHUNK_ROWS; call flush() (or use the store as a
+        context manager) to write the rest.
+        """
+        if isinstance(records, dict):
+            columns = {name: np.asarray(values) for name, values in records.items()}
+        else:
+            names = list(records[0]) if records else list(self.manifest["columns"])
+            columns = {name: np.array([record[name] for record in records]) for name in names}
+        rows = len(next(iter(columns.values()))) if columns else 0
+        if rows == 0:
+            return
+        if not self.manifest["columns"] and not self.manifest["chunks"]:
+            self.manifest["columns"] = {name: self._dtype(v) for name, v in columns.items()}
+            if trajectories is not None:
+                self.manifest["trajectories"] = list(np.shape(trajectories)[1:])
+        if set(columns) != set(self.manifest["columns"]):
+            names = ", ".join(self.manifest["columns"])
+            raise ValueError(f"records must have the columns of the store: {names}")
+        if (trajectories is None) != (self.manifest["trajectories"] is None):
+            raise ValueError("give trajectories with every append or never")
+        for name, dtype in self.manifest["columns"].items():
+            values = columns[name]
+            if len(values) != rows:
+                raise ValueError("all columns need the same number of rows")
+            if values.dtype.kind == "U" and values.dtype.itemsize > np.dtype(dtype).itemsize:
+                raise ValueError(f"strings too long for column {name} ({dtype})")
+            if not np.can_cast(values.dtype, dtype, "same_kind"):
+                if values.dtype.kind not in "biuf" or np.dtype(dtype).kind not in "biuf":
+                    raise ValueError(
+                        f"cannot store {values.dtype} values in column {name} ({dtype})"
+                    )
+                # Widen the column (e.g. int to float) rather than truncate;
+                # chunks already written keep their dtype and are cast on read
+                dtype = np.result_type(dtype, values.dtype).str
+                self.manifest["columns"][name] = dtype
+            elif not np.can_cast(values.dtype, dtype, "safe") and values.dtype.kind != "U":
+                # Same kind but narrower column (e.g. float64 into float32)
+                dtype = np.result_type(dtype, values.dtype).str
+                self.manifest["columns"][name] = dtype
+            columns[name] = values.astype(dtype)
+        self._pending.append(columns)
+        if trajectories is not None:
+            trajectories = np.asarray(trajectories, dtype=float)
+            shape = [rows] + self.manifest["trajectories"]
+            if list(trajectories.shape) != shape:
+                raise ValueError(f"trajectories must have shape {tuple(shape)}")
+            self._pending_trajectories.append(trajectories)
+        if sum(len(next(iter(c.values()))) for c in self._pending) >= CHUNK_ROWS:
+            self._write(full_only=True)
+
+    @staticmethod
+    def _dtype(values):
+        if values.dtype.kind in "biuf":
+            return values.dtype.str
+        if values.dtype.kind == "U":
+            # Room for longer strings in later appends
+            return np.dtype(f"U{max(32, values.dtype.itemsize // 4)}").str
+        raise ValueError(f"cannot store values of dtype {values.dtype}")
+
+    def flush(self):
+        """Write the pending rows and the manifest."""
+        self._write(full_only=False)
+
+    def _write(self, full_only):
+        if not self._pending:
+            return
+        columns = {
+            name: np.concatenate([pending[name] for pending in self._pending])
+            for name in self.manifest["columns"]
+        }
+        trajectories = None
+        if self._pending_trajectories:
+            trajectories = np.concatenate(self._pending_trajectories)
+        rows = len(next(iter(columns.values())))
+        end = rows - rows % CHUNK_ROWS if full_only else rows
+        for start in range(0, end, CHUNK_ROWS):
+            stop = min(start + CHUNK_ROWS, end)
+            self._write_chunk({name: values[start:stop] for name, values in columns.items()},
+                              None if trajectories is None else trajectories[start:stop])
+        self._pending, self._pending_trajectories = [], []
+        if end < rows:
+            self._pending.append({name: values[end:] for name, values in columns.items()})
+            if trajectories is not None:
+                self._pending_trajectories.append(trajectories[end:])
+
+    def _write_chunk(self, columns, trajectories):
+        number = len(self.manifest["chunks"])
+        chunk = {"rows": len(next(iter(columns.values()))), "min": {}, "max": {}}
+        for name, values in columns.items():
+            folder = os.path.join(self.directory, "columns", name)
+            os.makedirs(folder, exist_ok=True)
+            _save(os.path.join(folder, f"{number:06d}.npy"), values)
+            if values.dtype.kind in "biuf":
+                finite = values[~np.isnan(values)] if values.dtype.kind == "f" else values
+                # None for a chunk that is all NaN
+                chunk["min"][name] = finite.min().item() if len(finite) else None
+                chunk["max"][name] = finite.max().item() if len(finite) else None
+        if trajectories is not None:
+            folder = os.path.join(self.directory, "trajectories")
+            os.makedirs(folder, exist_ok=True)
+            _save(os.path.join(folder, f"{number:06d}.npy"), trajectories)
+        self.manifest["chunks"].append(chunk)
+        os.makedirs(self.directory, exist_ok=True)
+        temporary = f"{self._manifest_path}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, "w") as file:
+            json.dump(self.manifest, file)
+        os.replace(temporary, self._manifest_path)
+
+    # ---------- Reading ----------
+    def _offsets(self):
+        rows = [chunk["rows"] for chunk in self.manifest["chunks"]]
+        return np.concatenate([[0], np.cumsum(rows)]).astype(np.int64)
+
+    def column_chunk(self, name, number):
+        """One chunk of a column, memory mapped."""
+        if name not in self.manifest["columns"]:
+            raise ValueError(f"no column {name}")
+        path = os.path.join(self.directory, "columns", name, f"{number:06d}.npy")
+        return np.load(path, mmap_mode="r")
+
+    def _gather(self, load, rows, dtype=None):
+        offsets = self._offsets()
+        rows = np.asarray(rows, dtype=np.int64)
+        if not len(rows):
+            return np.asarray(load(0)[:0], dtype=dtype)
+        chunks = np.searchsorted(offsets, rows, side="right") - 1
+        out = None
+        for number in np.unique(chunks):
+            mask = chunks == number
+            values = np.asarray(load(number)[rows[mask] - offsets[number]])
+            if out is None:
+                out = np.empty((len(rows),) + values.shape[1:], dtype=dtype or values.dtype)
+            out[mask] = values
+        return out
+
+    def read(self, rows=None, columns=None):
+        """
+        Dict of the columns (all by default) at rows (all by default, else an
+        array of row numbers as returned by query).
+        """
+        columns = self.columns if columns is None else list(columns)
+        if rows is None and not self.manifest["chunks"]:
+            return {name: np.zeros(0, dtype=self.manifest["columns"][name]) for name in columns}
+        chunks = range(len(self.manifest["chunks"]))
+        if rows is None:
+            return {
+                name: np.concatenate([self.column_chunk(name, k) for k in chunks]).astype(
+                    self.manifest["columns"][name], copy=False
+                )
+                for name in columns
+            }
+        return {
+            name: self._gather(
+                lambda k, name=name: self.column_chunk(name, k),
+                rows,
+                self.manifest["columns"][name],
+            )
+            for name in columns
+        }
+
+    def trajectories(self, rows):
+        """Stored trajectories (len(rows), T, n) at rows, memory mapped chunk by chunk."""
+        if self.manifest["trajectories"] is None:
+            raise ValueError("this store has no trajectories")
+        folder = os.path.join(self.directory, "trajectories")
+        return self._gather(
+            lambda k: np.load(os.path.join(folder, f"{k:06d}.npy"), mmap_mode="r"), rows
+        )
+
+    # ---------- Index ----------
+    def _index(self, name):
+        """(order, sorted values) of an indexed column, rebuilt when stale."""
+        folder = os.path.join(self.directory, "index")
+        paths = [os.path.join(folder, f"{name}.{part}.npy") for part in ("order", "values")]
+        if all(os.path.exists(path) for path in paths):
+            order, values = (np.load(path, mmap_mode="r") for path in paths)
+            if len(order) == len(self):
+                return order, values
+        values = self.read(columns=[name])[name]
+        order = np.argsort(values, kind="stable")
+        os.makedirs(folder, exist_ok=True)
+        _save(paths[0], order)
+        _save(paths[1], values[order])
+        return order, values[order]
+
+    def _index_rows(self, column, op, value):
+        order, values = self._index(column)
+        left = np.searchsorted(values, value, side="left")
+        right = np.searchsorted(values, value, side="right")
+        # NaN sorts last and never meets a condition
+        valid = len(values)
+        if values.dtype.kind == "f":
+            valid = np.searchsorted(values, np.nan, side="left")
+        ranges = {
+            "<": [(0, left)],
+            "<=": [(0, right)],
+            ">": [(right, valid)],
+            ">=": [(left, valid)],
+            "==": [(left, right)],
+            "!=": [(0, left), (right, valid)],
+        }[op]
+        return np.sort(np.concatenate([order[a:b] for a, b in ranges]))
+
+    def query(self, *conditions):
+        """
+        Row numbers (sorted) of the rows meeting every condition, each a
+        string "column op value" (op one of <, <=, >, >=, ==, !=) or a tuple
+        (column, op, value). Indexed columns are resolved by binary search;
+        the others by scanning memory-mapped chunks, skipping those whose
+        zone map rules them out and, after an indexed condition, those
+        without candidate rows.
+        """
+        conditions = [parse_condition(condition) for condition in conditions]
+        for column, _, _ in conditions:
+            if column not in self.manifest["columns"]:
+                raise ValueError(f"no column {column}")
+        candidates = None
+        scans = []
+        for column, op, value in conditions:
+            if column in self.manifest["index"]:
+                rows = self._index_rows(column, op, value)
+                if candidates is not None:
+                    rows = np.intersect1d(candidates, rows, assume_unique=True)
+                candidates = rows
+            else:
+                scans.append((column, op, value))
+        if not scans:
+            return np.arange(len(self)) if candidates is None else candidates
+
+        offsets = self._offsets()
+        found = []
+        for number, chunk in enumerate(self.manifest["chunks"]):
+            start = offsets[number]
+            if candidates is not None:
+                first, last = np.searchsorted(candidates, offsets[number:number + 2])
+                local = candidates[first:last] - start
+                if not len(local):
+                    continue
+            if any(not _may_match(chunk, column, op, value) for column, op, value in scans):
+                continue
+            keep = None if candidates is None else local
+            for column, op, value in scans:
+                values = self.column_chunk(column, number)
+                if keep is None:
+                    keep = np.flatnonzero(_compare(values, op, value))
+                else:
+                    keep = keep[_compare(values[keep], op, value)]
+                if not len(keep):
+                    break
+            found.append(keep + start)
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
+
+
+def _compare(values, op, value):
+    """Mask of values meeting the condition; NaN never does."""
+    mask = OPERATORS[op](values, value)
+    if op == "!=" and values.dtype.kind == "f":
+        mask &= ~np.isnan(values)
+    return mask
+
+
+def _may_match(chunk, column, op, value):
+    """False when the zone map of chunk shows no row can meet the condition."""
+    if column not in chunk["min"]:
+        # String columns have no zone map
+        return True
+    low, high = chunk["min"][column], chunk["max"][column]
+    if low is None:
+        return False
+    if isinstance(value, str):
+        return True
+    return {
+        "<": low < value,
+        "<=": low <= value,
+        ">": high > value,
+        ">=": high >= value,
+        "==": low <= value <= high,
+        "!=": not low == high == value,
+    }[op]
@@ -0,0 +1,138 @@
+import numpy as np
+
+# Statistics with one entry per ensemble member along the last axis
+_PER_MEMBER = (
+    "final",
+    "min",
+    "max",
+    "max_time",
+    "extinction_time",
+    "time_above",
+    "_last_above",
+    "_alive",
+)
+
+
+class SummaryStats:
+    """
+    Online reducer of per-run summary statistics.
+
+    Instead of storing a trajectory, a simulator feeds blocks of samples to
+    update() as the run advances and keeps only O(1) state per compartment:
+    final value, minimum, maximum and the time of the maximum, first time at
+    or below the extinction level after having been above it, and total time
+    spent above a threshold.
+
+    names are the compartment names, e.g. ("L", "Z") or ("C", "Z", "M", "D").
+    thresholds maps a compartment name to the level used for time_above.
+    Samples may carry trailing batch axes (one per ensemble member), in which
+    case every statistic is an array over the members.
+    """
+
+    def __init__(self, names, thresholds=None, extinction=0.0):
+        self.names = tuple(names)
+        self.thresholds = dict(thresholds or {})
+        self.extinction = extinction
+        self._threshold_index = [self.names.index(name) for name in self.thresholds]
+        self._threshold_values = np.array(list(self.thresholds.values()), dtype=float)
+        self.count = 0
+
+    def _start(self, t, first):
+        nan = np.full(first.shape, np.nan)
+        self.final = first.copy()
+        self.min = first.copy()
+        self.max = first.copy()
+        self.max_time = np.full(first.shape, float(t))
+        self.extinction_time = nan
+        self.time_above = np.zeros((len(self.thresholds),) + first.shape[1:])
+        self._last_t = float(t)
+        self._last_above = self._above(first[None])[0]
+        # Whether the compartment has been above the extinction level yet
+        self._alive = np.zeros(first.shape, dtype=bool)
+
+    def _above(self, values):
+        if not self.thresholds:
+            return np.zeros((len(values), 0) + values.shape[2:], dtype=bool)
+        levels = self._threshold_values.reshape((-1,) + (1,) * (values.ndim - 2))
+        return values[:, self._threshold_index] > levels
+
+    def update(self, t, values, members=None):
+        """
+        Add a block of samples. t has shape (T,) and values has shape
+        (T, n_compartments, ...) with the samples in time order.
+
+        members restricts the update to some ensemble members (an index
+        array over the last axis); values then only holds those members.
+        Members that are no longer updated keep their statistics, which is
+        how runs that stopped early drop out. The first update must cover
+        every member.
+        """
+        t = np.asarray(t, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if len(t) == 0:
+            return
+        if members is None:
+            self._update(t, values)
+            return
+        full = {name: getattr(self, name) for name in _PER_MEMBER}
+        for name in _PER_MEMBER:
+            setattr(self, name, full[name][..., members])
+        try:
+            self._update(t, values)
+        finally:
+            for name in _PER_MEMBER:
+                full[name][..., members] = getattr(self, name)
+                setattr(self, name, full[name])
+
+    def _update(self, t, values):
+        if self.count == 0:
+            self._start(t[0], values[0])
+
+        self.final = values[-1].copy()
+        np.minimum(self.min, values.min(axis=0), out=self.min)
+        block_argmax = values.argmax(axis=0)
+        block_max = np.take_along_axis(values, block_argmax[None], axis=0)[0]
+        higher = block_max > self.max
+        self.max = np.where(higher, block_max, self.max)
+        self.max_time = np.where(higher, t[block_argmax], self.max_time)
+
+        # A compartment goes extinct only after it has been present, so one
+        # that starts at the level (D = 0) does not count
+        present = values > self.extinction
+        alive = np.logical_or.accumulate(present, axis=0) | self._alive
+        before = np.concatenate([self._alive[None], alive[:-1]])
+        extinct = (values <= self.extinction) & before
+        self._alive = alive[-1]
+        new = np.isnan(self.extinction_time) & extinct.any(axis=0)
+        if new.any():
+            first = t[extinct.argmax(axis=0)]
+            self.extinction_time = np.where(new, first, self.extinction_time)
+
+        # Every sample holds until the next one (left rectangle rule)
+        above = self._above(values)
+        held = np.concatenate([self._last_above[None], above[:-1]])
+        dt = np.diff(t, prepend=self._last_t).reshape((-1,) + (1,) * (above.ndim - 1))
+        self.time_above += (held * dt).sum(axis=0)
+        self._last_t = t[-1]
+        self._last_above = above[-1]
+        self.count += len(t)
+
+    def result(self):
+        """
+        Flat record of the statistics, keyed like "final_C", "max_Z",
+        "max_time_Z", "extinction_time_C" or "time_above_Z". Extinction times
+        are NaN for compartments that never fell to the extinction level
+        after being above it, including those that never rose above it.
+        """
+        record = {"samples": self.count}
+        if self.count == 0:
+            return record
+        for i, name in enumerate(self.names):
+            record[f"final_{name}"] = self.final[i]
+            record[f"min_{name}"] = self.min[i]
+            record[f"max_{name}"] = self.max[i]
+            record[f"max_time_{name}"] = self.max_time[i]
+            record[f"extinction_time_{name}"] = self.extinction_time[i]
+        for k, name in enumerate(self.thresholds):
+            record[f"time_above_{name}"] = self.time_above[k]
+        return record
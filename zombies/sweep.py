@@ -0,0 +1,257 @@
+"""
+Resumable sharded sweeps over a shared directory.
+
+A scenario sweep (see zombies.scenario) is split into shards of consecutive
+runs. Workers, any number of processes on one machine or on several that
+share the directory, claim shards through lock files and summarize their
+runs; there is no broker, only the file system:
+
+    directory/sweep.json             scenario, model version, shard size and run count
+    directory/claims/00012.lock      shard 12 is being run (owner inside)
+    directory/checkpoints/00012.json records of the runs finished so far
+    directory/done/00012.json        records of the finished shard
+
+Locks are created with O_CREAT | O_EXCL, so exactly one worker gets each
+shard. A worker touches its lock after every run; a lock untouched for
+lease seconds belongs to a dead worker and may be taken over, and the new
+owner resumes from the checkpoint. A worker judging a lock first renames
+it aside, so only one worker can remove a stale lock; a live lock is put
+back at once (in that short window another worker may claim the shard, in
+which case it runs twice with the same result). Records are written through a temporary
+file and an atomic rename, so a crash never leaves a partial file behind.
+Runs are deterministic, so a shard that ends up run twice gives the same
+records. Restarting a sweep on the same directory skips finished shards.
+Machines sharing the directory need clocks that agree to well within the
+lease.
+"""
+import json
+import os
+import socket
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+from zombies.cache import MODEL_VERSION, cache_key
+from zombies.scenario import expand, summarize
+
+# Runs per shard, runs between checkpoints, and seconds after which an
+# untouched claim is considered abandoned
+SHARD_SIZE = 64
+CHECKPOINT_EVERY = 16
+LEASE = 300.0
+
+
+# ---------- Files ----------
+def _write_json(path, data):
+    temporary = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(temporary, "w") as file:
+        json.dump(data, file)
+    os.replace(temporary, path)
+
+
+def _read_json(path):
+    try:
+        with open(path) as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
+
+
+def _shard_path(directory, kind, shard):
+    extension = "lock" if kind == "claims" else "json"
+    return os.path.join(directory, kind, f"{shard:05d}.{extension}")
+
+
+def prepare_sweep(scenario, directory, shard_size=None):
+    """
+    Create (or reopen) the sweep of a validated scenario in directory, with
+    shard_size runs per shard (SHARD_SIZE by default, or the size the
+    directory was created with). Returns the sweep description; raises
+    ValueError when the directory already holds a different sweep, or the
+    same sweep written by different model code (MODEL_VERSION), whose
+    finished shards would not match new ones.
+    """
+    for kind in ("claims", "checkpoints", "done"):
+        os.makedirs(os.path.join(directory, kind), exist_ok=True)
+    path = os.path.join(directory, "sweep.json")
+    # The key identifies the scenario alone; the model version is checked apart
+    key = cache_key(scenario, version="")
+    stored = _read_json(path)
+    if stored is None:
+        runs = len(expand(scenario))
+        shard_size = shard_size or SHARD_SIZE
+        stored = {
+            "key": key,
+            "version": MODEL_VERSION,
+            "scenario": scenario,
+            "shard_size": shard_size,
+            "runs": runs,
+            "shards": -(-runs // shard_size),
+        }
+        _write_json(path, stored)
+    if stored["key"] != key:
+        raise ValueError(f"{directory} holds a different sweep ({stored['scenario']['name']})")
+    if stored.get("version") != MODEL_VERSION:
+        raise ValueError(
+            f"model code changed since the sweep in {directory} was created; "
+            "collect it with the old code or start it again in a new directory"
+        )
+    if shard_size not in (None, stored["shard_size"]):
+        raise ValueError(f"{directory} was created with {stored['shard_size']} runs per shard")
+    return stored
+
+
+def _load(directory):
+    sweep = _read_json(os.path.join(directory, "sweep.json"))
+    if sweep is None:
+        raise ValueError(f"no sweep in {directory}; run prepare_sweep first")
+    return sweep
+
+
+# ---------- Claims ----------
+def _claim(directory, shard, owner, lease):
+    """True when owner now holds shard, taking over an abandoned claim."""
+    path = _shard_path(directory, "claims", shard)
+    for _ in range(2):
+        try:
+            descriptor = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            # Move the claim aside before judging it, so that of the workers
+            # racing for a stale claim only the one whose rename succeeded
+            # removes it; a claim that turns out to be live is put back
+            stale = f"{path}.{uuid.uuid4().hex}.stale"
+            try:
+                os.rename(path, stale)
+            except FileNotFoundError:
+                continue
+            if time.time() - os.stat(stale).st_mtime < lease:
+                try:
+                    os.link(stale, path)
+                except FileExistsError:
+                    pass
+                os.remove(stale)
+                return False
+            os.remove(stale)
+            continue
+        with os.fdopen(descriptor, "w") as file:
+            file.write(owner)
+        return True
+    return False
+
+
+def _release(directory, shard, owner):
+    path = _shard_path(directory, "claims", shard)
+    try:
+        with open(path) as file:
+            mine = file.read() == owner
+        if mine:
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _run_shard(directory, shard, runs, owner, checkpoint_every):
+    checkpoint = _shard_path(directory, "checkpoints", shard)
+    records = _read_json(checkpoint) or []
+    lock = _shard_path(directory, "claims", shard)
+    for run in runs[len(records):]:
+        records.append(summarize(run))
+        try:
+            os.utime(lock)
+        except FileNotFoundError:
+            pass
+        if len(records) % checkpoint_every == 0 and len(records) < len(runs):
+            _write_json(checkpoint, records)
+    _write_json(_shard_path(directory, "done", shard), records)
+    try:
+        os.remove(checkpoint)
+    except FileNotFoundError:
+        pass
+    _release(directory, shard, owner)
+
+
+# ---------- Workers ----------
+def work(directory, lease=LEASE, checkpoint_every=CHECKPOINT_EVERY, max_shards=None):
+    """
+    Claim and run shards of the sweep in directory until none is left to
+    claim (all done or held by live workers), or after max_shards shards.
+    Returns the number of shards this worker finished.
+    """
+    sweep = _load(directory)
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex}"
+    runs = expand(sweep["scenario"])
+    size = sweep["shard_size"]
+    finished = 0
+    for shard in range(sweep["shards"]):
+        if max_shards is not None and finished >= max_shards:
+            break
+        if os.path.exists(_shard_path(directory, "done", shard)):
+            continue
+        if not _claim(directory, shard, owner, lease):
+            continue
+        if os.path.exists(_shard_path(directory, "done", shard)):
+            # Finished by another worker between the check and the claim
+            _release(directory, shard, owner)
+            continue
+        _run_shard(directory, shard, runs[shard * size:(shard + 1) * size], owner, checkpoint_every)
+        finished += 1
+    return finished
+
+
+def sweep_status(directory):
+    """Number of shards "done", "running" (claimed) and "pending", and "shards"."""
+    sweep = _load(directory)
+    done = running = 0
+    for shard in range(sweep["shards"]):
+        if os.path.exists(_shard_path(directory, "done", shard)):
+            done += 1
+        elif os.path.exists(_shard_path(directory, "claims", shard)):
+            running += 1
+    return {
+        "shards": sweep["shards"],
+        "done": done,
+        "running": running,
+        "pending": sweep["shards"] - done - running,
+    }
+
+
+def collect_sweep(directory):
+    """Records of every run in run order; raises ValueError if shards are missing."""
+    sweep = _load(directory)
+    records = []
+    for shard in range(sweep["shards"]):
+        shard_records = _read_json(_shard_path(directory, "done", shard))
+        if shard_records is None:
+            raise ValueError(f"shard {shard} of {directory} is not finished")
+        records.extend(shard_records)
+    return records
+
+
+def run_sweep(
+    scenario,
+    directory,
+    workers=None,
+    shard_size=None,
+    lease=LEASE,
+    checkpoint_every=CHECKPOINT_EVERY,
+):
+    """
+    Run the sweep of a validated scenario in directory with workers local
+    processes (all cores by default) and return its records in run order,
+    or None when shards are still held by workers elsewhere. shard_size is
+    as in prepare_sweep. Calling it again after a crash, or on other
+    machines sharing the directory, picks up the remaining work.
+    """
+    prepare_sweep(scenario, directory, shard_size)
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        work(directory, lease, checkpoint_every)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(work, directory, lease, checkpoint_every) for _ in range(workers)]
+            for future in futures:
+                future.result()
+    status = sweep_status(directory)
+    if status["done"] < status["shards"]:
+        return None
+    return collect_sweep(directory)
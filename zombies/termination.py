@@ -0,0 +1,174 @@
+import numpy as np
+
+# Termination reasons, in order of priority when several apply at once
+RUNNING = ""
+BLOWUP = "blowup"
+EXTINCT = "extinct"
+STEADY = "steady"
+
+
+class StopCriteria:
+    """
+    Early-termination criteria for discrete and continuous runs.
+
+    names are the compartment names of the model, e.g. ("L", "Z") or
+    ("C", "Z", "M", "D"). A run stops when
+    - extinct: any compartment in extinction (name -> threshold) is at or
+      below its threshold,
+    - blowup: any compartment is non-finite or larger than blowup in
+      absolute value,
+    - steady: over window steps (or window time units for continuous runs)
+      every compartment in steady changes by at most atol + rtol * |value|.
+      steady defaults to all compartments; leave out accumulators such as D,
+      which keep growing at a constant rate once the others are at rest.
+
+    The discrete loops check the criteria every window steps. After a steady
+    stop the remainder of the trajectory is filled analytically (steady
+    compartments constant, the rest extrapolated linearly with their last
+    increment); after extinction or blow-up it is filled with NaN to mark the
+    run as terminated.
+    """
+
+    def __init__(
+        self,
+        names,
+        extinction=None,
+        blowup=None,
+        steady=None,
+        window=100,
+        rtol=1e-9,
+        atol=1e-9,
+    ):
+        self.names = tuple(names)
+        self.extinction = dict(extinction or {})
+        self.blowup = blowup
+        self.steady = tuple(self.names if steady is None else steady)
+        self.window = window
+        self.rtol = rtol
+        self.atol = atol
+        self._extinction_index = [self.names.index(name) for name in self.extinction]
+        self._steady_index = [self.names.index(name) for name in self.steady]
+
+    def check(self, state, reference=None, previous=None):
+        """
+        Termination reason for state, of shape (n_compartments, ...).
+        reference is the state window steps earlier and previous the state
+        one step earlier; the steady criterion needs reference and, when
+        previous is given, also requires the last step to be within the
+        tolerance, so period-2 oscillations of the Euler step are not taken
+        for a steady state. Returns a string for a single run, or a string
+        array with one reason per ensemble member; RUNNING ("") means keep
+        going.
+        """
+        state = np.asarray(state, dtype=float)
+        conditions, reasons = [], []
+        if self.blowup is not None:
+            conditions.append(
+                ~np.isfinite(state).all(axis=0) | (np.abs(state) > self.blowup).any(axis=0)
+            )
+            reasons.append(BLOWUP)
+        if self.extinction:
+            levels = np.array(list(self.extinction.values()))
+            levels = levels.reshape((-1,) + (1,) * (state.ndim - 1))
+            conditions.append((state[self._extinction_index] <= levels).any(axis=0))
+            reasons.append(EXTINCT)
+        if reference is not None and self._steady_index:
+            current = state[self._steady_index]
+            tolerance = self.atol + self.rtol * np.abs(current)
+            steady = np.ones(current.shape[1:], dtype=bool)
+            for other in (reference, previous):
+                if other is not None:
+                    change = np.abs(current - np.asarray(other)[self._steady_index])
+                    steady &= (change <= tolerance).all(axis=0)
+            conditions.append(steady)
+            reasons.append(STEADY)
+        reason = np.select(conditions, reasons, default=RUNNING) if conditions else RUNNING
+        return reason if np.ndim(reason) else str(reason)
+
+    def fill_coefficients(self, reason, last, increment):
+        """
+        (base, slope) such that the filled value at offset k after the stop is
+        base + k * slope: constant for steady compartments, linear with the
+        last increment for the others, and NaN unless reason is steady. All
+        arrays have shape (n_compartments, ...), with reason broadcast over
+        the member axes.
+        """
+        steady = np.asarray(reason) == STEADY
+        slope = np.where(steady, increment, 0.0)
+        slope[self._steady_index] = 0.0
+        return np.where(steady, last, np.nan), slope
+
+    def fill(self, reason, last, increment, steps):
+        """
+        Values after termination for the given offsets (in steps or time
+        units) from the termination point, either shared (T,) or per member
+        (T, ...). last and increment have shape (n_compartments, ...) and
+        reason is a string or an array with one reason per member; returns an
+        array (T, n_compartments, ...).
+        """
+        base, slope = self.fill_coefficients(reason, last, increment)
+        # Offsets (T,) are shared; offsets (T, ...) are per member
+        steps = np.asarray(steps, dtype=float)
+        steps = steps.reshape(steps.shape[:1] + (1,) + steps.shape[1:])
+        steps = steps.reshape(steps.shape + (1,) * (base.ndim + 1 - steps.ndim))
+        return base + steps * slope
+
+    def events(self, fun):
+        """
+        Terminal solve_ivp events implementing the criteria for the
+        continuous model fun(t, y, *args); solve_ivp passes the same args to
+        the events as to fun. The steady event fires when
+        window * |dy/dt| drops below atol + rtol * |y| for every steady
+        compartment.
+        """
+        events = []
+        for index, threshold in zip(self._extinction_index, self.extinction.values()):
+            events.append(_terminal(lambda t, y, *args, i=index, c=threshold: y[i] - c, -1))
+        if self.blowup is not None:
+            events.append(_terminal(lambda t, y, *args: self.blowup - np.max(np.abs(y)), -1))
+        if self._steady_index:
+
+            def steady(t, y, *args):
+                y = np.asarray(y, dtype=float)
+                rate = np.abs(np.asarray(fun(t, y, *args))[self._steady_index])
+                tolerance = self.atol + self.rtol * np.abs(y[self._steady_index])
+                return np.max(self.window * rate - tolerance)
+
+            events.append(_terminal(steady, -1))
+        return events
+
+    def reason_for_event(self, index):
+        """Termination reason of the index-th event returned by events()."""
+        reasons = [EXTINCT] * len(self.extinction)
+        if self.blowup is not None:
+            reasons.append(BLOWUP)
+        if self._steady_index:
+            reasons.append(STEADY)
+        return reasons[index]
+
+    def complete(self, sol, fun, t_eval, args=()):
+        """
+        Extend a solve_ivp result stopped by events() to every point of
+        t_eval, filling the remainder as described in the class docstring.
+        Adds "reason" and "t_stop" to sol and returns it.
+        """
+        sol.reason, sol.t_stop = RUNNING, None
+        if sol.status != 1:
+            return sol
+        fired = [k for k, times in enumerate(sol.t_events) if len(times)]
+        sol.reason = self.reason_for_event(fired[0])
+        sol.t_stop = sol.t_events[fired[0]][0]
+        last = sol.y_events[fired[0]][0]
+        t_eval = np.asarray(t_eval, dtype=float)
+        rest = t_eval[t_eval > sol.t[-1]] if len(sol.t) else t_eval
+        rate = np.asarray(fun(sol.t_stop, last, *args), dtype=float)
+        tail = self.fill(sol.reason, last, rate, rest - sol.t_stop)
+        sol.t = np.concatenate([sol.t, rest])
+        sol.y = np.hstack([sol.y, tail.T])
+        return sol
+
+
+def _terminal(event, direction):
+    event.terminal = True
+    event.direction = direction
+    return event
@@ -0,0 +1,60 @@
+import numpy as np
+
+from zombies import simulate_discrete
+from zombies.agents import simulate_agents
+from zombies.plotting import finish_figure, new_figure, plot_series, script_name
+
+# condiciones coexistencia (zombies_sistema_final.py)
+alpha = 0.033
+beta = 0.009
+beta_CZ = 0.009
+epsilon_CZ = 0.006
+beta_MZ = 0.0009
+gamma_MZ = 0.022
+E = 0.0015
+rho = 0.009
+params = [alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho]
+
+C0, Z0, M0, D0 = 48, 2, 50, 0
+init = np.array([C0, Z0, M0, D0])
+t_max = 300
+t = np.arange(0, t_max + 1)
+
+# Con estas tasas el paso de Euler del modelo discreto se pasa de largo
+# (el primer paso elimina casi todos los zombies); los agentes convierten
+# tasas en probabilidades 1 - exp(-tasa), así que incluso bien mezclados
+# no siguen la misma trayectoria.
+
+# Cada individuo del modelo son scale agentes (10^5 agentes al inicio)
+scale = 1000
+seed = 0
+# Desplazamiento por paso de civiles, zombies y militares (lado del mundo = 1)
+mezcla_rapida = (0.3, 0.3, 0.3)
+mezcla_local = (0.005, 0.002, 0.005)
+
+labels = ["Civiles", "Zombies", "Militares", "Muertos"]
+
+
+def main():
+    discrete = simulate_discrete(params, init, t_max)
+    runs = [("Modelo discreto", discrete)]
+    for name, speed in [("Agentes bien mezclados", mezcla_rapida), ("Agentes con contactos locales", mezcla_local)]:
+        counts, agents = simulate_agents(params, init, t_max, scale=scale, speed=speed, seed=seed)
+        print(f"{name}: {len(agents)} agentes vivos al final")
+        runs.append((name, counts))
+
+    fig = new_figure(figsize=(14, 8))
+    for i, label in enumerate(labels):
+        plot_series(
+            fig.add_subplot(2, 2, i + 1),
+            t,
+            [(values[:, i], style, name) for (name, values), style in zip(runs, ["k-", "--", "-"])],
+            label,
+            xlabel="Tiempo",
+            ylabel="Población",
+        )
+    finish_figure(fig, script_name(__file__))
+
+
+if __name__ == "__main__":
+    main()
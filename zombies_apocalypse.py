@@ -1,14 +1,7 @@
 import numpy as np
-import matplotlib.pyplot as plt
-from scipy.integrate import solve_ivp
-
-
-def lotka_volterra(t, y, alpha, beta, rho, gamma, delta):
-    L, Z = y
-    dLdt = (alpha - beta) * L - gamma * L * Z
-    dZdt = rho * beta * L + (gamma - delta) * L * Z
-    return [dLdt, dZdt]
 
+from zombies import lotka_volterra, solve_model
+from zombies.plotting import finish_figure, new_figure, plot_series, script_name
 
 # Parameter sets
 param_sets = [
@@ -37,12 +30,12 @@ param_sets = [
 # Time span for simulation
 t_span = (0, 100)
 t_eval = np.linspace(0, 100, 100)
+method = "LSODA"  # RK45, LSODA, Radau or BDF
 
-plt.figure(figsize=(12, 8))
 
-for i, params in enumerate(param_sets):
-    # Solve the differential equations
-    solution = solve_ivp(
+def simulate(params):
+    """Solve the differential equations for one parameter set."""
+    return solve_model(
         lotka_volterra,
         t_span,
         [params["L0"], params["Z0"]],
@@ -53,24 +46,32 @@ for i, params in enumerate(param_sets):
             params["gamma"],
             params["delta"],
         ),
+        method=method,
         t_eval=t_eval,
     )
 
-    # Plot time series
-    plt.subplot(2, 1, i + 1)
-    plt.plot(solution.t, solution.y[0], "b-", label="L (prey)")
-    plt.plot(solution.t, solution.y[1], "r-", label="Z (predator)")
-    plt.xlabel("Time")
-    plt.ylabel("Population")
-    plt.title(f"Parameter Set {i+1}: Initial L={params['L0']}, Z={params['Z0']}")
-    plt.legend()
-    plt.grid(True)
 
-plt.tight_layout()
-# Get filename without extension
-filename = __file__.split("/")[-1].split(".")[0]
-# Save the figure with the same name as the Python file
-plt.savefig(f"./results/{filename}.png")
-plt.show()
+def main():
+    fig = new_figure(figsize=(12, 8))
+
+    for i, params in enumerate(param_sets):
+        solution = simulate(params)
+
+        # Plot time series
+        plot_series(
+            fig.add_subplot(2, 1, i + 1),
+            solution.t,
+            [
+                (solution.y[0], "b-", "L (prey)"),
+                (solution.y[1], "r-", "Z (predator)"),
+            ],
+            f"Parameter Set {i+1}: Initial L={params['L0']}, Z={params['Z0']}",
+        )
+
+    # Save the figure with the same name as the Python file
+    path = finish_figure(fig, script_name(__file__))
+    print(f"Simulation complete. Results saved as '{path}'")
+
 
-print(f"Simulation complete. Results saved as './results/{filename}.png'")
+if __name__ == "__main__":
+    main()
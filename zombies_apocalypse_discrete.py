@@ -1,22 +1,7 @@
 import numpy as np
-import matplotlib.pyplot as plt
-
-
-def discrete_lotka_volterra(L, Z, alpha, beta, rho, gamma, delta, dt):
-    """
-    Discrete-time version of the Lotka-Volterra model.
-    Uses Euler method to discretize the continuous equations.
-    """
-    # Update for L (prey)
-    dL = ((alpha - beta) * L - gamma * L * Z) * dt
-    new_L = L + dL
-
-    # Update for Z (predator)
-    dZ = (rho * beta * L + (gamma - delta) * L * Z) * dt
-    new_Z = Z + dZ
-
-    return max(0, new_L), max(0, new_Z)  # Ensure populations don't go negative
 
+from zombies import simulate_ensemble, stack_param_sets
+from zombies.plotting import finish_figure, new_figure, plot_series, script_name
 
 # Parameter sets
 param_sets = [
@@ -47,45 +32,44 @@ dt = 0.1  # Time step
 time_steps = 1000  # Number of time steps
 time = np.arange(0, time_steps * dt, dt)  # Time array
 
-plt.figure(figsize=(12, 8))
 
-for i, params in enumerate(param_sets):
-    # Initialize arrays to store population values
-    L_values = np.zeros(time_steps)
-    Z_values = np.zeros(time_steps)
+def simulate():
+    """Run every parameter set together with the ensemble engine."""
+    stacked = stack_param_sets(param_sets)
+    return simulate_ensemble(
+        stacked["L0"],
+        stacked["Z0"],
+        stacked["alpha"],
+        stacked["beta"],
+        stacked["rho"],
+        stacked["gamma"],
+        stacked["delta"],
+        dt,
+        time_steps,
+    )
+
+
+def main():
+    L_ensemble, Z_ensemble = simulate()
 
-    # Set initial conditions
-    L_values[0] = params["L0"]
-    Z_values[0] = params["Z0"]
+    fig = new_figure(figsize=(12, 8))
 
-    # Run discrete simulation
-    for t in range(1, time_steps):
-        L_values[t], Z_values[t] = discrete_lotka_volterra(
-            L_values[t - 1],
-            Z_values[t - 1],
-            params["alpha"],
-            params["beta"],
-            params["rho"],
-            params["gamma"],
-            params["delta"],
-            dt,
+    for i, params in enumerate(param_sets):
+        # Plot time series
+        plot_series(
+            fig.add_subplot(2, 1, i + 1),
+            time,
+            [
+                (L_ensemble[:, i], "b-", "L (prey)"),
+                (Z_ensemble[:, i], "r-", "Z (predator)"),
+            ],
+            f"Discrete Model - Set {i+1}: Initial L={params['L0']}, Z={params['Z0']}",
         )
 
-    # Plot time series
-    plt.subplot(2, 1, i + 1)
-    plt.plot(time, L_values, "b-", label="L (prey)")
-    plt.plot(time, Z_values, "r-", label="Z (predator)")
-    plt.xlabel("Time")
-    plt.ylabel("Population")
-    plt.title(f"Discrete Model - Set {i+1}: Initial L={params['L0']}, Z={params['Z0']}")
-    plt.legend()
-    plt.grid(True)
+    # Save the figure with the same name as the Python file
+    path = finish_figure(fig, script_name(__file__))
+    print(f"Simulation complete. Results saved as '{path}'")
 
-plt.tight_layout()
-# Get filename without extension
-filename = __file__.split("/")[-1].split(".")[0]
-# Save the figure with the same name as the Python file
-plt.savefig(f"./results/{filename}.png")
-plt.show()
 
-print(f"Simulation complete. Results saved as './results/{filename}.png'")
+if __name__ == "__main__":
+    main()
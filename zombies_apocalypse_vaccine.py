@@ -1,46 +1,13 @@
 import numpy as np
-import matplotlib.pyplot as plt
 
+from zombies.branching import simulate_branches
+from zombies.cache import ResultCache
+from zombies.plotting import finish_figure, new_figure, plot_series, script_name
 
 # APPROACH
-# Modifying the gamma introducing "effective gamma"
-def discrete_lotka_volterra(
-    L,
-    Z,
-    alpha,
-    beta,
-    rho,
-    gamma,
-    delta,
-    dt,
-    time_step,
-    vaccine_period=10,
-    vaccine_efficacy=0.5,
-):
-    """
-    Discrete-time version of the Lotka-Volterra model with periodic vaccine intervention.
-    Uses Euler method to discretize the continuous equations.
-
-    The vaccine is modeled as a periodic dirac delta that reduces the gamma factor
-    (which represents infection due to contact with Z population).
-    """
-    # Apply vaccine effect (reduce gamma) if current time step is a multiple of vaccine_period
-    effective_gamma = gamma
-    if time_step % vaccine_period == 0 and time_step > 0:
-        effective_gamma = gamma * (
-            1 - vaccine_efficacy
-        )  # Reduce gamma by vaccine_efficacy %
-
-    # Update for L (prey)
-    dL = ((alpha - beta) * L - effective_gamma * L * Z) * dt
-    new_L = L + dL
-
-    # Update for Z (predator)
-    dZ = (rho * beta * L + (effective_gamma - delta) * L * Z) * dt
-    new_Z = Z + dZ
-
-    return max(0, new_L), max(0, new_Z)  # Ensure populations don't go negative
-
+# Modifying the gamma introducing "effective gamma": the vaccine is modeled as
+# a periodic dirac delta that reduces the gamma factor (which represents
+# infection due to contact with Z population).
 
 # Parameter sets
 param_sets = [
@@ -75,99 +42,78 @@ time = np.arange(0, time_steps * dt, dt)  # Time array
 vaccine_period = 10  # Apply vaccine every 10 time steps
 vaccine_efficacy = 0.5  # 50% reduction in gamma when vaccine is applied
 
-plt.figure(figsize=(15, 12))
-
-for i, params in enumerate(param_sets):
-    # Initialize arrays to store population values
-    L_values = np.zeros(time_steps)
-    Z_values = np.zeros(time_steps)
-    gamma_effective = np.zeros(time_steps)  # Track effective gamma values
-
-    # Set initial conditions
-    L_values[0] = params["L0"]
-    Z_values[0] = params["Z0"]
-    gamma_effective[0] = params["gamma"]
-
-    # Run discrete simulation
-    for t in range(1, time_steps):
-        # Determine if vaccine is active at this time step
-        is_vaccine_time = t % vaccine_period == 0
-        effective_gamma = params["gamma"] * (
-            1 - vaccine_efficacy if is_vaccine_time else 1
+
+def simulate():
+    """
+    Fork the vaccinated run of every set from its baseline without
+    intervention, which is simulated once. Returns one
+    (L_values, Z_values, tree) per set, with the baseline in column 0 and the
+    vaccinated branch in column 1.
+    """
+    cache = ResultCache()
+    branches = [{"vaccine_period": vaccine_period, "vaccine_efficacy": vaccine_efficacy}]
+    runs = [
+        cache.call(simulate_branches, params, dt, time_steps, branches)
+        for params in param_sets
+    ]
+    # Checked on every run, cached or not: a cache hit skips the simulation
+    for params, (L_values, Z_values, _) in zip(param_sets, runs):
+        if not (np.isfinite(L_values).all() and np.isfinite(Z_values).all()):
+            print(f"Invalid set of parameters: non-finite population in {params['name']}.")
+    return runs
+
+
+def main():
+    runs = simulate()
+
+    # Effective gamma at every step, to show vaccine timing
+    steps = np.arange(time_steps)
+    is_vaccine_time = (steps % vaccine_period == 0) & (steps > 0)
+
+    fig = new_figure(figsize=(15, 12))
+
+    for i, (params, (L_branches, Z_branches, _)) in enumerate(zip(param_sets, runs)):
+        L_values = L_branches[:, 1]
+        Z_values = Z_branches[:, 1]
+        L_original = L_branches[:, 0]
+        Z_original = Z_branches[:, 0]
+        gamma_effective = np.where(
+            is_vaccine_time, params["gamma"] * (1 - vaccine_efficacy), params["gamma"]
         )
-        gamma_effective[t] = effective_gamma
-
-        L_values[t], Z_values[t] = discrete_lotka_volterra(
-            L_values[t - 1],
-            Z_values[t - 1],
-            params["alpha"],
-            params["beta"],
-            params["rho"],
-            params["gamma"],
-            params["delta"],
-            dt,
-            t,
-            vaccine_period,
-            vaccine_efficacy,
+
+        # Plot time series for populations
+        plot_series(
+            fig.add_subplot(3, 2, i * 3 + 1),
+            time,
+            [(L_values, "b-", "L (prey)"), (Z_values, "r-", "Z (predator)")],
+            f"Vaccine Model - Set {i+1}: Initial L={params['L0']}, Z={params['Z0']}",
         )
 
-    # Plot time series for populations
-    plt.subplot(3, 2, i * 3 + 1)
-    plt.plot(time, L_values, "b-", label="L (prey)")
-    plt.plot(time, Z_values, "r-", label="Z (predator)")
-    plt.xlabel("Time")
-    plt.ylabel("Population")
-    plt.title(f"Vaccine Model - Set {i+1}: Initial L={params['L0']}, Z={params['Z0']}")
-    plt.legend()
-    plt.grid(True)
-
-    # Plot the effective gamma values to show vaccine timing
-    plt.subplot(3, 2, i * 3 + 2)
-    plt.plot(time, gamma_effective, "g-")
-    plt.xlabel("Time")
-    plt.ylabel("Effective γ")
-    plt.title(f"Vaccine Effect (γ reduction) - Set {i+1}")
-    plt.grid(True)
-
-    # Compare with original model (without vaccine)
-    plt.subplot(3, 2, i * 3 + 3)
-
-    # Run original model for comparison
-    L_original = np.zeros(time_steps)
-    Z_original = np.zeros(time_steps)
-    L_original[0] = params["L0"]
-    Z_original[0] = params["Z0"]
-
-    for t in range(1, time_steps):
-        L_original[t], Z_original[t] = discrete_lotka_volterra(
-            L_original[t - 1],
-            Z_original[t - 1],
-            params["alpha"],
-            params["beta"],
-            params["rho"],
-            params["gamma"],
-            params["delta"],
-            dt,
-            t,
-            999999,
-            0,  # No vaccine (using large period)
+        # Plot the effective gamma values to show vaccine timing
+        ax = fig.add_subplot(3, 2, i * 3 + 2)
+        ax.plot(time, gamma_effective, "g-")
+        ax.set_xlabel("Time")
+        ax.set_ylabel("Effective γ")
+        ax.set_title(f"Vaccine Effect (γ reduction) - Set {i+1}")
+        ax.grid(True)
+
+        # Compare with original model (without vaccine)
+        plot_series(
+            fig.add_subplot(3, 2, i * 3 + 3),
+            time,
+            [
+                (L_values, "b-", "L (with vaccine)"),
+                (Z_values, "r-", "Z (with vaccine)"),
+                (L_original, "b--", "L (no vaccine)"),
+                (Z_original, "r--", "Z (no vaccine)"),
+            ],
+            f"Comparison - Set {i+1}",
         )
 
-    plt.plot(time, L_values, "b-", label="L (with vaccine)")
-    plt.plot(time, Z_values, "r-", label="Z (with vaccine)")
-    plt.plot(time, L_original, "b--", label="L (no vaccine)")
-    plt.plot(time, Z_original, "r--", label="Z (no vaccine)")
-    plt.xlabel("Time")
-    plt.ylabel("Population")
-    plt.title(f"Comparison - Set {i+1}")
-    plt.legend()
-    plt.grid(True)
-
-plt.tight_layout()
-# Get filename without extension
-filename = __file__.split("/")[-1].split(".")[0]
-# Save the figure with the same name as the Python file
-plt.savefig(f"./results/{filename}.png")
-plt.show()
-
-print(f"Simulation complete. Results saved as './results/{filename}.png'")
+    # Save the figure with the same name as the Python file
+    path = finish_figure(fig, script_name(__file__))
+    print(f"Simulation complete. Results saved as '{path}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,38 +1,8 @@
 import numpy as np
-import matplotlib.pyplot as plt
-
-
-def discrete_lotka_volterra(
-    L,
-    Z,
-    alpha,
-    beta,
-    rho,
-    gamma,
-    delta,
-    dt,
-    time_step,
-    vaccine_period=50,
-    zombie_removal_ratio=0.1,
-):
-    """
-    Discrete-time version of the Lotka-Volterra model with periodic zombie removal.
-    Uses Euler method to discretize the continuous equations.
-
-    A fraction of the zombie population is removed periodically to simulate a vaccine or control effort.
-    """
-    exogenous_zombie_remover = 0
-    if time_step % vaccine_period == 0 and time_step > 0:
-        exogenous_zombie_remover = zombie_removal_ratio * Z
-
-    dL = ((alpha - beta) * L - gamma * L * Z) * dt
-    new_L = L + dL
-
-    dZ = (rho * beta * L + (gamma - delta) * L * Z) * dt - exogenous_zombie_remover
-    new_Z = Z + dZ
-
-    return max(0, new_L), max(0, new_Z)
 
+from zombies.branching import simulate_branches
+from zombies.cache import ResultCache
+from zombies.plotting import finish_figure, new_figure, plot_series, script_name
 
 # Parameter sets
 param_sets = [
@@ -67,78 +37,62 @@ time = np.arange(0, time_steps * dt, dt)
 vaccine_period = 20
 zombie_removal_ratio = 0.1  # 10% of Z removed periodically
 
-plt.figure(figsize=(12, 10))
 
-for i, params in enumerate(param_sets):
-    L_values = np.zeros(time_steps)
-    Z_values = np.zeros(time_steps)
-
-    L_values[0] = params["L0"]
-    Z_values[0] = params["Z0"]
-
-    for t in range(1, time_steps):
-        L_values[t], Z_values[t] = discrete_lotka_volterra(
-            L_values[t - 1],
-            Z_values[t - 1],
-            params["alpha"],
-            params["beta"],
-            params["rho"],
-            params["gamma"],
-            params["delta"],
-            dt,
-            t,
-            vaccine_period,
-            zombie_removal_ratio,
+def simulate():
+    """
+    Fork the removal run of every set from its baseline without
+    intervention, which is simulated once. Returns one
+    (L_values, Z_values, tree) per set, with the baseline in column 0 and the
+    removal branch in column 1.
+    """
+    cache = ResultCache()
+    branches = [{"vaccine_period": vaccine_period, "zombie_removal_ratio": zombie_removal_ratio}]
+    runs = [
+        cache.call(simulate_branches, params, dt, time_steps, branches)
+        for params in param_sets
+    ]
+    # Checked on every run, cached or not: a cache hit skips the simulation
+    for params, (L_values, Z_values, _) in zip(param_sets, runs):
+        if not (np.isfinite(L_values).all() and np.isfinite(Z_values).all()):
+            print(f"Invalid set of parameters: non-finite population in {params['name']}.")
+    return runs
+
+
+def main():
+    runs = simulate()
+
+    fig = new_figure(figsize=(12, 10))
+
+    for i, (params, (L_branches, Z_branches, _)) in enumerate(zip(param_sets, runs)):
+        L_values = L_branches[:, 1]
+        Z_values = Z_branches[:, 1]
+        L_orig = L_branches[:, 0]
+        Z_orig = Z_branches[:, 0]
+
+        # Plot time series for populations
+        plot_series(
+            fig.add_subplot(2, 2, i * 2 + 1),
+            time,
+            [(L_values, "b-", "L (prey)"), (Z_values, "r-", "Z (zombies)")],
+            f"Zombie Removal - Set {i+1}: L0={params['L0']}, Z0={params['Z0']}",
         )
 
-    # Plot time series for populations
-    plt.subplot(2, 2, i * 2 + 1)
-    plt.plot(time, L_values, "b-", label="L (prey)")
-    plt.plot(time, Z_values, "r-", label="Z (zombies)")
-    plt.xlabel("Time")
-    plt.ylabel("Population")
-    plt.title(f"Zombie Removal - Set {i+1}: L0={params['L0']}, Z0={params['Z0']}")
-    plt.legend()
-    plt.grid(True)
-
-    # Run original model (no zombie removal)
-    L_orig = np.zeros(time_steps)
-    Z_orig = np.zeros(time_steps)
-    L_orig[0] = params["L0"]
-    Z_orig[0] = params["Z0"]
-
-    for t in range(1, time_steps):
-        L_orig[t], Z_orig[t] = discrete_lotka_volterra(
-            L_orig[t - 1],
-            Z_orig[t - 1],
-            params["alpha"],
-            params["beta"],
-            params["rho"],
-            params["gamma"],
-            params["delta"],
-            dt,
-            t,
-            999999,  # No removal
-            0,
+        plot_series(
+            fig.add_subplot(2, 2, i * 2 + 2),
+            time,
+            [
+                (L_values, "b-", "L (with removal)"),
+                (Z_values, "r-", "Z (with removal)"),
+                (L_orig, "b--", "L (no removal)"),
+                (Z_orig, "r--", "Z (no removal)"),
+            ],
+            f"Comparison - Set {i+1}",
         )
 
-    plt.subplot(2, 2, i * 2 + 2)
-    plt.plot(time, L_values, "b-", label="L (with removal)")
-    plt.plot(time, Z_values, "r-", label="Z (with removal)")
-    plt.plot(time, L_orig, "b--", label="L (no removal)")
-    plt.plot(time, Z_orig, "r--", label="Z (no removal)")
-    plt.xlabel("Time")
-    plt.ylabel("Population")
-    plt.title(f"Comparison - Set {i+1}")
-    plt.legend()
-    plt.grid(True)
-
-plt.tight_layout()
+    # Save the figure using script name
+    path = finish_figure(fig, script_name(__file__))
+    print(f"Simulation complete. Results saved as '{path}'")
 
-# Save the figure using script name
-import os
-filename = os.path.basename(__file__).split(".")[0]
-plt.savefig(f"./results/{filename}.png")
-plt.show()
 
-print(f"Simulation complete. Results saved as './results/{filename}.png'")
+if __name__ == "__main__":
+    main()
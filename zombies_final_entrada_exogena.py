@@ -1,6 +1,18 @@
 import numpy as np
-from scipy.integrate import solve_ivp
-import matplotlib.pyplot as plt
+
+from zombies import (
+    continuous_model,
+    military_impulses,
+    military_pulse,
+    simulate_discrete,
+    solve_impulsive,
+    solver_options,
+)
+from zombies.cache import ResultCache
+from zombies.discrete import INVALID_DISCRETE
+from zombies.instrument import stage
+from zombies.plotting import script_name
+from zombies.render import series_figure, show_figures
 
 # Parámetros fijos (condiciones de coexistencia)
 alpha = 0.033
@@ -21,88 +33,78 @@ init_continuous = [C0, Z0, M0, D0]
 # Tiempo
 t_max = 1500
 t = np.arange(0, t_max + 1)
+method = "LSODA"  # RK45, LSODA, Radau o BDF
 
-# ---------- Pulsos exógenos ----------
-def military_pulse(t, magnitude=10, interval=300):
-    """Simula una entrada tipo delta de Dirac como pulso discreto periódico."""
-    return magnitude if t % interval == 0 and t > 0 else 0
-
-# ---------- Modelo discreto ----------
-def simulate_discrete(params):
-    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
-    C, Z, M, D = init_discrete.copy()
-    result = [[C, Z, M, D]]
-    for step in range(1, t_max + 1):
-        pulse = military_pulse(step)
-        Ct1 = C + (alpha - beta - E) * C - beta_CZ * C * Z
-        Zt1 = Z + (beta_CZ - epsilon_CZ) * C * Z + rho * beta * (C + M) + (beta_MZ - gamma_MZ) * Z * M
-        Mt1 = M + E * C - beta * M - beta_MZ * Z * M + pulse  # <- entrada exógena
-        Dt1 = D + (1 - rho) * beta * (C + M) + epsilon_CZ * C * Z + gamma_MZ * Z * M
-        if any(x < 0 for x in [Ct1, Zt1, Mt1, Dt1]):
-            print("Invalid set of parameters: negative population in discrete model.")
-            return None
-        C, Z, M, D = Ct1, Zt1, Mt1, Dt1
-        result.append([C, Z, M, D])
-    return np.array(result)
-
-# ---------- Modelo continuo ----------
-def continuous_model(t, y, params):
-    C, Z, M, D = y
-    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
-    pulse = military_pulse(int(t))  # Discreto dentro del continuo
-    dC = (alpha - beta - E) * C - beta_CZ * C * Z
-    dZ = (beta_CZ - epsilon_CZ) * C * Z + rho * beta * (C + M) + (beta_MZ - gamma_MZ) * Z * M
-    dM = E * C - beta * M - beta_MZ * Z * M + pulse
-    dD = (1 - rho) * beta * (C + M) + epsilon_CZ * C * Z + gamma_MZ * Z * M
-    return [dC, dZ, dM, dD]
-
-# ---------- Ejecutar modelo discreto ----------
-res_discrete = simulate_discrete(params)
-if res_discrete is None:
-    exit()
-
-# ---------- Ejecutar modelo continuo ----------
-sol_continuous = solve_ivp(
-    fun=lambda t, y: continuous_model(t, y, params),
-    t_span=(0, t_max),
-    y0=init_continuous,
-    t_eval=t
-)
+labels = ["Civiles", "Zombies", "Militares", "Muertos"]
 
-if np.any(sol_continuous.y < 0):
-    print("Invalid set of parameters: negative population in continuous model.")
-    exit()
 
-# ---------- Imprimir resultados ----------
-labels = ["Civiles", "Zombies", "Militares", "Muertos"]
-print("Resultados finales del modelo discreto:")
-for i, label in enumerate(labels):
-    print(f"{label}: {res_discrete[-1, i]:.2f}")
-
-print("\nResultados finales del modelo continuo:")
-for i, label in enumerate(labels):
-    print(f"{label}: {sol_continuous.y[i, -1]:.2f}")
-
-# ---------- Graficar modelo discreto ----------
-plt.figure(figsize=(10, 5))
-for i, label in enumerate(labels):
-    plt.plot(t, res_discrete[:, i], label=label)
-plt.title("Modelo Discreto con Pulsos Militares")
-plt.xlabel("Tiempo")
-plt.ylabel("Población")
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
-plt.show()
-
-# ---------- Graficar modelo continuo ----------
-plt.figure(figsize=(10, 5))
-for i, label in enumerate(labels):
-    plt.plot(t, sol_continuous.y[i], label=label)
-plt.title("Modelo Continuo con Pulsos Militares")
-plt.xlabel("Tiempo")
-plt.ylabel("Población")
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
-plt.show()
+def model_figure(suffix, values, title):
+    """
+    Job de show_figures con las cuatro poblaciones de un modelo, guardado
+    como results/<script>_<suffix>.png cuando se corre sin pantalla.
+    """
+    series = [(values[i], None, label) for i, label in enumerate(labels)]
+    return (
+        f"{script_name(__file__)}_{suffix}",
+        series_figure,
+        (t, series, title),
+        {"xlabel": "Tiempo", "ylabel": "Población"},
+    )
+
+
+def main():
+    # Etapas medidas con ZOMBIES_PROFILE=results/profile.json (ver zombies.instrument)
+    with stage("setup"):
+        cache = ResultCache()
+        impulses = military_impulses((0, t_max))
+        options = solver_options(continuous_model, method)
+
+    # ---------- Ejecutar modelo discreto ----------
+    with stage("integrate"):
+        res_discrete = cache.call(
+            simulate_discrete, params, init_discrete, t_max, pulse=military_pulse, warn=False
+        )
+    if res_discrete is None:
+        # Revisado aquí y no en la simulación: un None leído de la caché no avisa
+        print(INVALID_DISCRETE)
+        return
+
+    # ---------- Ejecutar modelo continuo ----------
+    # Los pulsos militares se aplican como saltos en M entre segmentos
+    with stage("integrate"):
+        sol_continuous = solve_impulsive(
+            continuous_model,
+            (0, t_max),
+            init_continuous,
+            impulses,
+            t_eval=t,
+            args=(params,),
+            **options,
+        )
+
+    with stage("post-check"):
+        negative = np.any(sol_continuous.y < 0)
+    if negative:
+        print("Invalid set of parameters: negative population in continuous model.")
+        return
+
+    # ---------- Imprimir resultados ----------
+    print("Resultados finales del modelo discreto:")
+    for i, label in enumerate(labels):
+        print(f"{label}: {res_discrete[-1, i]:.2f}")
+
+    print("\nResultados finales del modelo continuo:")
+    for i, label in enumerate(labels):
+        print(f"{label}: {sol_continuous.y[i, -1]:.2f}")
+
+    # ---------- Graficar ----------
+    # Con ZOMBIES_HEADLESS=1 se guardan en results/ sin abrir ventanas;
+    # finish_figure mide la etapa "plot" (layout) y "save"
+    show_figures([
+        model_figure("discreto", res_discrete.T, "Modelo Discreto con Pulsos Militares"),
+        model_figure("continuo", sol_continuous.y, "Modelo Continuo con Pulsos Militares"),
+    ])
+
+
+if __name__ == "__main__":
+    main()
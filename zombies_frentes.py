@@ -0,0 +1,59 @@
+import numpy as np
+
+from zombies.plotting import finish_figure, new_figure, script_name
+from zombies.spatial import front_radius, point_outbreak, simulate_reaction_diffusion
+
+# condiciones coexistencia (zombies_sistema_final.py) sin reanimación: los
+# zombies solo aparecen por contagio desde el brote inicial
+alpha = 0.033
+beta = 0.009
+beta_CZ = 0.009
+epsilon_CZ = 0.006
+beta_MZ = 0.0009
+gamma_MZ = 0.022
+E = 0.0015
+rho = 0.0
+params = [alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho]
+
+# Malla de n x n celdas: civiles en todas partes, un brote de zombies al centro
+n = 256
+background = (48, 0, 0)
+outbreak = 5
+diffusion = (0.05, 0.5, 0.05)  # C, Z, M (celdas^2 por unidad de tiempo)
+
+dt = 1.0
+steps = 300
+snapshot_every = 30
+threshold = 1.0  # nivel de Z que marca el frente
+threads = 1
+
+
+def main():
+    u0 = point_outbreak((n, n), background, outbreak, radius=3)
+    times, snapshots, _ = simulate_reaction_diffusion(
+        u0, params, diffusion, dt, steps, snapshot_every=snapshot_every, threads=threads
+    )
+    radius = front_radius(snapshots[:, 1], threshold)
+    for t, r in zip(times, radius):
+        print(f"t = {t:5.0f}: radio del frente {r:6.1f} celdas")
+
+    fig = new_figure(figsize=(14, 8))
+    shown = [1, 2, 3, 4]
+    for k, i in enumerate(shown):
+        ax = fig.add_subplot(2, len(shown), k + 1)
+        image = ax.imshow(snapshots[i, 1], cmap="Reds", origin="lower")
+        fig.colorbar(image, ax=ax, shrink=0.8)
+        ax.set_title(f"Zombies, t = {times[i]:.0f}")
+        ax.set_xticks([])
+        ax.set_yticks([])
+    ax = fig.add_subplot(2, 1, 2)
+    ax.plot(times, radius, "r.-")
+    ax.set_xlabel("Tiempo")
+    ax.set_ylabel("Radio del frente (celdas)")
+    ax.set_title(f"Frente de propagación (Z > {threshold})")
+    ax.grid(True)
+    finish_figure(fig, script_name(__file__))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from scipy import stats
+
+from zombies import military_pulse
+from zombies.forecast import forecast_ensemble
+from zombies.plotting import finish_figure, new_figure, plot_fan, script_name
+from zombies.sensitivity import parameter_bounds
+
+# condiciones coexistencia (zombies_sistema_final.py)
+params = [0.033, 0.009, 0.009, 0.006, 0.0009, 0.022, 0.0015, 0.009]
+init = [48, 2, 50, 0]
+t_max = 1500
+
+# Parámetros inciertos: uniformes en +/- 20% (tupla) o una distribución de
+# scipy.stats; el resto queda fijo
+bounds = parameter_bounds(params, 0.2)
+distributions = {
+    "beta_CZ": tuple(bounds[2]),
+    "gamma_MZ": stats.norm(params[5], 0.1 * params[5]),
+    "E": tuple(bounds[6]),
+}
+
+# Miembros del ensamble; la memoria no crece con ellos, solo el tiempo
+members = 20000
+seed = 0
+# Bandas guardadas cada 5 pasos
+every = 5
+
+labels = {"C": "Civiles", "Z": "Zombies", "M": "Militares", "D": "Muertos"}
+
+
+def main():
+    forecast = forecast_ensemble(
+        params, init, t_max, members, distributions, pulse=military_pulse, every=every, seed=seed
+    )
+    print(f"{forecast['invalid']} de {members} miembros inválidos (población negativa)")
+
+    fig = new_figure(figsize=(14, 8))
+    for i, (name, label) in enumerate(labels.items()):
+        plot_fan(
+            fig.add_subplot(2, 2, i + 1),
+            forecast,
+            name,
+            label,
+            color=f"C{i}",
+            xlabel="Tiempo",
+            ylabel="Población",
+            labels=("Mediana", "Media"),
+        )
+    # Los miembros inválidos salen de las bandas: son condicionales a la validez
+    valid = members - forecast["invalid"]
+    fig.suptitle(
+        f"Pronóstico de {members} miembros: bandas sobre los aún válidos (sin "
+        f"población negativa) en cada tiempo, {valid} al final"
+    )
+    finish_figure(fig, script_name(__file__))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+
+from zombies.plotting import finish_figure, new_figure, script_name
+from zombies.stability import REGIMES, czm_regimes
+
+# condiciones coexistencia (zombies_sistema_final.py)
+alpha = 0.033
+beta = 0.009
+beta_CZ = 0.009
+epsilon_CZ = 0.006
+beta_MZ = 0.0009
+gamma_MZ = 0.022
+E = 0.0015
+rho = 0.009
+
+# Malla (alpha, beta_CZ) de resolution x resolution puntos
+resolution = 1000
+alpha_range = (0.005, 0.08)
+beta_CZ_range = (0.001, 0.03)
+
+
+def main():
+    alphas = np.linspace(*alpha_range, resolution)
+    betas_CZ = np.linspace(*beta_CZ_range, resolution)
+    A, B = np.meshgrid(alphas, betas_CZ)
+    result = czm_regimes([A, beta, B, epsilon_CZ, beta_MZ, gamma_MZ, E, rho])
+    codes = np.zeros(A.shape, dtype=int)
+    for k, name in enumerate(REGIMES):
+        codes[result["regime"] == name] = k
+        print(f"{name}: {np.mean(result['regime'] == name):.1%}")
+
+    fig = new_figure(figsize=(8, 6))
+    ax = fig.add_subplot(1, 1, 1)
+    image = ax.pcolormesh(alphas, betas_CZ, codes, cmap="viridis", vmin=0, vmax=len(REGIMES) - 1)
+    colorbar = fig.colorbar(image, ax=ax, ticks=range(len(REGIMES)))
+    colorbar.ax.set_yticklabels(REGIMES)
+    ax.plot(alpha, beta_CZ, "r*", markersize=12, label="coexistencia")
+    ax.set_xlabel("alpha")
+    ax.set_ylabel("beta_CZ")
+    ax.set_title("Régimen del sistema C-Z-M según la estabilidad lineal")
+    ax.legend(loc="upper right")
+    finish_figure(fig, script_name(__file__))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import numpy as np
+
+from zombies.plotting import finish_figure, new_figure, script_name
+from zombies.sensitivity import (
+    CONTINUOUS_PARAM_NAMES,
+    evaluate_discrete,
+    parameter_bounds,
+    saltelli_sample,
+    sobol_indices,
+)
+
+# condiciones coexistencia (zombies_sistema_final.py), variadas en +/- 25%
+params = [0.033, 0.009, 0.009, 0.006, 0.0009, 0.022, 0.0015, 0.009]
+spread = 0.25
+init = [48, 2, 50, 0]
+t_max = 1500
+
+# Diseño de Saltelli: n * (8 + 2) evaluaciones del modelo discreto
+n = 4096
+seed = 0
+workers = None  # None usa todos los núcleos
+
+# Salidas de SummaryStats: civiles finales y peak de zombies
+outputs = {"final_C": "Civiles finales", "max_Z": "Peak de zombies"}
+
+
+def main():
+    bounds = parameter_bounds(params, spread)
+    samples = saltelli_sample(bounds, n, seed=seed)
+    # Sin pulsos militares, como zombies_sistema_final.py
+    values = evaluate_discrete(samples, init, t_max, outputs=tuple(outputs), workers=workers)
+    indices = sobol_indices(values, len(params), resamples=100, seed=seed)
+
+    fig = new_figure(figsize=(12, 5))
+    x = np.arange(len(params))
+    for k, (name, title) in enumerate(outputs.items()):
+        result = indices[name]
+        print(f"\n{title} ({np.isnan(values[name]).sum()} conjuntos inválidos)")
+        print(f"{'parámetro':>12} {'S1':>8} {'ST':>8}")
+        for i, label in enumerate(CONTINUOUS_PARAM_NAMES):
+            print(f"{label:>12} {result['S1'][i]:8.3f} {result['ST'][i]:8.3f}")
+
+        ax = fig.add_subplot(1, len(outputs), k + 1)
+        ax.bar(x - 0.2, result["S1"], 0.4, yerr=result["S1_conf"], label="Primer orden")
+        ax.bar(x + 0.2, result["ST"], 0.4, yerr=result["ST_conf"], label="Total")
+        ax.set_xticks(x, CONTINUOUS_PARAM_NAMES, rotation=45)
+        ax.set_title(title)
+        ax.set_ylabel("Índice de Sobol")
+        ax.legend()
+        ax.grid(True, axis="y")
+    finish_figure(fig, script_name(__file__))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,10 @@
 import numpy as np
-from scipy.integrate import solve_ivp
-import matplotlib.pyplot as plt
+
+from zombies import continuous_model, simulate_discrete, solve_model
+from zombies.cache import ResultCache
+from zombies.discrete import INVALID_DISCRETE
+from zombies.plotting import script_name
+from zombies.render import series_figure, show_figures
 
 # Parámetros fijos
 # condiciones coexistencia
@@ -22,81 +26,67 @@ init_continuous = [C0, Z0, M0, D0]
 # Tiempo
 t_max = 1500
 t = np.arange(0, t_max + 1)
+method = "LSODA"  # RK45, LSODA, Radau o BDF
 
-# Modelo discreto
-def simulate_discrete(params):
-    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
-    C, Z, M, D = init_discrete.copy()
-    result = [[C, Z, M, D]]
-    for _ in range(t_max):
-        Ct1 = C + (alpha - beta - E) * C - beta_CZ * C * Z
-        Zt1 = Z + (beta_CZ - epsilon_CZ) * C * Z + rho * beta * (C + M) + (beta_MZ - gamma_MZ) * Z * M
-        Mt1 = M + E * C - beta * M - beta_MZ * Z * M
-        Dt1 = D + (1 - rho) * beta * (C + M) + epsilon_CZ * C * Z + gamma_MZ * Z * M
-        if any(x < 0 for x in [Ct1, Zt1, Mt1, Dt1]):
-            print("Invalid set of parameters: negative population in discrete model.")
-            return None
-        C, Z, M, D = Ct1, Zt1, Mt1, Dt1
-        result.append([C, Z, M, D])
-    return np.array(result)
-
-# Modelo continuo
-def continuous_model(t, y, params):
-    C, Z, M, D = y
-    alpha, beta, beta_CZ, epsilon_CZ, beta_MZ, gamma_MZ, E, rho = params
-    dC = (alpha - beta - E) * C - beta_CZ * C * Z
-    dZ = (beta_CZ - epsilon_CZ) * C * Z + rho * beta * (C + M) + (beta_MZ - gamma_MZ) * Z * M
-    dM = E * C - beta * M - beta_MZ * Z * M
-    dD = (1 - rho) * beta * (C + M) + epsilon_CZ * C * Z + gamma_MZ * Z * M
-    return [dC, dZ, dM, dD]
-
-# Ejecutar modelo discreto
-res_discrete = simulate_discrete(params)
-if res_discrete is None:
-    exit()
-
-# Ejecutar modelo continuo
-sol_continuous = solve_ivp(
-    fun=lambda t, y: continuous_model(t, y, params),
-    t_span=(0, t_max),
-    y0=init_continuous,
-    t_eval=t
-)
-
-if np.any(sol_continuous.y < 0):
-    print("Invalid set of parameters: negative population in continuous model.")
-    exit()
-
-# Imprimir resultados finales
 labels = ["Civiles", "Zombies", "Militares", "Muertos"]
-print("Resultados finales del modelo discreto:")
-for i, label in enumerate(labels):
-    print(f"{label}: {res_discrete[-1, i]:.2f}")
-
-print("\nResultados finales del modelo continuo:")
-for i, label in enumerate(labels):
-    print(f"{label}: {sol_continuous.y[i, -1]:.2f}")
-
-# Gráfico modelo discreto
-plt.figure(figsize=(10, 5))
-for i, label in enumerate(labels):
-    plt.plot(t, res_discrete[:, i], label=label)
-plt.title("Modelo Discreto")
-plt.xlabel("Tiempo")
-plt.ylabel("Población")
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
-plt.show()
-
-# Gráfico modelo continuo
-plt.figure(figsize=(10, 5))
-for i, label in enumerate(labels):
-    plt.plot(t, sol_continuous.y[i], label=label)
-plt.title("Modelo Continuo")
-plt.xlabel("Tiempo")
-plt.ylabel("Población")
-plt.legend()
-plt.grid(True)
-plt.tight_layout()
-plt.show()
+
+
+def model_figure(suffix, values, title):
+    """
+    Job de show_figures con las cuatro poblaciones de un modelo, guardado
+    como results/<script>_<suffix>.png cuando se corre sin pantalla.
+    """
+    series = [(values[i], None, label) for i, label in enumerate(labels)]
+    return (
+        f"{script_name(__file__)}_{suffix}",
+        series_figure,
+        (t, series, title),
+        {"xlabel": "Tiempo", "ylabel": "Población"},
+    )
+
+
+def main():
+    # Resultados guardados en disco: volver a graficar no re-simula
+    cache = ResultCache()
+
+    # Ejecutar modelo discreto
+    res_discrete = cache.call(simulate_discrete, params, init_discrete, t_max, warn=False)
+    if res_discrete is None:
+        # Revisado aquí y no en la simulación: un None leído de la caché no avisa
+        print(INVALID_DISCRETE)
+        return
+
+    # Ejecutar modelo continuo
+    sol_continuous = cache.call(
+        solve_model,
+        continuous_model,
+        (0, t_max),
+        init_continuous,
+        args=(params,),
+        method=method,
+        t_eval=t,
+    )
+
+    if np.any(sol_continuous.y < 0):
+        print("Invalid set of parameters: negative population in continuous model.")
+        return
+
+    # Imprimir resultados finales
+    print("Resultados finales del modelo discreto:")
+    for i, label in enumerate(labels):
+        print(f"{label}: {res_discrete[-1, i]:.2f}")
+
+    print("\nResultados finales del modelo continuo:")
+    for i, label in enumerate(labels):
+        print(f"{label}: {sol_continuous.y[i, -1]:.2f}")
+
+    # Gráficos
+    # Con ZOMBIES_HEADLESS=1 se guardan en results/ sin abrir ventanas
+    show_figures([
+        model_figure("discreto", res_discrete.T, "Modelo Discreto"),
+        model_figure("continuo", sol_continuous.y, "Modelo Continuo"),
+    ])
+
+
+if __name__ == "__main__":
+    main()